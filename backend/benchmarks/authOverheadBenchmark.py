@@ -0,0 +1,114 @@
+"""
+Per-request GlobalInterceptor overhead on protected routes, with and without the
+verified-token cache.
+
+  interception  time of _intercept() alone for one request (route match, rate limit stubbed,
+                cookie validation, JWT verification, role check), public route as baseline
+  end_to_end    latency and throughput through the interceptor and a trivial endpoint, using
+                benchmarks/interceptorBenchmark.py's app and load driver
+
+Every request carries the same access token, as a dashboard polling with one cookie does.
+Uncached runs set the cache size to 0, so every request decodes and verifies the token.
+
+    python -m benchmarks.authOverheadBenchmark --rounds 5000 --concurrency 1 16
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi import Request
+
+from benchmarks.interceptorBenchmark import BenchInterceptor, build_app, run_load
+from src.auth.services.jwtService import JWTService
+from src.auth.services.tokenCache import verified_token_cache
+
+
+def make_request(path, access_token):
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"cookie", f"access_token={access_token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return Request(scope, receive)
+
+
+async def time_interception(interceptor, path, access_token, rounds):
+    for _ in range(min(rounds, 100)):
+        await interceptor._intercept(make_request(path, access_token))
+
+    samples = []
+    for _ in range(rounds):
+        request = make_request(path, access_token)
+        start = time.perf_counter()
+        await interceptor._intercept(request)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.mean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p99_us": round(samples[int(len(samples) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+def set_cache(enabled, max_size):
+    verified_token_cache.clear()
+    verified_token_cache.max_size = max_size if enabled else 0
+
+
+async def main_async(args):
+    access_token = JWTService.create_access_token({"user_id": "bench", "role": "admin"})
+    interceptor = BenchInterceptor(build_app())
+    max_size = verified_token_cache.max_size
+
+    results = {"interception": {}, "end_to_end": {}}
+    try:
+        set_cache(False, max_size)
+        results["interception"]["public"] = await time_interception(interceptor, "/bench/public", access_token, args.rounds)
+
+        for label, enabled in (("uncached", False), ("cached", True)):
+            set_cache(enabled, max_size)
+            results["interception"][label] = await time_interception(
+                interceptor, "/bench/protected", access_token, args.rounds
+            )
+            results["end_to_end"][label] = [
+                await run_load(interceptor, "/bench/protected", {"access_token": access_token}, args.requests, concurrency)
+                for concurrency in args.concurrency
+            ]
+        results["cache"] = verified_token_cache.stats()
+
+    finally:
+        set_cache(True, max_size)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5000, help="timed _intercept() calls per scenario")
+    parser.add_argument("--requests", type=int, default=2000, help="end-to-end requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
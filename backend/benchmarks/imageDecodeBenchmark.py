@@ -0,0 +1,75 @@
+"""
+Benchmark scan image decoding: full-resolution cv2.imdecode against decode_image, which
+decodes large JPEGs at reduced resolution, on a folder of meter photos.
+
+Reports decode latency and the size of the decoded BGR array, which dominates the memory
+held by each concurrent scan.
+
+    python -m benchmarks.imageDecodeBenchmark --images ./samples --min-side 1280
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from src.readings.services.imageIngest import decode_image
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="folder of meter photos")
+    parser.add_argument("--min-side", type=int, default=1280, help="smallest long side kept by reduced decoding")
+    parser.add_argument("--repeat", type=int, default=3, help="timed decodes per image and path")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    paths = [
+        os.path.join(args.images, name) for name in sorted(os.listdir(args.images))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+    decoders = {
+        "full": lambda data: cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR),
+        "reduced": lambda data: decode_image(data, min_side=args.min_side),
+    }
+    timings = {name: [] for name in decoders}
+    decoded_mb = {name: [] for name in decoders}
+
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        for name, decode in decoders.items():
+            image = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                image = decode(data)
+                timings[name].append(time.perf_counter() - start)
+            decoded_mb[name].append(image.nbytes / (1024 * 1024) if image is not None else 0)
+
+    results = {
+        "images": len(paths),
+        "min_side": args.min_side,
+        "paths": {
+            name: {
+                "mean_ms": round(statistics.mean(timings[name]) * 1000, 2) if paths else None,
+                "p95_ms": round(sorted(timings[name])[max(int(len(timings[name]) * 0.95) - 1, 0)] * 1000, 2) if paths else None,
+                "mean_decoded_mb": round(statistics.mean(decoded_mb[name]), 2) if paths else None,
+                "max_decoded_mb": round(max(decoded_mb[name]), 2) if paths else None,
+            }
+            for name in decoders
+        },
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Latency comparison of GlobalInterceptor as a pure ASGI middleware against the previous
+BaseHTTPMiddleware wrapper, under concurrent load.
+
+Both variants run the same interception (_intercept: route match, rate limit, JWT and role
+checks) in front of a small app with a JSON route and a streaming route, one public and one
+protected. Rate limiting is short-circuited so Redis round trips do not drown out the
+middleware cost; a real access token is minted with JWTService for the protected route.
+Requests go through httpx's in-process ASGI transport, so no sockets are involved.
+
+    python -m benchmarks.interceptorBenchmark --requests 2000 --concurrency 1 16 64
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from globals.middlewares.GlobalInterceptor import GlobalInterceptor
+from globals.middlewares.routeMatcher import RouteMatcher
+from globals.utils.context import clear_log_context, set_log_context
+from src.auth.services.jwtService import JWTService
+
+
+RATE_LIMIT = {"requests_per_minute": 10**9, "requests_per_hour": 10**9, "requests_per_day": 10**9}
+
+BENCH_ROUTES = {
+    "GET:/bench/public": {"method": "GET", "endpoint": "bench_public", "public": True, "rate_limit": RATE_LIMIT},
+    "GET:/bench/protected": {"method": "GET", "endpoint": "bench_protected", "public": False, "roles": {"admin"}, "rate_limit": RATE_LIMIT},
+    "GET:/bench/stream": {"method": "GET", "endpoint": "bench_stream", "public": False, "roles": {"admin"}, "rate_limit": RATE_LIMIT},
+}
+
+
+class BenchInterceptor(GlobalInterceptor):
+    def __init__(self, app):
+        super().__init__(app)
+        self.route_matcher = RouteMatcher(BENCH_ROUTES)
+
+    async def _check_rate_limits(self, key, limits):
+        return True, {"allowed": True, "remaining": 999}
+
+
+class LegacyInterceptor(BaseHTTPMiddleware):
+    """The previous dispatch() shape: same interception, wrapped by BaseHTTPMiddleware"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.interceptor = BenchInterceptor(app)
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            await set_log_context(
+                reference_id="bench",
+                path=request.url.path,
+                method=request.method,
+                host_from=request.client.host
+            )
+            rejection = await self.interceptor._intercept(request)
+            if rejection is not None:
+                return rejection
+            return await call_next(request)
+        finally:
+            await clear_log_context()
+
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/bench/public")
+    async def bench_public():
+        return {"ok": True}
+
+    @app.get("/bench/protected")
+    async def bench_protected(request: Request):
+        return {"user_id": request.state.user.get("user_id")}
+
+    @app.get("/bench/stream")
+    async def bench_stream():
+        async def chunks():
+            for _ in range(16):
+                yield b"x" * 4096
+        return StreamingResponse(chunks(), media_type="application/octet-stream")
+
+    return app
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+
+    return {
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(rank(50), 3),
+        "p95_ms": round(rank(95), 3),
+        "p99_ms": round(rank(99), 3),
+    }
+
+
+async def run_load(asgi_app, path, cookies, total, concurrency):
+    transport = httpx.ASGITransport(app=asgi_app, client=("127.0.0.1", 50000))
+    latencies = []
+    queue = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", cookies=cookies) as client:
+        async def worker():
+            for _ in queue:
+                start = time.perf_counter()
+                response = await client.get(path)
+                await response.aread()
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{path} returned {response.status_code}: {response.text}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "requests_per_second": round(total / elapsed, 1),
+        **percentiles(latencies),
+    }
+
+
+async def main_async(args):
+    access_token = JWTService.create_access_token({"user_id": "bench", "role": "admin"})
+    cookies = {"access_token": access_token}
+
+    variants = {
+        "asgi": BenchInterceptor(build_app()),
+        "base_http_middleware": LegacyInterceptor(build_app()),
+    }
+
+    results = {}
+    for path in ("/bench/public", "/bench/protected", "/bench/stream"):
+        results[path] = {}
+        for name, asgi_app in variants.items():
+            await run_load(asgi_app, path, cookies, min(args.requests, 200), 8)
+            results[path][name] = [
+                await run_load(asgi_app, path, cookies, args.requests, concurrency)
+                for concurrency in args.concurrency
+            ]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per path, variant and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
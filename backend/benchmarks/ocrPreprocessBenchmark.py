@@ -0,0 +1,137 @@
+"""
+Benchmark OCR preprocessing of the cropped meter display in ScanningService.
+
+Compares the previous preprocessing (fixed 10x INTER_CUBIC upscale, grayscale and back
+to 3-channel) with the adaptive single-channel stage on a folder of labelled meter photos.
+Each image is detected and cropped once, then both pipelines run preprocess + OCR on the
+same crop so only the preprocessing differs.
+
+Labels come from a labels.json file in the folder ({"<file name>": "<digits>"}) or,
+failing that, from the file name prefix before the first "_" (e.g. 012345_meter3.jpg).
+
+    python -m benchmarks.ocrPreprocessBenchmark --images ./samples --repeat 3 --output ocr.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from src.readings.services.scanningServiceV2 import ScanningService
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def legacy_preprocess(img):
+    img = cv2.resize(img, None, fx=10, fy=10, interpolation=cv2.INTER_CUBIC)
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def load_samples(folder):
+    labels = {}
+    labels_path = os.path.join(folder, "labels.json")
+    if os.path.exists(labels_path):
+        with open(labels_path, "r") as f:
+            labels = json.load(f)
+
+    samples = []
+    for name in sorted(os.listdir(folder)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        label = labels.get(name, name.split("_", 1)[0])
+        samples.append((name, str(label)))
+    return samples
+
+
+def digit_accuracy(expected, predicted):
+    """Fraction of expected digits matched position by position"""
+    if not expected:
+        return 1.0 if not predicted else 0.0
+    matched = sum(1 for a, b in zip(expected, predicted) if a == b)
+    return matched / max(len(expected), len(predicted))
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+        "p95_ms": round(samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="folder of labelled meter photos")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per image and pipeline")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    service = ScanningService(readings_queries=None, worker_processes=0)
+    pipelines = {
+        "legacy": legacy_preprocess,
+        "adaptive": service.preprocess_image,
+    }
+
+    timings = {name: [] for name in pipelines}
+    exact = {name: 0 for name in pipelines}
+    digits = {name: [] for name in pipelines}
+    pixels = {name: [] for name in pipelines}
+    per_image = []
+    skipped = []
+
+    for name, label in load_samples(args.images):
+        image = cv2.imread(os.path.join(args.images, name), cv2.IMREAD_COLOR)
+        if image is None:
+            skipped.append({"image": name, "reason": "unreadable"})
+            continue
+
+        crop = service.process_yolo_results(service.yolo_predict(image, top1=True), image)
+        if crop is None:
+            skipped.append({"image": name, "reason": "no detection"})
+            continue
+
+        row = {"image": name, "label": label, "crop_shape": list(crop.shape)}
+        for pipeline, preprocess in pipelines.items():
+            predicted = ""
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                processed = preprocess(crop)
+                predicted = service.extract_digits(service.ocr_model(processed))
+                timings[pipeline].append(time.perf_counter() - start)
+
+            pixels[pipeline].append(int(np.prod(processed.shape)))
+            exact[pipeline] += int(predicted == label)
+            digits[pipeline].append(digit_accuracy(label, predicted))
+            row[pipeline] = predicted
+        per_image.append(row)
+
+    evaluated = len(per_image)
+    results = {
+        "images": evaluated,
+        "skipped": skipped,
+        "ocr_rec_height": service.ocr_rec_height,
+        "pipelines": {
+            pipeline: {
+                "latency": summarize(timings[pipeline]) if timings[pipeline] else None,
+                "exact_match": round(exact[pipeline] / evaluated, 4) if evaluated else None,
+                "digit_accuracy": round(statistics.mean(digits[pipeline]), 4) if evaluated else None,
+                "mean_input_pixels": int(statistics.mean(pixels[pipeline])) if evaluated else None,
+            }
+            for pipeline in pipelines
+        },
+        "per_image": per_image,
+    }
+    print(json.dumps({key: value for key, value in results.items() if key != "per_image"}, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Correctness checks and benchmark of RedisRateLimiter (GCRA Lua script) against the previous
+sorted-set pipeline, on a local Redis or an in-process stand-in.
+
+Checks:
+  - a concurrent burst admits exactly the per-minute limit, and the denial carries the
+    window and a retry-after (the old pipeline stored one member per second and let
+    same-second bursts through)
+  - the hour and day windows are enforced and reported when they are the tighter ones
+  - memory per key stays constant however many requests a client makes
+Then times one check per request for both implementations.
+
+    python -m benchmarks.rateLimiterBenchmark --url redis://localhost:6379/15
+    python -m benchmarks.rateLimiterBenchmark --fake     # needs fakeredis[lua]
+
+Exits non-zero if a check fails. Keys are written under the rlbench: prefix.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from uuid import uuid4
+
+import redis.asyncio as redis
+
+from globals.middlewares.rateLimiter import RATE_LIMIT_WINDOWS, RedisRateLimiter
+
+
+async def legacy_check(redis_client, key, limits):
+    """The previous implementation, one ZSET per window"""
+    current_time = int(time.time())
+    pipe = redis_client.pipeline()
+    for window_name, seconds, limit_field in RATE_LIMIT_WINDOWS:
+        window_key = f"{key}:{window_name}"
+        pipe.zremrangebyscore(window_key, 0, current_time - seconds)
+        pipe.zcard(window_key)
+        pipe.zadd(window_key, {str(current_time): current_time})
+        pipe.expire(window_key, seconds)
+    results = await pipe.execute()
+    for i, (window_name, seconds, limit_field) in enumerate(RATE_LIMIT_WINDOWS):
+        if results[i * 4 + 1] > limits[limit_field]:
+            return False, {"window": window_name, "retry_after": seconds}
+    return True, {}
+
+
+def fresh_key():
+    return f"rlbench:{uuid4().hex}"
+
+
+async def burst(check, redis_client, limits, size):
+    key = fresh_key()
+    results = await asyncio.gather(*(check(redis_client, key, limits) for _ in range(size)))
+    return key, [info for allowed, info in results if allowed], [info for allowed, info in results if not allowed]
+
+
+async def key_memory(redis_client, keys):
+    try:
+        return sum([await redis_client.memory_usage(key) or 0 for key in keys])
+    except Exception:
+        return None
+
+
+async def run_checks(redis_client, limiter):
+    failures = []
+    checks = {}
+
+    limits = {"requests_per_minute": 5, "requests_per_hour": 100, "requests_per_day": 1000}
+    _, allowed, denied = await burst(limiter.check, redis_client, limits, 12)
+    checks["minute_burst"] = {
+        "allowed": len(allowed),
+        "denied": len(denied),
+        "remaining": sorted(info["remaining"] for info in allowed),
+        "denial": denied[0] if denied else None,
+    }
+    if len(allowed) != 5:
+        failures.append(f"minute burst admitted {len(allowed)} of 12, expected 5")
+    if sorted(info["remaining"] for info in allowed) != [0, 1, 2, 3, 4]:
+        failures.append("remaining counts do not step down to 0")
+    if denied and (denied[0]["window"] != "minute" or not 11 <= denied[0]["retry_after"] <= 12):
+        failures.append(f"unexpected minute denial {denied[0]}")
+
+    _, legacy_allowed, _ = await burst(legacy_check, redis_client, limits, 12)
+    checks["legacy_minute_burst"] = {"allowed": len(legacy_allowed)}
+
+    limits = {"requests_per_minute": 50, "requests_per_hour": 3, "requests_per_day": 1000}
+    _, allowed, denied = await burst(limiter.check, redis_client, limits, 5)
+    checks["hour_burst"] = {"allowed": len(allowed), "denial": denied[0] if denied else None}
+    if len(allowed) != 3 or not denied or denied[0]["window"] != "hour":
+        failures.append("hour window not enforced")
+    if denied and not 1199 <= denied[0]["retry_after"] <= 1200:
+        failures.append(f"unexpected hour retry-after {denied[0]['retry_after']}")
+
+    limits = {"requests_per_minute": 50, "requests_per_hour": 100, "requests_per_day": 2}
+    _, allowed, denied = await burst(limiter.check, redis_client, limits, 3)
+    if len(allowed) != 2 or not denied or denied[0]["window"] != "day":
+        failures.append("day window not enforced")
+
+    limits = {"requests_per_minute": 10**6, "requests_per_hour": 10**6, "requests_per_day": 10**6}
+    gcra_key, legacy_key = fresh_key(), fresh_key()
+    memory = {}
+    for requests in (10, 1000):
+        for _ in range(requests):
+            await limiter.check(redis_client, gcra_key, limits)
+            await legacy_check(redis_client, legacy_key, limits)
+        memory[requests] = {
+            "gcra_bytes": await key_memory(redis_client, [gcra_key]),
+            "legacy_bytes": await key_memory(redis_client, [f"{legacy_key}:{window}" for window, _, _ in RATE_LIMIT_WINDOWS]),
+        }
+    checks["memory_per_key"] = memory
+    if memory[10]["gcra_bytes"] is not None and memory[10]["gcra_bytes"] != memory[1000]["gcra_bytes"]:
+        failures.append("GCRA key grew with request count")
+
+    return checks, failures
+
+
+async def time_checks(check, redis_client, rounds):
+    limits = {"requests_per_minute": 10**6, "requests_per_hour": 10**6, "requests_per_day": 10**6}
+    key = fresh_key()
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await check(redis_client, key, limits)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "mean_us": round(statistics.mean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1] * 1e6, 1),
+    }
+
+
+async def main_async(args):
+    if args.fake:
+        try:
+            import fakeredis
+        except ImportError:
+            sys.exit("--fake needs fakeredis with Lua support: pip install 'fakeredis[lua]'")
+        redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    else:
+        redis_client = redis.Redis.from_url(args.url, decode_responses=True)
+
+    limiter = RedisRateLimiter()
+    try:
+        checks, failures = await run_checks(redis_client, limiter)
+        results = {
+            "backend": "fakeredis" if args.fake else args.url,
+            "checks": checks,
+            "failures": failures,
+            "latency": {
+                "gcra": await time_checks(limiter.check, redis_client, args.rounds),
+                "legacy": await time_checks(legacy_check, redis_client, args.rounds),
+            },
+        }
+    finally:
+        async for key in redis_client.scan_iter(match="rlbench:*"):
+            await redis_client.delete(key)
+        await redis_client.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="redis://localhost:6379/15", help="Redis to run against")
+    parser.add_argument("--fake", action="store_true", help="use an in-process fakeredis instead")
+    parser.add_argument("--rounds", type=int, default=2000, help="timed checks per implementation")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if results["failures"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
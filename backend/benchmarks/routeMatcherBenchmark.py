@@ -0,0 +1,126 @@
+"""
+Micro-benchmark of GlobalInterceptor route resolution over ROUTE_CONFIG.
+
+Compares the previous resolution (exact dict hit, else a linear scan of the parameterized
+patterns, then a second scan of ROUTE_CONFIG to recover the pattern for the rate-limit key)
+with RouteMatcher, which returns config and pattern from one trie lookup. Every route gets
+a concrete sample path (parameters filled with UUIDs) and both resolvers must agree on it.
+
+    python -m benchmarks.routeMatcherBenchmark --rounds 2000
+"""
+import argparse
+import json
+import statistics
+import time
+from uuid import uuid4
+
+from globals.middlewares.routeMatcher import RouteMatcher
+from src.auth.routes.routes import ROUTE_CONFIG
+
+
+def fast_pattern_match(actual_parts, pattern_parts):
+    for actual, pattern in zip(actual_parts, pattern_parts):
+        if not (actual == pattern or pattern.startswith("{") and pattern.endswith("}")):
+            return False
+    return True
+
+
+class LegacyResolver:
+    def __init__(self, route_config):
+        self.route_config = route_config
+        self.pattern_cache = {}
+        for route_key in route_config.keys():
+            method, path = route_key.split(":", 1)
+            if "{" in path:
+                parts = path.strip("/").split("/")
+                self.pattern_cache[route_key] = {"method": method, "parts": parts, "param_count": len(parts)}
+
+    def get_route_config(self, method, path):
+        exact_key = f"{method}:{path}"
+        if exact_key in self.route_config:
+            return self.route_config[exact_key]
+        path_parts = path.strip("/").split("/")
+        for route_key, pattern_info in self.pattern_cache.items():
+            if pattern_info["method"] == method and pattern_info["param_count"] == len(path_parts):
+                if fast_pattern_match(path_parts, pattern_info["parts"]):
+                    return self.route_config[route_key]
+        return None
+
+    def match(self, method, path):
+        route_config = self.get_route_config(method, path)
+        if not route_config:
+            return None
+        for route_key in self.route_config.keys():
+            stored_method, stored_path = route_key.split(":", 1)
+            if method == stored_method:
+                if path == stored_path:
+                    return route_config, stored_path
+                if "{" in stored_path and fast_pattern_match(path.strip("/").split("/"), stored_path.strip("/").split("/")):
+                    return route_config, stored_path
+        return route_config, path
+
+
+def sample_requests():
+    requests = []
+    for route_key in ROUTE_CONFIG:
+        method, path = route_key.split(":", 1)
+        parts = [str(uuid4()) if part.startswith("{") else part for part in path.split("/")]
+        requests.append((method, "/".join(parts)))
+    # Unknown routes fall through to FastAPI's 404 and are resolved on every such request too
+    requests.append(("GET", "/billing-system/api/v1/unknown/route"))
+    return requests
+
+
+def time_resolver(match, requests, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for method, path in requests:
+            match(method, path)
+        samples.append((time.perf_counter() - start) / len(requests))
+    samples.sort()
+    return {
+        "mean_us": round(statistics.mean(samples) * 1e6, 3),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 3),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1] * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000, help="passes over all sample requests")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    legacy = LegacyResolver(ROUTE_CONFIG)
+    matcher = RouteMatcher(ROUTE_CONFIG)
+    requests = sample_requests()
+
+    mismatches = [
+        f"{method} {path}" for method, path in requests
+        if legacy.match(method, path) != matcher.match(method, path)
+    ]
+
+    parameterized = [request for request, route_key in zip(requests, ROUTE_CONFIG) if "{" in route_key]
+    results = {
+        "routes": len(ROUTE_CONFIG),
+        "rate_limited_routes": sum(1 for config in ROUTE_CONFIG.values() if "rate_limit" in config),
+        "parameterized_routes": len(parameterized),
+        "mismatches": mismatches,
+        "all_requests": {
+            "legacy": time_resolver(legacy.match, requests, args.rounds),
+            "trie": time_resolver(matcher.match, requests, args.rounds),
+        },
+        "parameterized_requests": {
+            "legacy": time_resolver(legacy.match, parameterized, args.rounds),
+            "trie": time_resolver(matcher.match, parameterized, args.rounds),
+        },
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Scanning benchmark and regression suite for ScanningService.scan.
+
+Runs every labelled photo of a folder through the full scan and reports:
+  - per-stage timings: decode, letterbox, inference (includes the micro-batch queue wait),
+    postprocess (box decode / top-1 / NMS), crop, ocr_preprocess, ocr
+  - end-to-end p50/p95/p99 latency
+  - images per second at each concurrency level
+  - exact-match and digit-level accuracy
+
+Labels follow benchmarks/ocrPreprocessBenchmark.py (labels.json or the file name prefix).
+Write JSON with --output and compare runs across model variants and code changes.
+
+    python -m benchmarks.scanBenchmark --images ./samples --concurrency 1 2 4 8 --output scan.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.ocrPreprocessBenchmark import digit_accuracy, load_samples
+from src.readings.services.scanModelVariants import MODEL_VARIANTS, available_cores
+from src.readings.services.scanningServiceV2 import ScanningService
+
+
+STAGES = ("decode", "letterbox", "inference", "postprocess", "crop", "ocr_preprocess", "ocr")
+
+
+def percentiles(samples):
+    """Nearest-rank percentiles in milliseconds"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+        "p50_ms": round(rank(50), 2),
+        "p95_ms": round(rank(95), 2),
+        "p99_ms": round(rank(99), 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def timed_scan(service, image_bytes):
+    timings = {}
+    start = time.perf_counter()
+    result = service.scan(image_bytes, timings=timings)
+    return result, time.perf_counter() - start, timings
+
+
+def run_accuracy_pass(service, samples, images):
+    """Sequential pass: stage timings, latency and accuracy per image"""
+    stage_samples = {stage: [] for stage in STAGES}
+    latencies, digit_scores, per_image = [], [], []
+    exact = detected = 0
+
+    for (name, label), image_bytes in zip(samples, images):
+        result, latency, timings = timed_scan(service, image_bytes)
+        predicted = result[0]["rec_text"] if result else ""
+
+        latencies.append(latency)
+        for stage, seconds in timings.items():
+            stage_samples[stage].append(seconds)
+        detected += int(result is not None)
+        exact += int(predicted == label)
+        digit_scores.append(digit_accuracy(label, predicted))
+        per_image.append({
+            "image": name,
+            "label": label,
+            "predicted": predicted,
+            "latency_ms": round(latency * 1000, 2),
+            "stages_ms": {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()},
+        })
+
+    return {
+        "latency": percentiles(latencies),
+        "stages": {stage: percentiles(values) for stage, values in stage_samples.items()},
+        "accuracy": {
+            "detected": detected,
+            "exact_match": round(exact / len(samples), 4) if samples else None,
+            "digit_accuracy": round(statistics.mean(digit_scores), 4) if samples else None,
+        },
+        "per_image": per_image,
+    }
+
+
+def run_throughput(service, images, concurrency, repeat):
+    """All images, repeat times, through a pool of concurrency threads"""
+    workload = images * repeat
+    latencies = []
+
+    def scan(image_bytes):
+        _, latency, _ = timed_scan(service, image_bytes)
+        return latency
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies.extend(executor.map(scan, workload))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "images": len(workload),
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(workload) / elapsed, 2) if elapsed else None,
+        "latency": percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="folder of labelled meter photos")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the folder per concurrency level")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed scans before measuring")
+    parser.add_argument("--variant", default="fp32", choices=MODEL_VARIANTS)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads, 0 uses every available core")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.images)
+    images = []
+    for name, _ in samples:
+        with open(os.path.join(args.images, name), "rb") as f:
+            images.append(f.read())
+
+    started = time.perf_counter()
+    service = ScanningService(
+        readings_queries=None,
+        worker_processes=0,
+        intra_op_threads=args.threads,
+        model_variant=args.variant,
+        model_loading="eager",
+    )
+    load_seconds = time.perf_counter() - started
+
+    for image_bytes in images[:args.warmup]:
+        service.scan(image_bytes)
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cores": available_cores(),
+            "model_variant": service.model_variant,
+            "intra_op_threads": args.threads,
+            "batch_max_size": service.yolo_batcher.max_batch_size,
+            "batch_max_wait_ms": service.yolo_batcher.max_wait * 1000,
+        },
+        "images": len(samples),
+        "load_seconds": round(load_seconds, 3),
+        "sequential": run_accuracy_pass(service, samples, images),
+        "throughput": [
+            run_throughput(service, images, concurrency, args.repeat) for concurrency in args.concurrency
+        ],
+        "batcher": service.yolo_batcher.stats(),
+    }
+
+    print(json.dumps(
+        {
+            **{key: value for key, value in results.items() if key != "sequential"},
+            "sequential": {key: value for key, value in results["sequential"].items() if key != "per_image"},
+        },
+        indent=2
+    ))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
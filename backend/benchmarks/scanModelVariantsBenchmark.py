@@ -0,0 +1,87 @@
+"""
+Compare the fp32, optimized and INT8 scanning model variants end to end.
+
+Each variant is loaded into its own ScanningService (load time is reported too) and every
+labelled photo goes through the full scan: decode, detection, crop, preprocessing and OCR.
+Variants missing on disk are skipped; create them with scripts/prepareScanModels.py.
+Labels follow benchmarks/ocrPreprocessBenchmark.py (labels.json or the file name prefix).
+
+    python -m benchmarks.scanModelVariantsBenchmark --images ./samples --threads 4 --output variants.json
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from benchmarks.ocrPreprocessBenchmark import digit_accuracy, load_samples, summarize
+from src.readings.services.scanModelVariants import MODEL_VARIANTS, variant_model_path
+from src.readings.services.scanningServiceV2 import ScanningService
+
+
+DETECTOR_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../src/readings/models/yolo/best.onnx")
+)
+
+
+def evaluate(variant, samples, folder, threads, repeat):
+    started = time.perf_counter()
+    service = ScanningService(
+        readings_queries=None,
+        worker_processes=0,
+        intra_op_threads=threads,
+        model_variant=variant,
+    )
+    load_seconds = time.perf_counter() - started
+
+    latencies, digit_scores = [], []
+    exact = detected = 0
+    for name, label in samples:
+        with open(os.path.join(folder, name), "rb") as f:
+            image_bytes = f.read()
+
+        result = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = service.scan(image_bytes)
+            latencies.append(time.perf_counter() - start)
+
+        predicted = result[0]["rec_text"] if result else ""
+        detected += int(result is not None)
+        exact += int(predicted == label)
+        digit_scores.append(digit_accuracy(label, predicted))
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "latency": summarize(latencies) if latencies else None,
+        "detected": detected,
+        "exact_match": round(exact / len(samples), 4) if samples else None,
+        "digit_accuracy": round(statistics.mean(digit_scores), 4) if samples else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", required=True, help="folder of labelled meter photos")
+    parser.add_argument("--variants", nargs="+", default=list(MODEL_VARIANTS), choices=MODEL_VARIANTS)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads, 0 uses every available core")
+    parser.add_argument("--repeat", type=int, default=1, help="timed scans per image")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = load_samples(args.images)
+    results = {"images": len(samples), "threads": args.threads, "variants": {}}
+    for variant in args.variants:
+        if not os.path.exists(variant_model_path(DETECTOR_PATH, variant)):
+            results["variants"][variant] = {"skipped": "model not prepared"}
+            continue
+        results["variants"][variant] = evaluate(variant, samples, args.images, args.threads, args.repeat)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
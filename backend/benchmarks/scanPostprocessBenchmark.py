@@ -0,0 +1,134 @@
+"""
+Benchmark YOLO post-processing (decode + NMS/top-1) in ScanningService.
+
+Compares the previous loop-based decode and Python NMS with the vectorized path
+on synthetic detector outputs shaped like the meter display model (1, 5, 8400).
+
+    python -m benchmarks.scanPostprocessBenchmark --frames 500 --candidates 8400
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from src.readings.services.scanningServiceV2 import ScanningService
+
+
+def legacy_decode(output, conf_threshold):
+    if output.ndim == 3:
+        output = np.squeeze(output, 0)
+    if output.shape[0] in (5, 6, 85):
+        output = output.T
+    xywh = output[:, :4]
+    conf = output[:, 4]
+    sel = conf >= conf_threshold
+    boxes, scores = [], []
+    for (x, y, w, h), c in zip(xywh[sel], conf[sel]):
+        boxes.append([x - w / 2, y - h / 2, x + w / 2, y + h / 2])
+        scores.append(float(c))
+    return np.array(boxes, dtype=np.float32), np.array(scores, dtype=np.float32)
+
+
+def legacy_nms(boxes, scores, iou_thres):
+    if len(boxes) == 0:
+        return []
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1 + 1) * (y2 - y1 + 1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        w = np.maximum(0.0, xx2 - xx1 + 1)
+        h = np.maximum(0.0, yy2 - yy1 + 1)
+        inter = w * h
+        ovr = inter / (areas[i] + areas[order[1:]] - inter)
+        order = order[np.where(ovr <= iou_thres)[0] + 1]
+    return keep
+
+
+def synthetic_output(rng, candidates, confident):
+    """Mostly low-confidence anchors plus a cluster of overlapping confident boxes"""
+    output = np.empty((1, 5, candidates), dtype=np.float32)
+    output[0, 0] = rng.uniform(0, 640, candidates)
+    output[0, 1] = rng.uniform(0, 640, candidates)
+    output[0, 2] = rng.uniform(10, 200, candidates)
+    output[0, 3] = rng.uniform(10, 80, candidates)
+    output[0, 4] = rng.uniform(0, 0.5, candidates)
+
+    idx = rng.choice(candidates, confident, replace=False)
+    output[0, 0, idx] = 320 + rng.normal(0, 4, confident)
+    output[0, 1, idx] = 300 + rng.normal(0, 4, confident)
+    output[0, 2, idx] = 180 + rng.normal(0, 3, confident)
+    output[0, 3, idx] = 60 + rng.normal(0, 2, confident)
+    output[0, 4, idx] = rng.uniform(0.8, 0.99, confident)
+    return output
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "mean_us": round(statistics.mean(samples) * 1e6, 1),
+        "p50_us": round(samples[len(samples) // 2] * 1e6, 1),
+        "p95_us": round(samples[int(len(samples) * 0.95) - 1] * 1e6, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=8400)
+    parser.add_argument("--confident", type=int, default=40, help="confident boxes per frame")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    # Only the post-processing methods are exercised, so skip model loading
+    service = ScanningService.__new__(ScanningService)
+    service.conf_threshold = 0.8
+    service.iou_threshold = 0.45
+
+    rng = np.random.default_rng(0)
+    frames = [synthetic_output(rng, args.candidates, args.confident) for _ in range(args.frames)]
+
+    timings = {"legacy_decode_nms": [], "vectorized_decode_nms": [], "vectorized_decode_top1": []}
+    mismatches = 0
+    for output in frames:
+        start = time.perf_counter()
+        boxes, scores = legacy_decode(output, service.conf_threshold)
+        legacy_keep = legacy_nms(boxes, scores, service.iou_threshold)
+        timings["legacy_decode_nms"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        boxes, scores = service.decode(output)
+        service.nms(boxes, scores, iou_thres=service.iou_threshold)
+        timings["vectorized_decode_nms"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        boxes, scores = service.decode(output)
+        best = int(np.argmax(scores)) if len(scores) else None
+        timings["vectorized_decode_top1"].append(time.perf_counter() - start)
+
+        if legacy_keep and best != int(legacy_keep[0]):
+            mismatches += 1
+
+    results = {
+        "frames": args.frames,
+        "candidates": args.candidates,
+        "confident_boxes": args.confident,
+        "top1_mismatches_vs_legacy": mismatches,
+        "timings": {name: summarize(samples) for name, samples in timings.items()},
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 from google.cloud import storage
 from google.api_core.exceptions import Conflict, NotFound
 from globals.utils.logger import logger
-from typing import Optional, List
+from typing import Dict, Optional, List
 from globals.config.config import GCS_SERVICE_ACCOUNT, PROJECT_ID, BUCKET_NAME
 from datetime import timedelta, datetime, timezone
 from io import BytesIO
@@ -42,6 +42,18 @@ class GCSManager:
                     "action": {"type": "SetStorageClass", "storageClass": "ARCHIVE"},
                     "condition": {"age": 365, "matchesPrefix": ["bills/"]},
                 },
+                {
+                    "action": {"type": "Delete"},
+                    "condition": {"age": 30, "matchesPrefix": ["render-cache/"]},
+                },
+                {
+                    "action": {"type": "Delete"},
+                    "condition": {"age": 1, "matchesPrefix": ["scans/staged/"]},
+                },
+                {
+                    "action": {"type": "Delete"},
+                    "condition": {"age": 7, "matchesPrefix": ["scans/bulk/"]},
+                },
             ]
         }
 
@@ -101,6 +113,46 @@ class GCSManager:
             logger.error(f"Error uploading buffer: {e}")
             raise
 
+    def upload_file(
+        self,
+        bucket_name: str,
+        source_file_path: str,
+        destination_blob_name: str,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = 8 * 1024 * 1024,
+    ) -> str:
+        """
+        Uploads a local file with a resumable, chunked upload so large files are
+        streamed from disk and a dropped connection only resends the current chunk.
+        chunk_size must be a multiple of 256 KB.
+        """
+        try:
+            bucket = self.client.bucket(bucket_name)
+            blob = bucket.blob(destination_blob_name, chunk_size=chunk_size)
+            blob.upload_from_filename(source_file_path, content_type=content_type)
+            logger.info(f"File {source_file_path} uploaded to {destination_blob_name}.")
+            return destination_blob_name
+
+        except Exception as e:
+            logger.error(f"Error uploading file {source_file_path}: {e}")
+            raise
+
+    def copy_file(
+        self, bucket_name: str, source_blob_name: str, destination_blob_name: str
+    ) -> str:
+        """
+        Copies a blob within the bucket without downloading it.
+        """
+        try:
+            bucket = self.client.bucket(bucket_name)
+            bucket.copy_blob(bucket.blob(source_blob_name), bucket, destination_blob_name)
+            logger.info(f"Blob {source_blob_name} copied to {destination_blob_name}.")
+            return destination_blob_name
+
+        except Exception as e:
+            logger.error(f"Error copying blob {source_blob_name} to {destination_blob_name}: {e}")
+            raise
+
     def download_file(
         self, bucket_name: str, blob_name: str, destination_file_path: str
     ):
@@ -117,6 +169,19 @@ class GCSManager:
             logger.error(f"Blob {blob_name} not found in bucket {bucket_name}.")
             raise
 
+    def download_as_bytes(self, bucket_name: str, blob_name: str) -> Optional[bytes]:
+        """
+        Downloads a blob into memory, returns None if it does not exist.
+        """
+        try:
+            bucket = self.client.bucket(bucket_name)
+            blob = bucket.blob(blob_name)
+            return blob.download_as_bytes()
+
+        except NotFound:
+            logger.info(f"Blob {blob_name} does not exist in bucket {bucket_name}.")
+            return None
+
     def list_files(self, bucket_name: str, prefix: Optional[str] = None) -> List[str]:
         """
         Lists all blobs in the bucket (optionally under a prefix/folder).
@@ -178,6 +243,36 @@ class GCSManager:
             )
             raise
 
+    def generate_signed_urls(
+        self,
+        bucket_name: str,
+        blob_names: List[str],
+        expiration_minutes: int = 15,
+        download: bool = True,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Signs many blobs in one pass (signing is local, no request per blob).
+        Blobs that fail to sign map to None instead of failing the whole batch.
+        """
+        bucket = self.client.bucket(bucket_name)
+        signed_urls = {}
+        for blob_name in blob_names:
+            try:
+                signed_urls[blob_name] = bucket.blob(blob_name).generate_signed_url(
+                    version="v4",
+                    expiration=timedelta(minutes=expiration_minutes),
+                    method="GET",
+                    response_disposition=(
+                        f'attachment; filename="{blob_name}"' if download else None
+                    ),
+                )
+            except Exception as e:
+                logger.error(f"Error generating signed URL for blob {blob_name}: {e}")
+                signed_urls[blob_name] = None
+
+        logger.info(f"Generated {len(signed_urls)} signed URLs in bucket {bucket_name}.")
+        return signed_urls
+
     def delete_file(self, bucket_name: str, blob_name: str):
         """
         Deletes a file from the specified bucket.
@@ -14,6 +14,7 @@ from db.postgres.tables.otp import OTP
 from db.postgres.tables.fixes import Fixes
 from db.postgres.tables.passwordReset import PasswordReset
 from db.postgres.tables.payments import Payments
+from db.postgres.tables.message_campaigns import MessageCampaigns, CampaignRecipients
 
 from db.postgres.connection import PostgresClient
 
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, DateTime, ForeignKey, func, String, Integer, Index, CheckConstraint
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from uuid import uuid4
+from db.postgres.base import Base
+
+
+class MessageCampaigns(Base):
+    __tablename__ = "message_campaigns"
+
+    campaign_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    template_id = Column(UUID(as_uuid=True), ForeignKey("templates.template_id", ondelete="SET NULL", name="fk_message_campaigns_template_id"), nullable=True)
+    template = Column(String, nullable=False)
+    status = Column(String(20), nullable=False, default="scheduled")
+    total_recipients = Column(Integer, nullable=False, default=0)
+    requested_by_phone_number = Column(String, nullable=True)
+
+    scheduled_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    created_by = Column(UUID(as_uuid=True), ForeignKey(column="users.user_id", ondelete="SET NULL", name="fk_message_campaigns_created_by"), nullable=True)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('scheduled', 'running', 'completed')", name="ck_message_campaigns_status"),
+    )
+
+
+class CampaignRecipients(Base):
+    __tablename__ = "campaign_recipients"
+
+    recipient_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    campaign_id = Column(UUID(as_uuid=True), ForeignKey("message_campaigns.campaign_id", ondelete="CASCADE", name="fk_campaign_recipients_campaign_id"), nullable=False)
+    meter_id = Column(UUID(as_uuid=True), ForeignKey("meters.meter_id", ondelete="SET NULL", name="fk_campaign_recipients_meter_id"), nullable=True)
+
+    phone_number = Column(String, nullable=True)
+    # Template variables for this recipient (customer fields resolved at campaign creation)
+    payload = Column(JSONB, nullable=False)
+
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'sending', 'sent', 'failed')", name="ck_campaign_recipients_status"),
+        Index("ix_campaign_recipients_campaign_id_status", "campaign_id", "status"),
+    )
@@ -0,0 +1,142 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from db.redis.connection import RedisManager
+from globals.config.config import (
+    REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    REDIS_CIRCUIT_PROBE_BASE_SECONDS,
+    REDIS_CIRCUIT_PROBE_MAX_SECONDS,
+    REDIS_OPERATION_TIMEOUT_MS,
+)
+from globals.utils.logger import logger
+
+
+def _describe(error: Exception) -> str:
+    # Timeouts carry no message
+    return f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+
+class RedisCircuitBreaker:
+    """
+    Health-aware access to the shared Redis client for the request path.
+
+    closed     Redis is used; consecutive failures (errors or timeouts) are counted
+    open       after REDIS_CIRCUIT_FAILURE_THRESHOLD failures get_client() returns None at once,
+               so callers take their fallback instead of waiting out connect/socket timeouts
+    half_open  a background probe is pinging Redis; success closes the circuit, failure
+               reopens it and doubles the probe delay (with jitter) up to the maximum
+
+    Only the probe talks to Redis while the circuit is not closed.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+    # Numeric state for dashboards and alerts
+    STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        failure_threshold: int = REDIS_CIRCUIT_FAILURE_THRESHOLD,
+        operation_timeout_ms: float = REDIS_OPERATION_TIMEOUT_MS,
+        probe_base_seconds: float = REDIS_CIRCUIT_PROBE_BASE_SECONDS,
+        probe_max_seconds: float = REDIS_CIRCUIT_PROBE_MAX_SECONDS,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.operation_timeout = operation_timeout_ms / 1000
+        self.probe_base_seconds = probe_base_seconds
+        self.probe_max_seconds = probe_max_seconds
+
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.probe_attempts = 0
+        self.next_probe_at: Optional[float] = None
+        self._probe_task: Optional[asyncio.Task] = None
+        # Client handed out while closed, fetched once instead of on every request
+        self._client: Optional[redis.Redis] = None
+
+    async def get_client(self) -> Optional[redis.Redis]:
+        """The Redis client, or None while the circuit is open or half-open"""
+        if self.state != self.CLOSED:
+            return None
+        if self._client is not None:
+            return self._client
+        try:
+            self._client = await asyncio.wait_for(RedisManager.get_instance(), self.operation_timeout)
+            return self._client
+        except Exception as e:
+            self.record_failure(e)
+            return None
+
+    def record_success(self):
+        self.consecutive_failures = 0
+
+    def record_failure(self, error: Exception):
+        self.consecutive_failures += 1
+        self.last_error = _describe(error)
+        if self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.time()
+        self.times_opened += 1
+        self.probe_attempts = 0
+        logger.error(
+            f"Redis circuit opened after {self.consecutive_failures} consecutive failures "
+            f"({self.last_error}), using fallbacks until Redis answers again"
+        )
+        if self._probe_task is None or self._probe_task.done():
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe())
+
+    def _close(self):
+        outage = time.time() - self.opened_at if self.opened_at else 0
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.next_probe_at = None
+        logger.info(f"Redis circuit closed after {outage:.1f}s and {self.probe_attempts} probes")
+
+    async def _probe(self):
+        delay = self.probe_base_seconds
+        while self.state != self.CLOSED:
+            wait = delay + random.uniform(0, delay / 2)
+            self.next_probe_at = time.time() + wait
+            await asyncio.sleep(wait)
+
+            self.state = self.HALF_OPEN
+            self.probe_attempts += 1
+            try:
+                client = self._client or await asyncio.wait_for(RedisManager.get_instance(), self.operation_timeout)
+                await asyncio.wait_for(client.ping(), self.operation_timeout)
+                self._client = client
+                self._close()
+            except Exception as e:
+                self.state = self.OPEN
+                self.last_error = _describe(e)
+                delay = min(delay * 2, self.probe_max_seconds)
+                logger.warning(f"Redis probe {self.probe_attempts} failed ({self.last_error}), next in ~{delay:.0f}s")
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "state": self.state,
+            "state_code": self.STATE_CODES[self.state],
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "open_seconds": round(now - self.opened_at, 1) if self.opened_at else 0,
+            "probe_attempts": self.probe_attempts,
+            "next_probe_in_seconds": round(max(0.0, self.next_probe_at - now), 1) if self.next_probe_at else None,
+            "last_error": self.last_error,
+        }
+
+
+redis_breaker = RedisCircuitBreaker()
@@ -3,6 +3,7 @@ import json
 from google.cloud import secretmanager
 from dotenv import load_dotenv
 import base64
+import tempfile
 from globals.utils.logger import logger
 
 
@@ -70,6 +71,8 @@ JWT_ACCESS_TOKEN_EXPIRE_MINUTES = int(JWT_CONFIG.get("JWT_ACCESS_TOKEN_EXPIRE_MI
 JWT_REFRESH_TOKEN_EXPIRE_MINUTES = int(
     JWT_CONFIG.get("JWT_REFRESH_TOKEN_EXPIRE_MINUTES")
 )
+# Verified access tokens kept per process so repeat requests skip signature checks (0 disables)
+JWT_VERIFIED_CACHE_SIZE = int(JWT_CONFIG.get("VERIFIED_CACHE_SIZE", 10000))
 
 # GCS configuration
 GCS_SERVICE_ACCOUNT = SYSTEM_SECRETS.get("GCS_SERVICE_ACCOUNT", None)
@@ -96,6 +99,14 @@ REDIS_PORT = REDIS_CONFIG.get("REDIS_PORT")
 REDIS_PASSWORD = REDIS_CONFIG.get("REDIS_PASSWORD")
 REDIS_DB = REDIS_CONFIG.get("REDIS_DB")
 REDIS_USERNAME = REDIS_CONFIG.get("REDIS_USERNAME", None)
+# Request-path Redis calls give up after this long, and this many consecutive failures open
+# the circuit; it is probed in the background with exponential backoff until Redis answers
+REDIS_OPERATION_TIMEOUT_MS = float(REDIS_CONFIG.get("OPERATION_TIMEOUT_MS", 500))
+REDIS_CIRCUIT_FAILURE_THRESHOLD = int(REDIS_CONFIG.get("CIRCUIT_FAILURE_THRESHOLD", 3))
+REDIS_CIRCUIT_PROBE_BASE_SECONDS = float(REDIS_CONFIG.get("CIRCUIT_PROBE_BASE_SECONDS", 1))
+REDIS_CIRCUIT_PROBE_MAX_SECONDS = float(REDIS_CONFIG.get("CIRCUIT_PROBE_MAX_SECONDS", 60))
+# Keys tracked by the in-process limiter that takes over while Redis is unavailable
+RATE_LIMIT_FALLBACK_MAX_KEYS = int(REDIS_CONFIG.get("RATE_LIMIT_FALLBACK_MAX_KEYS", 10000))
 
 # WhatsApp configuration
 WHATSAPP_CONFIG = SYSTEM_SECRETS.get("WHATSAPP", None)
@@ -103,6 +114,12 @@ if not WHATSAPP_CONFIG:
     raise RuntimeError("WhatsApp configuration not found")
 WA_SENDER_API_PAT = WHATSAPP_CONFIG.get("WA_SENDER_API_PAT")
 WA_WEBHOOK_URL = WHATSAPP_CONFIG.get("WA_WEBHOOK_URL")
+# Bulk sending limits, tune these to the provider plan (defaults match one message every 5 seconds)
+WA_SEND_RATE_PER_SECOND = float(WHATSAPP_CONFIG.get("SEND_RATE_PER_SECOND", 0.2))
+WA_SEND_BURST = int(WHATSAPP_CONFIG.get("SEND_BURST", 1))
+WA_SEND_CONCURRENCY = int(WHATSAPP_CONFIG.get("SEND_CONCURRENCY", 4))
+WA_SEND_MAX_RETRIES = int(WHATSAPP_CONFIG.get("SEND_MAX_RETRIES", 3))
+WA_SEND_RETRY_BASE_SECONDS = float(WHATSAPP_CONFIG.get("SEND_RETRY_BASE_SECONDS", 2))
 
 # WKHTML configuration
 WKHTML_CONFIG = SYSTEM_SECRETS.get("WKHTML", None)
@@ -110,5 +127,35 @@ if not WKHTML_CONFIG:
     raise RuntimeError("WKHTML configuration not found")
 WKHTMLTOPDF_BIN = WKHTML_CONFIG.get("WKHTMLTOPDF_BIN")
 WKHTMLTOIMAGE_BIN = WKHTML_CONFIG.get("WKHTMLTOIMAGE_BIN")
+# "chromium" keeps warm headless renderers, "wkhtml" spawns wkhtmltox per render.
+# chromium needs the browser installed once per machine/image: playwright install chromium
+RENDERER_BACKEND = WKHTML_CONFIG.get("RENDERER_BACKEND", "wkhtml")
+RENDERER_POOL_SIZE = int(WKHTML_CONFIG.get("RENDERER_POOL_SIZE", 2))
+
+# Bill render cache configuration (optional)
+RENDER_CACHE_CONFIG = SYSTEM_SECRETS.get("RENDER_CACHE", {})
+RENDER_CACHE_ENABLED = RENDER_CACHE_CONFIG.get("ENABLED", True)
+RENDER_CACHE_DIR = RENDER_CACHE_CONFIG.get("DIR", os.path.join(tempfile.gettempdir(), "bill-render-cache"))
+RENDER_CACHE_MAX_MB = int(RENDER_CACHE_CONFIG.get("MAX_MB", 512))
+RENDER_CACHE_USE_GCS = RENDER_CACHE_CONFIG.get("USE_GCS", False)
+
+# Scanning configuration (optional)
+SCANNING_CONFIG = SYSTEM_SECRETS.get("SCANNING", {})
+SCAN_BATCH_MAX_SIZE = int(SCANNING_CONFIG.get("BATCH_MAX_SIZE", 8))
+SCAN_BATCH_MAX_WAIT_MS = float(SCANNING_CONFIG.get("BATCH_MAX_WAIT_MS", 5))
+# 0 runs scans in threads of the API process, N > 0 starts N dedicated scanning processes
+SCAN_WORKER_PROCESSES = int(SCANNING_CONFIG.get("WORKER_PROCESSES", 0))
+# fp32, optimized or int8, prepared with scripts/prepareScanModels.py
+SCAN_MODEL_VARIANT = SCANNING_CONFIG.get("MODEL_VARIANT", "fp32")
+# eager loads models at startup, background right after it, lazy on the first scan,
+# disabled never (scans are served by dedicated scanning nodes)
+SCAN_MODEL_LOADING = SCANNING_CONFIG.get("MODEL_LOADING", "eager")
+# Large JPEGs are decoded at 1/2, 1/4 or 1/8 size while their long side stays above this (0 disables)
+SCAN_DECODE_MIN_SIDE = int(SCANNING_CONFIG.get("DECODE_MIN_SIDE", 1280))
+# Scan results, staged images and scan tokens are cached for this long
+SCAN_CACHE_TTL_SECONDS = int(SCANNING_CONFIG.get("CACHE_TTL_SECONDS", 1800))
+# Offline bulk scans: images per batch, and images scanned and staged per round
+SCAN_BULK_MAX_IMAGES = int(SCANNING_CONFIG.get("BULK_MAX_IMAGES", 1000))
+SCAN_BULK_CHUNK_SIZE = int(SCANNING_CONFIG.get("BULK_CHUNK_SIZE", 32))
 
 logger.info("Configuration loaded successfully.")
@@ -0,0 +1,219 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+from globals.config.config import RATE_LIMIT_FALLBACK_MAX_KEYS
+
+
+# (window name, seconds, ROUTE_CONFIG rate_limit field), checked in this order
+RATE_LIMIT_WINDOWS = (
+    ("minute", 60, "requests_per_minute"),
+    ("hour", 3600, "requests_per_hour"),
+    ("day", 86400, "requests_per_day"),
+)
+
+
+# GCRA over every window in one atomic call. The key is a hash holding one theoretical
+# arrival time (TAT, milliseconds) per window, so memory stays constant per client and route
+# however many requests it makes. A request is admitted only if every window admits it;
+# otherwise nothing is updated. Time comes from the Redis server so all app instances agree.
+#
+# TATs are stored at full double precision and compared with a small tolerance, so the
+# float rounding of limit / period never denies the last request of a burst.
+#
+# ARGV: window count, then (field, period_ms, limit) per window
+# Returns: {allowed, remaining, retry_after_ms, index of the limiting window (1-based)}
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+
+local count = tonumber(ARGV[1])
+local fields = {}
+for i = 1, count do
+    fields[i] = ARGV[2 + (i - 1) * 3]
+end
+local stored = redis.call('HMGET', KEYS[1], unpack(fields))
+
+local new_tats = {}
+local remaining = -1
+local remaining_index = 1
+local retry_after = 0
+local denied_index = 0
+local max_period = 0
+local tolerance = 0.01
+
+for i = 1, count do
+    local base = 2 + (i - 1) * 3
+    local period = tonumber(ARGV[base + 1])
+    local limit = tonumber(ARGV[base + 2])
+    local interval = period / limit
+
+    local tat = tonumber(stored[i]) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - period
+
+    if allow_at - now > tolerance then
+        local wait = math.ceil(allow_at - now)
+        if wait > retry_after then
+            retry_after = wait
+            denied_index = i
+        end
+    else
+        new_tats[i] = new_tat
+        local window_remaining = math.floor((now - allow_at + tolerance) / interval)
+        if remaining < 0 or window_remaining < remaining then
+            remaining = window_remaining
+            remaining_index = i
+        end
+    end
+
+    if period > max_period then
+        max_period = period
+    end
+end
+
+if denied_index > 0 then
+    return {0, 0, retry_after, denied_index}
+end
+
+for i = 1, count do
+    redis.call('HSET', KEYS[1], fields[i], string.format('%.17g', new_tats[i]))
+end
+redis.call('PEXPIRE', KEYS[1], max_period)
+
+return {1, remaining, 0, remaining_index}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Rate limiter for ROUTE_CONFIG limits: minute, hour and day windows evaluated atomically
+    in a single Lua call (GCRA), one small hash per key.
+
+    Each window admits a burst of up to its limit and then refills at limit / window, so a
+    client can never exceed the limit within any window-long span. Unlike one sorted-set
+    member per request, requests arriving in the same second are all counted.
+    """
+
+    def __init__(self, windows=RATE_LIMIT_WINDOWS):
+        self.windows = windows
+        # Registered scripts per client, EVALSHA with automatic SCRIPT LOAD on NOSCRIPT
+        self._scripts = {}
+
+    def _script(self, redis_client):
+        script = self._scripts.get(id(redis_client))
+        if script is None:
+            script = redis_client.register_script(GCRA_SCRIPT)
+            self._scripts[id(redis_client)] = script
+        return script
+
+    def _args(self, limits: Dict[str, int]) -> list:
+        args = [len(self.windows)]
+        for window_name, seconds, limit_field in self.windows:
+            args.extend((window_name, seconds * 1000, limits[limit_field]))
+        return args
+
+    async def check(self, redis_client, key: str, limits: Dict[str, int]) -> Tuple[bool, Dict]:
+        """(allowed, info) for one request; raises on Redis errors so the caller picks the fallback"""
+        allowed, remaining, retry_after_ms, window_index = await self._script(redis_client)(
+            keys=[key],
+            args=self._args(limits)
+        )
+
+        window_name, _, limit_field = self.windows[int(window_index) - 1]
+        limit = limits[limit_field]
+
+        if not int(allowed):
+            return False, {
+                "allowed": False,
+                "limit": limit,
+                "current": limit,
+                "window": window_name,
+                "retry_after": max(1, math.ceil(int(retry_after_ms) / 1000))
+            }
+
+        return True, {
+            "allowed": True,
+            "limit": limit,
+            "window": window_name,
+            "remaining": max(0, int(remaining))
+        }
+
+
+class LocalRateLimiter:
+    """
+    In-process GCRA with the same windows and results as RedisRateLimiter, used while Redis
+    is unavailable so rate limiting keeps working through an outage.
+
+    It is approximate: every API process counts on its own, so a client spread across N
+    processes gets up to N times the limit, and state starts empty when it takes over.
+    Keys are kept in LRU order and capped at max_keys.
+    """
+
+    def __init__(self, windows=RATE_LIMIT_WINDOWS, max_keys: int = RATE_LIMIT_FALLBACK_MAX_KEYS):
+        self.windows = windows
+        self.max_keys = max_keys
+        self._tats: "OrderedDict[str, list]" = OrderedDict()
+        self.checks = 0
+        self.denied = 0
+
+    def check(self, key: str, limits: Dict[str, int]) -> Tuple[bool, Dict]:
+        now = time.monotonic() * 1000
+        self.checks += 1
+
+        tats = self._tats.get(key)
+        if tats is None:
+            tats = [now] * len(self.windows)
+            self._tats[key] = tats
+            if len(self._tats) > self.max_keys:
+                self._tats.popitem(last=False)
+        else:
+            self._tats.move_to_end(key)
+
+        new_tats = []
+        remaining, remaining_index = -1, 0
+        retry_after, denied_index = 0, -1
+        for i, (_, seconds, limit_field) in enumerate(self.windows):
+            period = seconds * 1000
+            interval = period / limits[limit_field]
+            new_tat = max(tats[i], now) + interval
+            allow_at = new_tat - period
+
+            if allow_at - now > 0.01:
+                if allow_at - now > retry_after:
+                    retry_after, denied_index = allow_at - now, i
+            else:
+                new_tats.append(new_tat)
+                window_remaining = math.floor((now - allow_at + 0.01) / interval)
+                if remaining < 0 or window_remaining < remaining:
+                    remaining, remaining_index = window_remaining, i
+
+        if denied_index >= 0:
+            self.denied += 1
+            window_name, _, limit_field = self.windows[denied_index]
+            return False, {
+                "allowed": False,
+                "limit": limits[limit_field],
+                "current": limits[limit_field],
+                "window": window_name,
+                "retry_after": max(1, math.ceil(retry_after / 1000))
+            }
+
+        tats[:] = new_tats
+        window_name, _, limit_field = self.windows[remaining_index]
+        return True, {
+            "allowed": True,
+            "limit": limits[limit_field],
+            "window": window_name,
+            "remaining": max(0, remaining)
+        }
+
+    def stats(self) -> dict:
+        return {"keys": len(self._tats), "max_keys": self.max_keys, "checks": self.checks, "denied": self.denied}
+
+
+local_rate_limiter = LocalRateLimiter()
@@ -0,0 +1,79 @@
+from typing import Dict, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ("static", "param", "route", "min_order")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        # (order, config, pattern) of the route ending at this node
+        self.route: Optional[Tuple[int, Dict, str]] = None
+        # Lowest definition order of any route in this subtree, used to prune the search
+        self.min_order = float("inf")
+
+
+class RouteMatcher:
+    """
+    ROUTE_CONFIG compiled into a per-method segment trie.
+
+    match() returns the route config together with its canonical path (the pattern for
+    parameterized routes), in one lookup. Static paths are a dict hit; parameterized paths
+    walk one trie level per segment instead of testing every pattern. When several patterns
+    match the same path, the one defined first in ROUTE_CONFIG wins, as with the previous
+    linear scan.
+    """
+
+    def __init__(self, route_config: Dict[str, Dict]):
+        self.exact: Dict[str, Dict[str, Tuple[Dict, str]]] = {}
+        self.roots: Dict[str, _Node] = {}
+
+        for order, (route_key, config) in enumerate(route_config.items()):
+            method, path = route_key.split(":", 1)
+            if "{" not in path:
+                self.exact.setdefault(method, {})[path] = (config, path)
+                continue
+
+            node = self.roots.setdefault(method, _Node())
+            node.min_order = min(node.min_order, order)
+            for part in path.strip("/").split("/"):
+                if part.startswith("{") and part.endswith("}"):
+                    if node.param is None:
+                        node.param = _Node()
+                    node = node.param
+                else:
+                    node = node.static.setdefault(part, _Node())
+                node.min_order = min(node.min_order, order)
+            if node.route is None:
+                node.route = (order, config, path)
+
+    def match(self, method: str, path: str) -> Optional[Tuple[Dict, str]]:
+        """(route config, canonical path) for a request, or None when no route is configured"""
+        exact = self.exact.get(method)
+        if exact is not None:
+            route = exact.get(path)
+            if route is not None:
+                return route
+
+        root = self.roots.get(method)
+        if root is None:
+            return None
+
+        found = self._search(root, path.strip("/").split("/"), 0, None)
+        return (found[1], found[2]) if found else None
+
+    def _search(self, node: _Node, parts: list, index: int, best):
+        if best is not None and node.min_order >= best[0]:
+            return best
+        if index == len(parts):
+            route = node.route
+            if route is not None and (best is None or route[0] < best[0]):
+                return route
+            return best
+
+        child = node.static.get(parts[index])
+        if child is not None:
+            best = self._search(child, parts, index + 1, best)
+        if node.param is not None:
+            best = self._search(node.param, parts, index + 1, best)
+        return best
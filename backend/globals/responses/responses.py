@@ -147,4 +147,17 @@ def too_many_requests_error_response(message: str = "Too Many Requests"):
             "Access-Control-Allow-Origin": FRONT_END_URL,
             "Access-Control-Allow-Credentials": "true",
         }
-    )
\ No newline at end of file
+    )
+
+
+def service_unavailable_error_response(message: str = "Service Unavailable", data=None):
+    response = RequestResponse(
+        message=message,
+        data=data,
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        timeStamp=get_utc_timestamp()
+    )
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=response.model_dump()
+    )
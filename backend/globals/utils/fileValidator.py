@@ -80,7 +80,8 @@ class FileValidator:
                     )
             
             try:
-                file_contents = await file.read()
+                # Only probe for content; reading the whole upload here would copy it
+                file_contents = await file.read(1)
                 if len(file_contents) == 0:
                     raise ValidationError(
                         message="File appears to be empty or corrupted.",
@@ -159,4 +160,14 @@ class FileValidationConfigs:
         ],
         "allowed_extensions": ["zip", "rar", "7z"],
         "max_file_size": 100 * 1024 * 1024  # 100 MB
+    }
+
+
+    SCAN_ARCHIVES = {
+        "allowed_content_types": [
+            "application/zip",
+            "application/x-zip-compressed"
+        ],
+        "allowed_extensions": ["zip"],
+        "max_file_size": 500 * 1024 * 1024  # 500 MB
     }
\ No newline at end of file
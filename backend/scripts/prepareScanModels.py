@@ -0,0 +1,126 @@
+"""
+Prepare the optimized and INT8 variants of the scanning models.
+
+For the YOLO detector and the OCR recognizer this writes, next to each original model:
+    <name>.optimized.onnx  graph optimizations applied offline (fusions, constant folding)
+    <name>.int8.onnx       INT8 quantized weights
+
+The detector is quantized statically (QDQ) when --calibration-images points to a folder of
+meter photos, which is what convolutional models need to keep their accuracy; without it it
+falls back to dynamic quantization. The recognizer is quantized dynamically. Select the
+variant with SCANNING.MODEL_VARIANT and compare them with benchmarks/scanModelVariantsBenchmark.py.
+
+    python -m scripts.prepareScanModels --calibration-images ./samples
+"""
+import argparse
+import os
+import random
+import tempfile
+
+import cv2
+import onnxruntime as ort
+import yaml
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from src.readings.services.scanModelVariants import variant_model_path
+from src.readings.services.scanningServiceV2 import ScanningService
+
+
+MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src/readings/models"))
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+class MeterCalibrationReader(CalibrationDataReader):
+    """Feeds letterboxed meter photos to the static quantizer, same preprocessing as a scan"""
+
+    def __init__(self, folder: str, input_name: str, input_size: tuple, limit: int):
+        names = [name for name in sorted(os.listdir(folder)) if name.lower().endswith(IMAGE_EXTENSIONS)]
+        random.Random(0).shuffle(names)
+        self.paths = [os.path.join(folder, name) for name in names[:limit]]
+        self.input_name = input_name
+
+        # Only preprocess() is needed, so skip model loading
+        self.preprocessor = ScanningService.__new__(ScanningService)
+        self.preprocessor.in_h, self.preprocessor.in_w = input_size
+        self._iter = iter(self.paths)
+
+    def get_next(self):
+        for path in self._iter:
+            image = cv2.imread(path, cv2.IMREAD_COLOR)
+            if image is None:
+                continue
+            tensor, _, _ = self.preprocessor.preprocess(image)
+            return {self.input_name: tensor}
+        return None
+
+
+def optimize(model_path: str):
+    output_path = variant_model_path(model_path, "optimized")
+    session_options = ort.SessionOptions()
+    # Extended rather than all: layout transforms are specific to the CPU they run on
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    session_options.optimized_model_filepath = output_path
+    ort.InferenceSession(model_path, sess_options=session_options, providers=["CPUExecutionProvider"])
+    print(f"optimized: {output_path}")
+
+
+def quantize(model_path: str, calibration_images: str = None, calibration_size: int = 100):
+    output_path = variant_model_path(model_path, "int8")
+    with tempfile.TemporaryDirectory() as tmp:
+        # Shape inference and graph cleanup the quantizer expects
+        prepared_path = os.path.join(tmp, "prepared.onnx")
+        quant_pre_process(model_path, prepared_path, skip_optimization=False)
+
+        if calibration_images:
+            session = ort.InferenceSession(prepared_path, providers=["CPUExecutionProvider"])
+            model_input = session.get_inputs()[0]
+            _, _, h, w = model_input.shape
+            reader = MeterCalibrationReader(calibration_images, model_input.name, (int(h), int(w)), calibration_size)
+            quantize_static(
+                prepared_path,
+                output_path,
+                reader,
+                quant_format=QuantFormat.QDQ,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                per_channel=True,
+            )
+            print(f"int8 (static, {len(reader.paths)} calibration images): {output_path}")
+        else:
+            quantize_dynamic(prepared_path, output_path, weight_type=QuantType.QInt8)
+            print(f"int8 (dynamic): {output_path}")
+
+
+def ocr_rec_model_path() -> str:
+    with open(os.path.join(MODELS_DIR, "ocr", "config.yml"), "r") as f:
+        return yaml.safe_load(f)["Rec"]["model_path"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calibration-images", help="folder of meter photos for static detector quantization")
+    parser.add_argument("--calibration-size", type=int, default=100, help="calibration images to use")
+    parser.add_argument("--skip-detector", action="store_true")
+    parser.add_argument("--skip-recognizer", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_detector:
+        detector_path = os.path.join(MODELS_DIR, "yolo", "best.onnx")
+        optimize(detector_path)
+        quantize(detector_path, args.calibration_images, args.calibration_size)
+
+    if not args.skip_recognizer:
+        recognizer_path = ocr_rec_model_path()
+        optimize(recognizer_path)
+        quantize(recognizer_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -81,4 +81,12 @@ async def verify_otp(
     auth_service: AuthService = Depends(get_auth_service),
     session: AsyncSession = Depends(get_async_session)
 ):
-    return await auth_service.verify_otp(request, session)
\ No newline at end of file
+    return await auth_service.verify_otp(request, session)
+
+
+@auth_router.get('/rate-limiter/status')
+async def get_rate_limiter_status(
+    request: Request,
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    return await auth_service.get_rate_limiter_status(request)
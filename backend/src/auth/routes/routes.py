@@ -11,7 +11,8 @@ from src.auth.routers.authRouter import(
     validate_token,
     reset_password,
     send_otp,
-    verify_otp
+    verify_otp,
+    get_rate_limiter_status
 )
 
 from src.users.routers.usersRouter import (
@@ -59,7 +60,11 @@ from src.readings.routers.readingsRouter import (
     search_readings,
     get_readings_summary,
     scan_reading,
-    verify_all_readings
+    verify_all_readings,
+    get_scanning_stats,
+    get_scanning_readiness,
+    bulk_scan_readings,
+    get_bulk_scan_report
 )
 
 from src.bills.routers.billsRouter import (
@@ -102,6 +107,7 @@ from src.templates.routers.templatesRouter import (
 
 from src.messages.routers.messagesRouter import (
     send_messages,
+    get_campaign_progress,
 )
 
 from src.celery.router import (
@@ -195,6 +201,14 @@ def create_routes_config():
             "roles": {"admin", "system", "user"},
             "rate_limit": {"requests_per_minute": 5, "requests_per_hour": 20, "requests_per_day": 50}
         },
+        {
+            "path": "/billing-system/api/v1/auth/rate-limiter/status",
+            "method": "GET",
+            "public": False,
+            "endpoint": get_rate_limiter_status,
+            "roles": {"admin", "system"},
+            "rate_limit": {"requests_per_minute": 60, "requests_per_hour": 1000, "requests_per_day": 10000}
+        },
         # User routes
         {            
             "path": "/billing-system/api/v1/users/search",
@@ -489,6 +503,38 @@ def create_routes_config():
             "roles": {"user", "admin", "system"},
             "rate_limit": {"requests_per_minute": 100, "requests_per_hour": 10000, "requests_per_day": 100000}
         },
+        {
+            "path":"/billing-system/api/v1/readings/scanning/stats",
+            "method": "GET",
+            "endpoint": get_scanning_stats,
+            "public": False,
+            "roles": {"admin", "system"},
+            "rate_limit": {"requests_per_minute": 30, "requests_per_hour": 600, "requests_per_day": 5000}
+        },
+        {
+            "path":"/billing-system/api/v1/readings/scanning/ready",
+            "method": "GET",
+            "endpoint": get_scanning_readiness,
+            "public": True,
+            "roles": {"admin", "system", "user"},
+            "rate_limit": {"requests_per_minute": 120, "requests_per_hour": 7200, "requests_per_day": 172800}
+        },
+        {
+            "path":"/billing-system/api/v1/readings/scan/bulk",
+            "method": "POST",
+            "endpoint": bulk_scan_readings,
+            "public": False,
+            "roles": {"user", "admin", "system"},
+            "rate_limit": {"requests_per_minute": 5, "requests_per_hour": 30, "requests_per_day": 200}
+        },
+        {
+            "path":"/billing-system/api/v1/readings/scan/bulk/{batch_id}",
+            "method": "GET",
+            "endpoint": get_bulk_scan_report,
+            "public": False,
+            "roles": {"user", "admin", "system"},
+            "rate_limit": {"requests_per_minute": 30, "requests_per_hour": 600, "requests_per_day": 5000}
+        },
         {
             "path":"/billing-system/api/v1/readings/verify-all",
             "method": "POST",
@@ -646,6 +692,14 @@ def create_routes_config():
             "roles": {"admin", "system"},
             "rate_limit": {"requests_per_minute": 10, "requests_per_hour": 100, "requests_per_day": 1000}
         },
+        {
+            "path": "/billing-system/api/v1/messages/campaigns/{campaign_id}/progress",
+            "method": "GET",
+            "endpoint": get_campaign_progress,
+            "public": False,
+            "roles": {"admin", "system"},
+            "rate_limit": {"requests_per_minute": 30, "requests_per_hour": 600, "requests_per_day": 5000}
+        },
         # Whatsapp Session Routes
         {
             "path": "/billing-system/api/v1/session/create",
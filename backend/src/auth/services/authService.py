@@ -24,6 +24,9 @@ from src.auth.exceptions.exceptions import (
     ErrorSendingOTP
 )
 from src.auth.services.otpService import OTPService
+from src.auth.services.jwtService import JWTService
+from db.redis.circuitBreaker import redis_breaker
+from globals.middlewares.rateLimiter import local_rate_limiter
 from src.messages.queries.whatsAppSessionQueries import WhatsAppSessionQueries
 
 from src.messages.exceptions.exceptions import (
@@ -106,6 +109,10 @@ class AuthService:
                 user_id=user.get('user_id'),
                 device_id=user.get('device_id')
             )
+            JWTService.revoke_access_token(
+                token=request.cookies.get("access_token"),
+                exp=user.get('exp')
+            )
             response = success_response(
                 message="Logged Out Successfully",
                 data=[]
@@ -338,3 +345,19 @@ class AuthService:
                 message="An error occurred while verifying the OTP."
             )
 
+
+    async def get_rate_limiter_status(self, request: Request):
+        try:
+            return success_response(
+                message="Rate limiter status retrieved successfully.",
+                data={
+                    "backend": "redis" if redis_breaker.state == redis_breaker.CLOSED else "in_process",
+                    "redis_circuit": redis_breaker.stats(),
+                    "in_process_limiter": local_rate_limiter.stats()
+                }
+            )
+        except Exception as e:
+            logger.error(f"Error in get_rate_limiter_status: {str(e)}")
+            raise InternalServerError(
+                message="An error occurred while retrieving the rate limiter status."
+            )
@@ -7,11 +7,13 @@ from globals.config.config import (
 )
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
+from typing import Optional
 import uuid
 
 from globals.exceptions.global_exceptions import (
     UnauthorizedError
 )
+from src.auth.services.tokenCache import token_digest, verified_token_cache
 
 class JWTService: 
     def __init__(self):
@@ -94,14 +96,27 @@ class JWTService:
             )
         
         
+    @classmethod
+    def get_verified_access_token(cls, token: Optional[str]) -> Optional[dict]:
+        """Claims of an access token verified earlier and not yet expired, without decoding it"""
+        if not token:
+            return None
+        return verified_token_cache.get(token_digest(token))
+
+
     @classmethod
     def verify_access_token(cls, token: str):
         try:
+            digest = token_digest(token)
+            if verified_token_cache.is_revoked(digest):
+                raise UnauthorizedError(message="Token has been revoked.")
+
             decoded_jwt = cls.decode_token(token)
             if decoded_jwt.get("type") != "access":
                 raise UnauthorizedError(
                     message="Invalid access token type."
                     )
+            verified_token_cache.put(digest, decoded_jwt)
             logger.info(f"Access token verified successfully for user: {decoded_jwt.get('username')}")
             return decoded_jwt
         
@@ -109,6 +124,18 @@ class JWTService:
             logger.error(f"Unexpected error during access token verification: {e}")
             raise 
 
+    @classmethod
+    def revoke_access_token(cls, token: Optional[str], exp: Optional[float]):
+        """Stop serving an access token from the verified cache and reject it until it expires"""
+        if not token:
+            return
+        expires_at = exp if exp is not None else (
+            datetime.now(timezone.utc) + timedelta(minutes=JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+        ).timestamp()
+        verified_token_cache.revoke(token_digest(token), expires_at)
+        logger.info("Access token revoked.")
+
+
     @classmethod
     def verify_refresh_token(cls, token: str):
         try:
@@ -0,0 +1,87 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from globals.config.config import JWT_VERIFIED_CACHE_SIZE
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+class VerifiedTokenCache:
+    """
+    Per-process LRU of access tokens that already passed signature and claim verification,
+    keyed by the SHA-256 of the token so raw tokens are not kept in memory.
+
+    An entry is served until the token's exp and never after it. Tokens revoked on logout
+    are dropped and remembered until their exp, so this process rejects them instead of
+    verifying and caching them again. Revocations are not shared between processes.
+    """
+
+    def __init__(self, max_size: int = JWT_VERIFIED_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._revoked: "OrderedDict[bytes, float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: bytes) -> Optional[dict]:
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        claims, exp = entry
+        if exp <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        # Callers attach the claims to request.state, keep the cached copy untouched
+        return dict(claims)
+
+    def put(self, digest: bytes, claims: dict):
+        exp = claims.get("exp")
+        if self.max_size <= 0 or exp is None:
+            return
+        self._entries[digest] = (dict(claims), float(exp))
+        self._entries.move_to_end(digest)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_revoked(self, digest: bytes) -> bool:
+        exp = self._revoked.get(digest)
+        if exp is None:
+            return False
+        if exp <= time.time():
+            del self._revoked[digest]
+            return False
+        return True
+
+    def revoke(self, digest: bytes, exp: float):
+        self._entries.pop(digest, None)
+        self._revoked[digest] = float(exp)
+        self._revoked.move_to_end(digest)
+        # Revocations are kept even with the cache disabled
+        if len(self._revoked) > max(self.max_size, 1000):
+            self._revoked.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._revoked.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "revoked": len(self._revoked),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+verified_token_cache = VerifiedTokenCache()
@@ -1,7 +1,9 @@
 from db.postgres.tables import bills
 from globals.utils.logger import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update, select, func, delete, or_, and_, text, case, cast, Integer
+from sqlalchemy.orm import Session
+from sqlalchemy import update, select, func, delete, or_, and_, text, case, cast, Integer, Numeric, Float, String, literal, exists, values, column
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
 from db.postgres.tables.bills import Bills
 from db.postgres.tables.readings import Readings
 from db.postgres.tables.packages import Packages
@@ -12,8 +14,8 @@ from db.postgres.tables.fixes import Fixes
 from db.postgres.tables.payments import Payments
 from datetime import datetime, timedelta, timezone
 from collections import defaultdict
-from typing import Dict, List
-from uuid import uuid4
+from typing import Dict, Iterator, List
+from uuid import uuid4, UUID
 from globals.utils.timezoneHelper import TimezoneHelper
 from src.bills.exceptions.exceptions import (
     BillNotFoundError,
@@ -551,80 +553,469 @@ class BillsQueries:
             raise
 
 
-    async def get_bills_full_data_for_due_date(self, session: AsyncSession, billing_date: str, bill_ids: list=None, rate_id: str = None) -> List[Dict]:
-        """Return full payload for all bills with the given due_date."""
+    async def generate_bills_bulk(self, session: AsyncSession, creator_id: str, billing_date: str, rate_id:str, force_missing_meter: bool = False, force_unverified_readings: bool = False):
+        """
+        Set-based variant of generate_bills.
+        Metrics are computed with aggregate queries and all bills for the period are
+        created by a single INSERT ... SELECT, so no meter or reading rows are loaded into Python.
+        """
+        metrics = {
+            "total_active_meters": 0,
+            "fixed_package_meters": 0,
+            "usage_based_meters": 0,
+            "meters_with_readings": 0,
+            "verified_readings": 0,
+            "unverified_readings": 0,
+            "meters_without_readings": 0,
+            "bills_created": 0,
+            "bills_already_exist": 0,
+            "skipped_meters": 0,
+            "errors": []
+        }
         try:
+            logger.info(f"Starting bulk bill generation process, creator_id: {creator_id}, force_missing_meter: {force_missing_meter}, force_unverified_readings: {force_unverified_readings}")
 
             year, month = map(int, billing_date.split('-'))
-            bill_year=year if month < 12 else year + 1
-            bill_month=month + 1 if month < 12 else 1
             due_date = date(
-                year=bill_year, 
-                month=bill_month, 
+                year=year if month < 12 else year + 1,
+                month=month + 1 if month < 12 else 1,
                 day=1
                 )
-            
-            if rate_id is None:
-                rates = await self.rates_queries.get_rates_by_date(
-                    date_input=billing_date,
-                    session=session
+            start_date = date(year, month, 6)
+            end_date = date(due_date.year, due_date.month, 5)
+
+            # Active meters that still need a bill for this due date
+            meters_needing_bills = (
+                select(Meters.meter_id, Meters.package_type)
+                .where(
+                    Meters.status == "active",
+                    ~exists().where(Bills.meter_id == Meters.meter_id, Bills.due_date == due_date)
                 )
+                .subquery("meters_needing_bills")
+            )
 
-            else:
-                rates = await self.rates_queries.get_rates_by_id(
-                    rate_id=rate_id,
-                    session=session
+            meters_counts = await session.execute(
+                select(
+                    select(func.count()).select_from(Meters).where(Meters.status == "active").scalar_subquery().label("total_active_meters"),
+                    select(func.count(func.distinct(Bills.meter_id))).where(Bills.due_date == due_date, Bills.meter_id.is_not(None)).scalar_subquery().label("bills_already_exist"),
+                    select(func.count()).select_from(meters_needing_bills).scalar_subquery().label("meters_needing_bills"),
+                    select(func.count()).select_from(meters_needing_bills).where(meters_needing_bills.c.package_type == "fixed").scalar_subquery().label("fixed_package_meters"),
+                    select(func.count()).select_from(meters_needing_bills).where(meters_needing_bills.c.package_type == "usage").scalar_subquery().label("usage_based_meters"),
                 )
-            if not rates:
-                logger.error("Rates not found.")
-                raise RateNotFoundError()
+            )
+            meters_counts = meters_counts.one()
+
+            metrics["total_active_meters"] = meters_counts.total_active_meters
+            metrics["bills_already_exist"] = meters_counts.bills_already_exist
+            metrics["fixed_package_meters"] = meters_counts.fixed_package_meters
+            metrics["usage_based_meters"] = meters_counts.usage_based_meters
+            logger.info(f"Found {metrics['total_active_meters']} active meters, {metrics['bills_already_exist']} existing bills for due date {due_date}")
+
+            if not metrics["total_active_meters"]:
+                logger.error("No active meters found.")
+                raise NoActiveMetersError()
+
+            if not meters_counts.meters_needing_bills:
+                logger.info("All active meters already have bills for this period")
+                return {
+                    "success": True,
+                    "message": f"All bills already exist for {year}-{month:02d}",
+                    "metrics": metrics,
+                    "billing_period": f"{year}-{month:02d}",
+                    "due_date": due_date.isoformat(),
+                }
 
-            unpaid_bills_query = await session.execute(
+            logger.info(f"Fetching readings statistics between {start_date} and {end_date}")
+            readings_counts = await session.execute(
                 select(
-                    Bills.meter_id,
-                    func.sum(Bills.amount_due_lbp - Bills.total_paid_lbp).label('total_unpaid_lbp'),
-                    func.sum(Bills.amount_due_usd - Bills.total_paid_usd).label('total_unpaid_usd')
+                    func.count(func.distinct(Readings.meter_id)).label("meters_with_readings"),
+                    func.count().filter(Readings.status == "verified").label("verified_readings"),
+                    func.count().filter(Readings.status == "pending").label("unverified_readings"),
+                    func.count().label("total_readings"),
                 )
+                .select_from(Readings)
+                .join(meters_needing_bills, Readings.meter_id == meters_needing_bills.c.meter_id)
                 .where(
-                    and_(
-                        Bills.due_date < due_date,
-                        Bills.status.in_(['unpaid', 'partially_paid'])  # Only unpaid bills
-                    )
+                    meters_needing_bills.c.package_type == "usage",
+                    Readings.reading_date >= start_date,
+                    Readings.reading_date <= end_date
                 )
-                .group_by(Bills.meter_id)
             )
+            readings_counts = readings_counts.one()
 
-            arrears_by_meter = {}
-            for row in unpaid_bills_query:
-                arrears_by_meter[row.meter_id] = {
-                    'total_unpaid_lbp': int(row.total_unpaid_lbp) if row.total_unpaid_lbp else 0.0,
-                    'total_unpaid_usd': int(row.total_unpaid_usd) if row.total_unpaid_usd else 0.0
+            metrics["meters_with_readings"] = readings_counts.meters_with_readings
+            metrics["meters_without_readings"] = metrics["usage_based_meters"] - readings_counts.meters_with_readings
+            metrics["verified_readings"] = readings_counts.verified_readings
+            metrics["unverified_readings"] = readings_counts.unverified_readings
+            logger.info(f"Readings analysis: {metrics['verified_readings']} verified, "
+                    f"{metrics['unverified_readings']} unverified, "
+                    f"{metrics['meters_without_readings']} missing (usage-based only)")
+
+            if metrics["meters_without_readings"] > 0 and not force_missing_meter:
+                logger.error(f"Missing readings for {metrics['meters_without_readings']} usage-based meters")
+                return {
+                    "success": False,
+                    "message": f"Missing readings for {metrics['meters_without_readings']} usage-based meters for billing period {year}-{month:02d}",
+                    "metrics": metrics,
+                    "billing_period": f"{year}-{month:02d}",
+                    "due_date": due_date.isoformat(),
+                    "missing_meters_count": metrics["meters_without_readings"]
                 }
 
-            query = (
-                select(Bills, Meters, Areas, Packages, Readings)
-                .select_from(Bills)
-                .join(Meters, Bills.meter_id == Meters.meter_id)
-                .join(Areas, Meters.area_id == Areas.area_id)
+            if metrics["usage_based_meters"] and not readings_counts.total_readings:
+                logger.error(f"No readings found for usage-based meters needing bills for date {year}-{month:02d}")
+                return {
+                    "success": False,
+                    "message": f"No readings found for usage-based meters for billing period {year}-{month:02d}",
+                    "metrics": metrics,
+                    "billing_period": f"{year}-{month:02d}",
+                    "due_date": due_date.isoformat(),
+                    "missing_meters_count": metrics["usage_based_meters"],
+                }
+
+            if metrics["usage_based_meters"] and not metrics["verified_readings"]:
+                logger.error(f"No verified readings found for usage-based meters needing bills for date {year}-{month:02d}")
+                return {
+                    "success": False,
+                    "message": f"No verified readings found for usage-based meters for billing period {year}-{month:02d}",
+                    "metrics": metrics,
+                    "billing_period": f"{year}-{month:02d}",
+                    "due_date": due_date.isoformat(),
+                    "unverified_readings_count": metrics["unverified_readings"],
+                }
+
+            if metrics["unverified_readings"] and not force_unverified_readings:
+                logger.error(f"Found {metrics['unverified_readings']} unverified readings for billing period {year}-{month:02d}")
+                return {
+                    "success": False,
+                    "message": f"Found {metrics['unverified_readings']} unverified readings for billing period {year}-{month:02d}",
+                    "metrics": metrics,
+                    "billing_period": f"{year}-{month:02d}",
+                    "due_date": due_date.isoformat(),
+                    "unverified_readings_count": metrics["unverified_readings"]
+                }
+
+            logger.info("Fetching current rates...")
+            rates = await self.rates_queries.get_rates_by_id(
+                rate_id=rate_id,
+                session=session
+                )
+            dollar_rate = int(rates.get('dollar_rate'))
+
+            # One verified reading per usage meter for the period
+            verified_readings = (
+                select(Readings.meter_id, Readings.usage)
+                .where(
+                    Readings.status == "verified",
+                    Readings.reading_date >= start_date,
+                    Readings.reading_date <= end_date
+                )
+                .distinct(Readings.meter_id)
+                .order_by(Readings.meter_id, Readings.reading_date.desc())
+                .subquery("verified_readings")
+            )
+
+            fixes_totals = (
+                select(
+                    Fixes.meter_id,
+                    func.sum(func.trunc(Fixes.cost)).label("total_fix_cost")
+                )
+                .where(
+                    cast(func.extract("month", Fixes.fix_date), Integer) == month,
+                    cast(func.extract("year", Fixes.fix_date), Integer) == year
+                )
+                .group_by(Fixes.meter_id)
+                .subquery("fixes_totals")
+            )
+
+            fixes_cost_lbp = func.coalesce(fixes_totals.c.total_fix_cost, 0) * dollar_rate
+            kwh_rate = case(
+                (Areas.elevation < 700, int(rates.get('coastal_kwh_rate'))),
+                else_=int(rates.get('mountain_kwh_rate'))
+            )
+            amount_due_lbp = cast(
+                case(
+                    (Meters.package_type == "fixed", Packages.fixed_fee + fixes_cost_lbp),
+                    else_=func.coalesce(verified_readings.c.usage, 0) * kwh_rate + Packages.activation_fee + fixes_cost_lbp
+                ),
+                Integer
+            )
+            amount_due_usd = cast(func.round(cast(amount_due_lbp, Numeric) / dollar_rate, 2), Float)
+
+            billable_meters = (
+                select(
+                    func.gen_random_uuid(),
+                    Meters.meter_id,
+                    amount_due_lbp,
+                    amount_due_usd,
+                    literal(due_date),
+                    literal(UUID(str(creator_id)), PG_UUID(as_uuid=True)),
+                    literal(UUID(str(rate_id)), PG_UUID(as_uuid=True)),
+                    literal("unpaid"),
+                )
+                .select_from(Meters)
                 .join(Packages, Meters.package_id == Packages.package_id)
-                .outerjoin(
-                    Readings,
-                    and_(
-                        Readings.meter_id == Bills.meter_id,
-                        func.extract("month", Readings.reading_date) == month,
-                        func.extract("year", Readings.reading_date) == year,
-                        Readings.status == "verified",
+                .join(Areas, Meters.area_id == Areas.area_id)
+                .outerjoin(verified_readings, verified_readings.c.meter_id == Meters.meter_id)
+                .outerjoin(fixes_totals, fixes_totals.c.meter_id == Meters.meter_id)
+                .where(
+                    Meters.meter_id.in_(select(meters_needing_bills.c.meter_id)),
+                    or_(
+                        Meters.package_type == "fixed",
+                        and_(Meters.package_type == "usage", verified_readings.c.meter_id.is_not(None))
                     )
                 )
             )
-            if bill_ids is not None and len(bill_ids) > 0:
-                query = query.where(Bills.bill_id.in_(bill_ids))
-                logger.info(f"Filtering by {len(bill_ids)} specific bill IDs for billing period {year}-{month:02d}")
+
+            insert_bills = (
+                pg_insert(Bills)
+                .from_select(
+                    ["bill_id", "meter_id", "amount_due_lbp", "amount_due_usd", "due_date", "created_by", "rate_id", "status"],
+                    billable_meters,
+                    include_defaults=False
+                )
+                .on_conflict_do_nothing(constraint="uq_bill_identity")
+                .returning(Bills.bill_id)
+            )
+
+            logger.info("Inserting bills for all billable meters...")
+            try:
+                inserted = await session.execute(insert_bills)
+                generated_bill_ids = list(inserted.scalars().all())
+                await session.commit()
+                logger.info("Bills successfully saved to database")
+            except Exception as e:
+                await session.rollback()
+                logger.error(f"Error saving bills to database: {str(e)}")
+                raise
+
+            metrics["bills_created"] = len(generated_bill_ids)
+            metrics["skipped_meters"] = meters_counts.meters_needing_bills - metrics["bills_created"]
+            if not generated_bill_ids:
+                logger.warning("No new bills were created")
+
+            success_rate = (metrics["bills_created"] / meters_counts.meters_needing_bills) * 100
+            overall_completion = ((metrics["bills_created"] + metrics["bills_already_exist"]) / metrics["total_active_meters"]) * 100
+
+            logger.info("Bulk bill generation completed", extra={
+                "metrics": metrics,
+                "success_rate_percent": round(success_rate, 2),
+                "overall_completion_percent": round(overall_completion, 2),
+                "billing_period": f"{year}-{month:02d}",
+                "due_date": due_date.isoformat()
+            })
+
+            return {
+                "success": True,
+                "message": f"Generated {metrics['bills_created']} new bills for {year}-{month:02d}. {metrics['bills_already_exist']} bills already existed.",
+                "metrics": metrics,
+                "billing_period": f"{year}-{month:02d}",
+                "due_date": due_date.isoformat(),
+                "overall_completion_percent": round(overall_completion, 2),
+                "generated_bill_ids": generated_bill_ids
+            }
+
+        except (
+            RateNotFoundError,
+            NoActiveMetersError
+        ):
+            raise
+
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Unexpected error in generate_bills_bulk: {str(e)}", extra={"metrics": metrics})
+            raise
+
+
+    def _resolve_due_date(self, billing_date: str):
+        year, month = map(int, billing_date.split('-'))
+        due_date = date(
+            year=year if month < 12 else year + 1,
+            month=month + 1 if month < 12 else 1,
+            day=1
+            )
+        return year, month, due_date
+
+
+    def _arrears_query(self, due_date: date, meter_ids: list = None):
+        query = (
+            select(
+                Bills.meter_id,
+                func.sum(Bills.amount_due_lbp - Bills.total_paid_lbp).label('total_unpaid_lbp'),
+                func.sum(Bills.amount_due_usd - Bills.total_paid_usd).label('total_unpaid_usd')
+            )
+            .where(
+                and_(
+                    Bills.due_date < due_date,
+                    Bills.status.in_(['unpaid', 'partially_paid'])  # Only unpaid bills
+                )
+            )
+            .group_by(Bills.meter_id)
+        )
+        if meter_ids is not None:
+            query = query.where(Bills.meter_id.in_(meter_ids))
+        return query
+
+
+    def _bills_full_data_query(self, year: int, month: int, due_date: date, bill_ids: list = None):
+        query = (
+            select(Bills, Meters, Areas, Packages, Readings)
+            .select_from(Bills)
+            .join(Meters, Bills.meter_id == Meters.meter_id)
+            .join(Areas, Meters.area_id == Areas.area_id)
+            .join(Packages, Meters.package_id == Packages.package_id)
+            .outerjoin(
+                Readings,
+                and_(
+                    Readings.meter_id == Bills.meter_id,
+                    func.extract("month", Readings.reading_date) == month,
+                    func.extract("year", Readings.reading_date) == year,
+                    Readings.status == "verified",
+                )
+            )
+        )
+        if bill_ids is not None and len(bill_ids) > 0:
+            query = query.where(Bills.bill_id.in_(bill_ids))
+            logger.info(f"Filtering by {len(bill_ids)} specific bill IDs for billing period {year}-{month:02d}")
+        else:
+            query = query.where(Bills.due_date == due_date)
+            logger.info(f"Filtering by due_date: {due_date.isoformat()} for billing period {year}-{month:02d}")
+        return query
+
+
+    def _fixes_query(self, meter_ids: list, year: int, month: int):
+        return select(Fixes).where(
+            and_(
+                Fixes.meter_id.in_(meter_ids),
+                func.extract("month", Fixes.fix_date) == month,
+                func.extract("year", Fixes.fix_date) == year,
+            )
+        )
+
+
+    def _build_bills_full_data(self, rows, fixes, arrears_rows, rates: dict) -> List[Dict]:
+        arrears_by_meter = {}
+        for row in arrears_rows:
+            arrears_by_meter[row.meter_id] = {
+                'total_unpaid_lbp': int(row.total_unpaid_lbp) if row.total_unpaid_lbp else 0.0,
+                'total_unpaid_usd': int(row.total_unpaid_usd) if row.total_unpaid_usd else 0.0
+            }
+
+        fixes_by_meter = defaultdict(list)
+        for fx in fixes:
+            fixes_by_meter[fx.meter_id].append(fx)
+
+        result: List[Dict] = []
+        for row in rows:
+            bill, meter, area, package, reading = row
+            fx_list = fixes_by_meter.get(bill.meter_id, [])
+            total_fixes = sum(int(f.cost) for f in fx_list if f.cost)
+
+            # Common fields
+            bill_due_date_str = bill.due_date.strftime("%d/%m/%Y") if bill.due_date else None
+            amperage = int(package.amperage) if package.amperage is not None else None
+            meter_arrears = arrears_by_meter.get(bill.meter_id, {'total_unpaid_lbp': 0.0, 'total_unpaid_usd': 0.0})
+
+            if meter.package_type == "usage":
+                activation_fee = int(package.activation_fee) if package.activation_fee else 0.0
+                kwh_rate = int(rates.get('coastal_kwh_rate')) if (area.elevation is not None and area.elevation < 700) else int(rates.get('mountain_kwh_rate'))
+                reading_month = reading.reading_date.strftime("%m/%Y") if reading and reading.reading_date else None
+
+                total = (int(bill.amount_due_lbp) if bill.amount_due_lbp else 0.0) - total_fixes - activation_fee
+
+                item = {
+                    "package_type": "usage",
+                    "bill_id": bill.bill_id,
+                    "bill_due_date": bill_due_date_str,
+                    "bill_number": bill.bill_number,
+                    "usd_value": int(bill.amount_due_usd) if bill.amount_due_usd is not None else 0.0,
+                    "lbp_value": int(bill.amount_due_lbp) if bill.amount_due_lbp is not None else 0.0,
+
+                    "customer_name": meter.customer_full_name,
+                    "customer_phone_number": meter.customer_phone_number,
+                    "area_name": area.area_name,
+                    "fixes": total_fixes,
+
+                    "kwh_rate": kwh_rate,
+                    "reading_month": reading_month,
+                    "current_reading": f"{int(reading.current_reading):,}" if reading and reading.current_reading is not None else None,
+                    "previous_reading": f"{int(reading.previous_reading):,}" if reading and reading.previous_reading is not None else None,
+                    "usage": f"{int(reading.usage):,}" if reading and reading.usage is not None else None,
+
+                    "activation_fee": f"{activation_fee:,}",
+                    "amperage": amperage,
+                    "total": (f"{total:,}" if total is not None else "0"),
+
+                    "dollar_rate": f"{rates.get('dollar_rate'):,}",
+                    "unpaid_arrears_lbp": f"{int(meter_arrears.get('total_unpaid_lbp', 0)):,}",
+                    "unpaid_arrears_usd": f"{round(meter_arrears.get('total_unpaid_usd', 0), 2):,}",
+                }
             else:
-                query = query.where(Bills.due_date == due_date)
-                logger.info(f"Filtering by due_date: {due_date.isoformat()} for billing period {year}-{month:02d}")
+                fixed_fee = int(package.fixed_fee) if package.fixed_fee else 0.0
+             
+                bd = bill.due_date
+                if bd.month > 1:
+                    prev_month = bd.month - 1
+                    prev_year = bd.year
+                else:
+                    prev_month = 12
+                    prev_year = bd.year - 1
+                reading_month = f"{prev_month:02d}/{prev_year}"
+                total = (int(bill.amount_due_lbp) if bill.amount_due_lbp else 0.0) - total_fixes
+
+                item = {
+                    "package_type": "fixed",
+                    "bill_id": bill.bill_id,
+                    "bill_due_date": bill_due_date_str,
+                    "bill_number": bill.bill_number,
+
+                    "usd_value": f"{int(bill.amount_due_usd):,}" if bill.amount_due_usd is not None else "0",
+                    "lbp_value": f"{int(bill.amount_due_lbp):,}" if bill.amount_due_lbp is not None else "0",
+
+                    "customer_name": meter.customer_full_name,
+                    "customer_phone_number": meter.customer_phone_number,
+                    "area_name": area.area_name,
+                    "fixes": f"{total_fixes:,}",
+                    "reading_month": reading_month,
+
+                    "fixed_fee": f"{fixed_fee:,}",
+                    "amperage": amperage,
+                    "total": (f"{total:,}" if total is not None else "0"),
+                    "dollar_rate": f"{rates.get('dollar_rate'):,}",
+                    "fixed_sub_hours": f"{int(rates.get('fixed_sub_hours')):,}",
+                    "fixed_sub_rate": f"{int(rates.get('fixed_sub_rate')):,}",
+                    "unpaid_arrears_lbp": f"{int(meter_arrears.get('total_unpaid_lbp', 0)):,}",
+                    "unpaid_arrears_usd": f"{round(meter_arrears.get('total_unpaid_usd', 0), 2):,}",
+                }
+
+            result.append(item)
+
+        return result
+
+
+    async def get_bills_full_data_for_due_date(self, session: AsyncSession, billing_date: str, bill_ids: list=None, rate_id: str = None) -> List[Dict]:
+        """Return full payload for all bills with the given due_date."""
+        try:
+            year, month, due_date = self._resolve_due_date(billing_date)
+
+            if rate_id is None:
+                rates = await self.rates_queries.get_rates_by_date(
+                    date_input=billing_date,
+                    session=session
+                )
+
+            else:
+                rates = await self.rates_queries.get_rates_by_id(
+                    rate_id=rate_id,
+                    session=session
+                )
+            if not rates:
+                logger.error("Rates not found.")
+                raise RateNotFoundError()
+
+            arrears_rows = await session.execute(self._arrears_query(due_date))
 
-            rs = await session.execute(query)
+            rs = await session.execute(self._bills_full_data_query(year, month, due_date, bill_ids))
             rows = rs.all()
             if not rows:
                 logger.info(f"No bills found for due_date {due_date.isoformat()}")
@@ -632,103 +1023,9 @@ class BillsQueries:
 
             # Batch fetch fixes for all meters in this batch and period
             meter_ids = [row.Bills.meter_id for row in rows]
-            fixes_rs = await session.execute(
-                select(Fixes).where(
-                    and_(
-                        Fixes.meter_id.in_(meter_ids),
-                        func.extract("month", Fixes.fix_date) == month,
-                        func.extract("year", Fixes.fix_date) == year,
-                    )
-                )
-            )
-            fixes_by_meter = defaultdict(list)
-            for fx in fixes_rs.scalars().all():
-                fixes_by_meter[fx.meter_id].append(fx)
-
-            result: List[Dict] = []
-            for row in rows:
-                bill, meter, area, package, reading = row
-                fx_list = fixes_by_meter.get(bill.meter_id, [])
-                total_fixes = sum(int(f.cost) for f in fx_list if f.cost)
+            fixes_rs = await session.execute(self._fixes_query(meter_ids, year, month))
 
-                # Common fields
-                bill_due_date_str = bill.due_date.strftime("%d/%m/%Y") if bill.due_date else None
-                amperage = int(package.amperage) if package.amperage is not None else None
-                meter_arrears = arrears_by_meter.get(bill.meter_id, {'total_unpaid_lbp': 0.0, 'total_unpaid_usd': 0.0})
-
-                if meter.package_type == "usage":
-                    activation_fee = int(package.activation_fee) if package.activation_fee else 0.0
-                    kwh_rate = int(rates.get('coastal_kwh_rate')) if (area.elevation is not None and area.elevation < 700) else int(rates.get('mountain_kwh_rate'))
-                    reading_month = reading.reading_date.strftime("%m/%Y") if reading and reading.reading_date else None
-
-                    total = (int(bill.amount_due_lbp) if bill.amount_due_lbp else 0.0) - total_fixes - activation_fee
-
-                    item = {
-                        "package_type": "usage",
-                        "bill_id": bill.bill_id,
-                        "bill_due_date": bill_due_date_str,
-                        "bill_number": bill.bill_number,
-                        "usd_value": int(bill.amount_due_usd) if bill.amount_due_usd is not None else 0.0,
-                        "lbp_value": int(bill.amount_due_lbp) if bill.amount_due_lbp is not None else 0.0,
-
-                        "customer_name": meter.customer_full_name,
-                        "customer_phone_number": meter.customer_phone_number,
-                        "area_name": area.area_name,
-                        "fixes": total_fixes,
-
-                        "kwh_rate": kwh_rate,
-                        "reading_month": reading_month,
-                        "current_reading": f"{int(reading.current_reading):,}" if reading and reading.current_reading is not None else None,
-                        "previous_reading": f"{int(reading.previous_reading):,}" if reading and reading.previous_reading is not None else None,
-                        "usage": f"{int(reading.usage):,}" if reading and reading.usage is not None else None,
-
-                        "activation_fee": f"{activation_fee:,}",
-                        "amperage": amperage,
-                        "total": (f"{total:,}" if total is not None else "0"),
-
-                        "dollar_rate": f"{rates.get('dollar_rate'):,}",
-                        "unpaid_arrears_lbp": f"{int(meter_arrears.get('total_unpaid_lbp', 0)):,}",
-                        "unpaid_arrears_usd": f"{round(meter_arrears.get('total_unpaid_usd', 0), 2):,}",
-                    }
-                else:
-                    fixed_fee = int(package.fixed_fee) if package.fixed_fee else 0.0
-                 
-                    bd = bill.due_date
-                    if bd.month > 1:
-                        prev_month = bd.month - 1
-                        prev_year = bd.year
-                    else:
-                        prev_month = 12
-                        prev_year = bd.year - 1
-                    reading_month = f"{prev_month:02d}/{prev_year}"
-                    total = (int(bill.amount_due_lbp) if bill.amount_due_lbp else 0.0) - total_fixes
-
-                    item = {
-                        "package_type": "fixed",
-                        "bill_id": bill.bill_id,
-                        "bill_due_date": bill_due_date_str,
-                        "bill_number": bill.bill_number,
-
-                        "usd_value": f"{int(bill.amount_due_usd):,}" if bill.amount_due_usd is not None else "0",
-                        "lbp_value": f"{int(bill.amount_due_lbp):,}" if bill.amount_due_lbp is not None else "0",
-
-                        "customer_name": meter.customer_full_name,
-                        "customer_phone_number": meter.customer_phone_number,
-                        "area_name": area.area_name,
-                        "fixes": f"{total_fixes:,}",
-                        "reading_month": reading_month,
-
-                        "fixed_fee": f"{fixed_fee:,}",
-                        "amperage": amperage,
-                        "total": (f"{total:,}" if total is not None else "0"),
-                        "dollar_rate": f"{rates.get('dollar_rate'):,}",
-                        "fixed_sub_hours": f"{int(rates.get('fixed_sub_hours')):,}",
-                        "fixed_sub_rate": f"{int(rates.get('fixed_sub_rate')):,}",
-                        "unpaid_arrears_lbp": f"{int(meter_arrears.get('total_unpaid_lbp', 0)):,}",
-                        "unpaid_arrears_usd": f"{round(meter_arrears.get('total_unpaid_usd', 0), 2):,}",
-                    }
-
-                result.append(item)
+            result = self._build_bills_full_data(rows, fixes_rs.scalars().all(), arrears_rows, rates)
 
             logger.info(f"Prepared {len(result)} flattened bills for due_date {due_date.isoformat()}")
             return result
@@ -744,6 +1041,132 @@ class BillsQueries:
             raise
 
 
+    def iter_bills_full_data_for_due_date_sync(self, session: Session, billing_date: str, bill_ids: list=None, rate_id: str = None, page_size: int = 200) -> Iterator[List[Dict]]:
+        """
+        Yield the full bill payloads for a due_date in pages of page_size.
+        Pages are fetched with keyset pagination on bill_number, so each page is a short
+        query and only one page of bills is held in memory at a time.
+        """
+        try:
+            year, month, due_date = self._resolve_due_date(billing_date)
+
+            if rate_id is None:
+                rates = self.rates_queries.get_rates_by_date_sync(
+                    date_input=billing_date,
+                    session=session
+                )
+            else:
+                rates = self.rates_queries.get_rates_by_id_sync(
+                    rate_id=rate_id,
+                    session=session
+                )
+
+            bills_query = self._bills_full_data_query(year, month, due_date, bill_ids).order_by(Bills.bill_number)
+            last_bill_number = None
+            total = 0
+
+            while True:
+                page_query = bills_query
+                if last_bill_number is not None:
+                    page_query = page_query.where(Bills.bill_number > last_bill_number)
+                rows = session.execute(page_query.limit(page_size)).all()
+                if not rows:
+                    break
+
+                meter_ids = [row.Bills.meter_id for row in rows]
+                fixes = session.execute(self._fixes_query(meter_ids, year, month)).scalars().all()
+                arrears_rows = session.execute(self._arrears_query(due_date, meter_ids)).all()
+
+                page = self._build_bills_full_data(rows, fixes, arrears_rows, rates)
+                last_bill_number = rows[-1].Bills.bill_number
+                total += len(page)
+                logger.info(f"Prepared page of {len(page)} bills for due_date {due_date.isoformat()} ({total} so far)")
+                yield page
+
+                if len(rows) < page_size:
+                    break
+
+        except RateNotFoundError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error streaming bills for billing date {billing_date}: {e}")
+            raise
+
+
+    def get_bill_ids_for_due_date_sync(self, session: Session, billing_date: str) -> List[str]:
+        """Return the IDs of all bills for a due_date, ordered by bill_number."""
+        try:
+            year, month, due_date = self._resolve_due_date(billing_date)
+            result = session.execute(
+                select(Bills.bill_id)
+                .join(Meters, Bills.meter_id == Meters.meter_id)
+                .where(Bills.due_date == due_date)
+                .order_by(Bills.bill_number)
+            )
+            return [str(bill_id) for bill_id in result.scalars().all()]
+
+        except Exception as e:
+            logger.error(f"Error fetching bill IDs for billing date {billing_date}: {e}")
+            raise
+
+
+    async def count_bills_for_due_date(self, session: AsyncSession, billing_date: str, bill_ids: list = None) -> int:
+        """Count the bills that iter_bills_full_data_for_due_date_sync would yield."""
+        try:
+            year, month, due_date = self._resolve_due_date(billing_date)
+            query = (
+                select(func.count())
+                .select_from(Bills)
+                .join(Meters, Bills.meter_id == Meters.meter_id)
+            )
+            if bill_ids:
+                query = query.where(Bills.bill_id.in_(bill_ids))
+            else:
+                query = query.where(Bills.due_date == due_date)
+            result = await session.execute(query)
+            return result.scalar() or 0
+
+        except Exception as e:
+            logger.error(f"Error counting bills for billing date {billing_date}: {e}")
+            raise
+
+
+    def bulk_update_blob_names_sync(self, session: Session, blob_names: List[tuple]) -> int:
+        """
+        Write back (bill_id, blob_name) pairs in a single UPDATE ... FROM (VALUES ...) and commit.
+        Rows that already hold the same blob_name are left untouched, so re-applying a
+        retried chunk is a no-op. Returns the number of rows changed.
+        """
+        if not blob_names:
+            return 0
+        try:
+            new_blob_names = (
+                values(
+                    column("bill_id", PG_UUID(as_uuid=True)),
+                    column("blob_name", String(255)),
+                    name="new_blob_names",
+                )
+                .data([(UUID(str(bill_id)), blob_name) for bill_id, blob_name in blob_names])
+            )
+            result = session.execute(
+                update(Bills)
+                .where(
+                    Bills.bill_id == new_blob_names.c.bill_id,
+                    Bills.blob_name.is_distinct_from(new_blob_names.c.blob_name),
+                )
+                .values(blob_name=new_blob_names.c.blob_name)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+            return result.rowcount
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error writing back {len(blob_names)} bill blob names: {e}")
+            raise
+
+
     async def get_statement(self, year: int, meter_id: str, session: AsyncSession):
         """
         Get comprehensive statement for a specific meter for the entire year.
@@ -14,6 +14,10 @@ class GenerateBillsSchema(BaseModel):
     force_unverified_readings : Optional[bool] = Field(
         default=False
     )
+    bulk : Optional[bool] = Field(
+        default=False,
+        description="Compute and insert all bills for the period in a single SQL statement."
+    )
     billing_date: str = Field(
         ...,
     )
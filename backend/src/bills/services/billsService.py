@@ -39,6 +39,9 @@ from src.celery.celery_app import celery_app
 from src.bills.tasks.generateBillsTask import generate_images_for_due_date
 from src.bills.tasks.downloadBillsTask import generate_pdfs_for_due_date
 
+# Months with at least this many new bills are rendered as a parallel chord
+RENDER_FAN_OUT_MIN_BILLS = 200
+
 class BillsService:
     def __init__(self, bills_queries: BillsQueries):
         self.bills_queries = bills_queries
@@ -57,7 +60,12 @@ class BillsService:
         
         try:
             token = request.state.user
-            generation_results = await self.bills_queries.generate_bills(
+            generate_bills = (
+                self.bills_queries.generate_bills_bulk
+                if validated_request.get('query').get("bulk", False)
+                else self.bills_queries.generate_bills
+            )
+            generation_results = await generate_bills(
                 session=session,
                 creator_id=token.get("user_id"),
                 force_unverified_readings=validated_request.get('query').get("force_unverified_readings", False),
@@ -78,25 +86,28 @@ class BillsService:
                         }
                 )
 
-            bills_full_data_for_due_date = await self.bills_queries.get_bills_full_data_for_due_date(
+            billing_date = validated_request.get('query').get("billing_date")
+            rate_id = str(validated_request.get('query').get("rate_id"))
+            total_bills = await self.bills_queries.count_bills_for_due_date(
                 session=session,
-                billing_date=validated_request.get('query').get("billing_date"),
-                bill_ids=generated_bill_ids,
-                rate_id=validated_request.get('query').get("rate_id")
-            )   
-            
-            if not bills_full_data_for_due_date:
+                billing_date=billing_date,
+                bill_ids=generated_bill_ids
+            )
+
+            if not total_bills:
                 logger.info(f"No bills found for generation")
                 return success_response(
                     message="No bills found for the specified due date.",
                     data=[]
                 )
-            total_bills = len(bills_full_data_for_due_date)
             
-            # Start optimized task
+            # Only a job descriptor goes through the broker, the worker reads the bills itself
             task = generate_images_for_due_date.delay(
-                bills_full_data_for_due_date,
-                chunk_size=25
+                billing_date,
+                rate_id=rate_id,
+                bill_ids=[str(bill_id) for bill_id in generated_bill_ids],
+                chunk_size=25,
+                fan_out=total_bills >= RENDER_FAN_OUT_MIN_BILLS
             )
 
             logger.info(f"Enqueued image generation task {task.id} for {total_bills} bills")
@@ -250,21 +261,20 @@ class BillsService:
             token = request.state.user
             billing_date = validated_request.get('query').get("billing_date")
             
-            bills_full_data_for_billing_date = await self.bills_queries.get_bills_full_data_for_due_date(
+            total_bills = await self.bills_queries.count_bills_for_due_date(
                 session=session,
                 billing_date=billing_date
             )
-            if not bills_full_data_for_billing_date:
+            if not total_bills:
                 return success_response(
                     message="No bills to download.", 
                     data=[]
                 )
 
             user_phone_number = token.get("phone_number")
-            total_bills = len(bills_full_data_for_billing_date)
 
             task = generate_pdfs_for_due_date.delay(
-                bills_full_data_for_billing_date,
+                billing_date,
                 user_phone_number=user_phone_number
             )
             logger.info(f"Enqueued PDF generation task {task.id} for {total_bills} bills")
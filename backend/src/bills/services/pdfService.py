@@ -1,13 +1,21 @@
 import os
 import pdfkit
 from globals.utils.logger import logger
-from globals.config.config import WKHTMLTOPDF_BIN, WKHTMLTOIMAGE_BIN
+from globals.config.config import WKHTMLTOPDF_BIN, WKHTMLTOIMAGE_BIN, RENDERER_BACKEND, RENDERER_POOL_SIZE
+from src.bills.services.rendererPool import ChromiumRendererPool, render_stats
+from src.bills.services.renderCache import RenderCache
+from src.bills.services.pdfStreamWriter import StreamingPdfWriter
+from globals.config.config import (
+    RENDER_CACHE_ENABLED,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_MAX_MB,
+    RENDER_CACHE_USE_GCS,
+)
+import time
+import threading
 import imgkit
 import os
 from io import BytesIO
-from db.postgres.tables.bills import Bills
-from sqlalchemy.orm import Session
-from sqlalchemy import update
 from db.gcs.gcsService import GCSManager
 from globals.config.config import BUCKET_NAME
 from zoneinfo import ZoneInfo
@@ -15,6 +23,8 @@ from datetime import datetime
 import tempfile
 import zipfile
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from typing import Iterable
 from db.postgres.tables.users import Users
 from db.postgres.tables.fixes import Fixes
 from db.postgres.tables.meters import Meters
@@ -23,18 +33,107 @@ import asyncio
 from pathlib import Path
 import base64
 
-from pathlib import Path as _Path
 import os as _os
 import tempfile as _tempfile
 
 
 class PDFService:
     def __init__(self):
-        self.gcs_manager = GCSManager()
+        self.gcs_manager = self._get_gcs_manager()
 
     timezone = ZoneInfo("Asia/Beirut")
     imgkit_config = None
     pdfkit_config = None
+    renderer_pool = None
+    _renderer_pool_disabled = False
+    _renderer_pool_lock = threading.Lock()
+    render_cache = None
+    # Shared by the classmethods, which is how every caller uses this service
+    _gcs_manager = None
+
+    # wkhtmltoimage options for bill images, also part of the render cache key
+    IMAGE_OPTIONS = {
+        "format": "jpg",
+        "quality": "75",  # reduced from 95
+        "encoding": "UTF-8",
+        "enable-local-file-access": None,
+        "quiet": None,
+        "width": 1100,  # reduced from 1600
+        "zoom": 2,  # reduced zoom
+    }
+
+    @classmethod
+    def _get_gcs_manager(cls) -> GCSManager:
+        """Lazily create the GCS client shared by every render and upload"""
+        if cls._gcs_manager is None:
+            with cls._renderer_pool_lock:
+                if cls._gcs_manager is None:
+                    cls._gcs_manager = GCSManager()
+        return cls._gcs_manager
+
+    @classmethod
+    def _get_renderer_pool(cls):
+        """Lazily start the warm renderer pool, or return None to use wkhtmltox directly"""
+        if cls.renderer_pool and cls.renderer_pool.broken:
+            with cls._renderer_pool_lock:
+                if cls.renderer_pool and cls.renderer_pool.broken:
+                    logger.error("Renderer pool is broken, using wkhtmltox from now on")
+                    cls.renderer_pool = None
+                    cls._renderer_pool_disabled = True
+
+        if cls.renderer_pool or cls._renderer_pool_disabled:
+            return cls.renderer_pool
+
+        with cls._renderer_pool_lock:
+            if cls.renderer_pool or cls._renderer_pool_disabled:
+                return cls.renderer_pool
+
+            if RENDERER_BACKEND != "chromium":
+                cls._renderer_pool_disabled = True
+                return None
+
+            if not ChromiumRendererPool.is_available():
+                logger.warning("Chromium renderer requested but playwright is not installed, using wkhtmltox")
+                cls._renderer_pool_disabled = True
+                return None
+
+            try:
+                pool = ChromiumRendererPool(size=RENDERER_POOL_SIZE)
+                pool.start()
+                cls.renderer_pool = pool
+            except Exception as e:
+                logger.error(f"Failed to start renderer pool, using wkhtmltox: {e}")
+                cls._renderer_pool_disabled = True
+            return cls.renderer_pool
+
+    @classmethod
+    def _get_render_cache(cls):
+        """Lazily open the content-addressed bill image cache"""
+        if cls.render_cache is None and RENDER_CACHE_ENABLED:
+            with cls._renderer_pool_lock:
+                if cls.render_cache is None:
+                    cls.render_cache = RenderCache(
+                        cache_dir=RENDER_CACHE_DIR,
+                        max_bytes=RENDER_CACHE_MAX_MB * 1024 * 1024,
+                        bucket_name=BUCKET_NAME if RENDER_CACHE_USE_GCS else None,
+                    )
+        return cls.render_cache
+
+    @classmethod
+    def get_render_stats(cls) -> dict:
+        """Per-render latency summary for every backend used by this process"""
+        stats = render_stats.summary()
+        if cls.render_cache:
+            stats["cache"] = cls.render_cache.stats()
+        return stats
+
+    @classmethod
+    def _inject_base_url(cls, html: str, base_url) -> str:
+        if not base_url:
+            return html
+        if "<head>" in html:
+            return html.replace("<head>", f'<head><base href="{base_url}">', 1)
+        return f'<base href="{base_url}">{html}'
 
     @classmethod
     def _get_pdfkit_config(cls):
@@ -74,90 +173,91 @@ class PDFService:
             #     "width": 1600,
             #     "zoom": 2,
             # }
-            options = {
-                "format": "jpg",
-                "quality": "75",  # reduced from 95
-                "encoding": "UTF-8",
-                "enable-local-file-access": None,
-                "quiet": None,
-                "width": 1100,  # reduced from 1600
-                "zoom": 2,  # reduced zoom
-            }
-            html_to_render = html
-            if base_url:
-                if "<head>" in html:
-                    html_to_render = html.replace(
-                        "<head>", f'<head><base href="{base_url}">', 1
-                    )
-                else:
-                    html_to_render = f'<base href="{base_url}">{html}'
+            options = dict(cls.IMAGE_OPTIONS)
+            html_to_render = cls._inject_base_url(html, base_url)
+
+            pool = cls._get_renderer_pool()
+            if pool:
+                try:
+                    return BytesIO(pool.render_image(html_to_render, options))
+                except Exception as e:
+                    logger.warning(f"Renderer pool failed, falling back to wkhtmltoimage: {e}")
+
+            start = time.perf_counter()
             raw = imgkit.from_string(
                 html_to_render, False, options=options, config=config
             )
+            render_stats.record("wkhtml", "image", time.perf_counter() - start)
             return BytesIO(raw)
         except Exception as e:
             logger.error(f"error in html_to_image_bytes: {e}")
             raise
 
     @classmethod
-    def generate_single_bill_jpg_sync(
+    def render_bill_jpeg_bytes(
         cls,
         bill_data: dict,
         usage_template,
         fixed_template,
-        session: Session,
-    ):
-        """Process a single bill with optimized error handling"""
-        try:
-            # Skip if already processed
-            if bill_data.get("blob_name"):
-                logger.debug(
-                    f"Bill {bill_data.get('bill_id')} already has image, skipping"
-                )
-                return
-
-            config = cls.imgkit_config or cls._get_imgkit_config()
-
-            # Determine template and base URL
-            pkg = bill_data.get("package_type", "usage")
-            if pkg == "usage":
-                html = usage_template.render(bill_data)
-                base = Path(usage_template.filename).parent.as_uri() + "/"
-            else:
-                html = fixed_template.render(bill_data)
-                base = Path(fixed_template.filename).parent.as_uri() + "/"
-
-            # Render to image
-            img_buf = cls.html_to_image_bytes(html, config, base)
-            img_buf.seek(0)
-
-            # Upload to GCS
-            bill_id = str(bill_data["bill_id"])
-            blob_name = f"bills/{bill_id}.jpg"
-
-            cls.gcs_manager.upload_buffer(
-                BUCKET_NAME,
-                img_buf,
-                blob_name,
-                "image/jpeg",
-            )
+    ) -> bytes:
+        """Render a single bill to JPEG bytes, reusing the render cache when the inputs are unchanged"""
+        pkg = bill_data.get("package_type", "usage")
+        template = usage_template if pkg == "usage" else fixed_template
+
+        cache = cls._get_render_cache()
+        gcs_manager = cls._get_gcs_manager() if cache and cache.bucket_name else None
+        cache_key = None
+        if cache:
+            try:
+                renderer = ChromiumRendererPool.name if cls._get_renderer_pool() else "wkhtml"
+                cache_key = cache.make_key(template, bill_data, renderer=renderer, options=cls.IMAGE_OPTIONS)
+                cached = cache.get(cache_key, gcs_manager=gcs_manager)
+                if cached is not None:
+                    logger.debug(f"Render cache hit for bill {bill_data.get('bill_id')}")
+                    return cached
+            except Exception as e:
+                logger.warning(f"Render cache lookup failed: {e}")
+                cache_key = None
+
+        config = cls.imgkit_config or cls._get_imgkit_config()
+        html = template.render(bill_data)
+        base = Path(template.filename).parent.as_uri() + "/"
+        data = cls.html_to_image_bytes(html, config, base).getvalue()
+
+        if cache and cache_key:
+            try:
+                cache.put(cache_key, data, gcs_manager=gcs_manager)
+            except Exception as e:
+                logger.warning(f"Render cache store failed: {e}")
+        return data
 
-            # Update database immediately
-            session.execute(
-                update(Bills)
-                .where(Bills.bill_id == bill_id)
-                .values(blob_name=blob_name)
+    @classmethod
+    def render_bill_image_sync(
+        cls,
+        bill_data: dict,
+        usage_template,
+        fixed_template,
+    ) -> str:
+        """Render a single bill to JPEG and upload it, returns the blob name"""
+        img_buf = BytesIO(
+            cls.render_bill_jpeg_bytes(
+                bill_data=bill_data,
+                usage_template=usage_template,
+                fixed_template=fixed_template,
             )
-            session.commit()
+        )
 
-            logger.debug(f"Successfully processed bill {bill_id}")
+        # Upload to GCS
+        bill_id = str(bill_data["bill_id"])
+        blob_name = f"bills/{bill_id}.jpg"
 
-        except Exception as e:
-            session.rollback()
-            logger.error(
-                f"Failed to process bill {bill_data.get('bill_id', 'unknown')}: {e}"
-            )
-            raise
+        cls._get_gcs_manager().upload_buffer(
+            BUCKET_NAME,
+            img_buf,
+            blob_name,
+            "image/jpeg",
+        )
+        return blob_name
 
     @classmethod
     def html_to_pdf_bytes(cls, html: str, config, base_url) -> bytes:
@@ -175,168 +275,127 @@ class PDFService:
             "disable-external-links": None,
         }
         try:
+            html_to_render = cls._inject_base_url(html, base_url)
 
-            html_to_render = html
-            if base_url:
-                if "<head>" in html:
-                    html_to_render = html.replace(
-                        "<head>", f'<head><base href="{base_url}">', 1
-                    )
-                else:
-                    html_to_render = f'<base href="{base_url}">{html}'
+            pool = cls._get_renderer_pool()
+            if pool:
+                try:
+                    return pool.render_pdf(html_to_render, options)
+                except Exception as e:
+                    logger.warning(f"Renderer pool failed, falling back to wkhtmltopdf: {e}")
 
-            return pdfkit.from_string(
+            start = time.perf_counter()
+            pdf_bytes = pdfkit.from_string(
                 html_to_render, output_path=False, options=options, configuration=config
             )
+            render_stats.record("wkhtml", "pdf", time.perf_counter() - start)
+            return pdf_bytes
         except Exception as e:
             logger.error(f"error in html_to_pdf_bytes: {e}")
             raise e
 
+    @classmethod
+    def _render_bill_for_pdf(cls, bill_data: dict, usage_template, fixed_template):
+        """Render one bill for the combined PDF, returns None instead of raising"""
+        try:
+            return cls.render_bill_jpeg_bytes(
+                bill_data=bill_data,
+                usage_template=usage_template,
+                fixed_template=fixed_template,
+            )
+        except Exception as e:
+            logger.error(
+                f"Failed to render bill {bill_data.get('bill_id', 'unknown')} for combined PDF: {e}"
+            )
+            return None
+
     @classmethod
     def generate_combined_bills_pdf(
         cls,
-        bills_data,
+        bills_data: Iterable[dict],
         usage_template,
         fixed_template,
         bills_per_page: int = 4,
+        pages_per_batch: int = 10,
+        workers: int = 4,
     ):
         """
-        Render each bill HTML to an image, arrange 4 images per page in a single HTML,
-        convert to one PDF, upload to GCS, and return the signed download URL.
+        Stream bills into one combined PDF (4 bills per page), upload it to GCS and
+        return a summary with the signed download URL, or None if nothing was written.
+
+        bills_data can be any iterable (e.g. the paged DB iterator). Bills are rendered
+        in batches of pages_per_batch pages and each page is appended to the PDF on disk
+        as soon as it is laid out, so memory stays flat regardless of the bill count.
+        A bill that fails to render is skipped and reported instead of failing the document.
         """
         try:
-            if not bills_data:
-                logger.info("No bills to render for combined PDF.")
-                return None
-
-            img_config = cls.imgkit_config or cls._get_imgkit_config()
-            pdf_config = cls.pdfkit_config or cls._get_pdfkit_config()
-
-            pages_html_parts = []
-            total = len(bills_data)
-            logger.info(
-                f"Preparing {total} bills as images for combined PDF (4 per page)."
-            )
+            batch_size = bills_per_page * pages_per_batch
+            total_bills = 0
+            failed_bills = []
 
             with _tempfile.TemporaryDirectory() as tmpdir:
-                img_paths = []
-
-                # Render all bills to JPEG files once
-                for idx, bill_data in enumerate(bills_data):
-                    pkg = bill_data.get("package_type", "usage")
-                    if pkg == "usage":
-                        bill_html = usage_template.render(bill_data)
-                        base = _Path(usage_template.filename).parent.as_uri() + "/"
-                    else:
-                        bill_html = fixed_template.render(bill_data)
-                        base = _Path(fixed_template.filename).parent.as_uri() + "/"
-
-                    img_buf = cls.html_to_image_bytes(bill_html, img_config, base)
-                    img_path = _os.path.join(tmpdir, f"bill_{idx+1}.jpg")
-                    with open(img_path, "wb") as f:
-                        f.write(img_buf.getvalue())
-                    img_paths.append(_Path(img_path).as_uri())
-
-                # Build pages with file:// images
-                for i in range(0, total, bills_per_page):
-                    group_paths = img_paths[i : i + bills_per_page]
-                    image_cells = [
-                        f'<div class="cell"><img src="{uri}" /></div>'
-                        for uri in group_paths
-                    ]
-                    while len(image_cells) < bills_per_page:
-                        image_cells.append('<div class="cell"></div>')
-
-                    page_html = f"""
-                    <section class="page">
-                        <div class="grid">
-                            {''.join(image_cells)}
-                        </div>
-                    </section>
-                    """
-                    pages_html_parts.append(page_html)
-
-                full_html = f"""
-                <html>
-                <head>
-                    <meta charset="utf-8" />
-                    <style>
-                        @page {{ size: A4; margin: 5mm 0 0 0; }}
-                        html, body {{ margin: 0; padding: 0; }}
-                        .page {{
-                            page-break-after: always;
-                        }}
-                        .page:last-child {{
-                            page-break-after: auto;
-                        }}
-                        .grid {{
-                            display: grid;
-                            grid-template-columns: 1fr 1fr;
-                            grid-auto-rows: 1fr;
-                            gap: 6mm;
-                            padding: 6mm;
-                            box-sizing: border-box;
-                        }}
-                        .cell {{
-                            width: 100%;
-                            overflow: hidden;
-                            display: flex;
-                            align-items: center;
-                            justify-content: center;
-                        }}
-                        .cell img {{
-                            width: 100%;
-                            height: auto;
-                            display: block;
-                        }}
-                    </style>
-                </head>
-                <body>
-                    {''.join(pages_html_parts)}
-                </body>
-                </html>
-                """
-
-                # More aggressive PDF image compression
-                pdf_options = {
-                    "encoding": "UTF-8",
-                    "page-size": "A4",
-                    "margin-top": "5mm",
-                    "margin-right": "0mm",
-                    "margin-bottom": "0mm",
-                    "margin-left": "0mm",
-                    "enable-local-file-access": None,
-                    "disable-smart-shrinking": None,
-                    "image-quality": "70",  # downsample images in PDF
-                    "image-dpi": "150",  # target image DPI
-                    "dpi": "150",  # overall render DPI
-                    # "grayscale": None,       # uncomment if color not needed
-                    "lowquality": None,  # smaller PDF output
-                }
-                pdf_bytes = pdfkit.from_string(
-                    full_html,
-                    output_path=False,
-                    options=pdf_options,
-                    configuration=pdf_config,
+                pdf_path = _os.path.join(tmpdir, "combined_bills.pdf")
+
+                with open(pdf_path, "wb") as f, ThreadPoolExecutor(max_workers=workers) as executor:
+                    writer = StreamingPdfWriter(f, columns=2, rows=bills_per_page // 2)
+                    bills_iter = iter(bills_data)
+
+                    while True:
+                        batch = list(islice(bills_iter, batch_size))
+                        if not batch:
+                            break
+
+                        images = list(
+                            executor.map(
+                                lambda bill: cls._render_bill_for_pdf(bill, usage_template, fixed_template),
+                                batch,
+                            )
+                        )
+
+                        rendered = []
+                        for bill_data, img_bytes in zip(batch, images):
+                            if img_bytes is None:
+                                failed_bills.append(str(bill_data.get("bill_id")))
+                            else:
+                                rendered.append(img_bytes)
+
+                        for i in range(0, len(rendered), bills_per_page):
+                            writer.add_image_page(rendered[i : i + bills_per_page])
+
+                        total_bills += len(batch)
+                        logger.info(
+                            f"Combined PDF progress: {total_bills} bills, {writer.page_count} pages written"
+                        )
+
+                    writer.close()
+
+                if total_bills == 0:
+                    logger.info("No bills to render for combined PDF.")
+                    return {"download_url": None, "total_bills": 0, "total_pages": 0, "failed_bills": []}
+
+                if writer.page_count == 0:
+                    logger.error("None of the bills could be rendered for combined PDF.")
+                    return None
+
+                blob_name = f"pdf/combined_bills_{datetime.now(cls.timezone).strftime('%Y-%m-%d_%H-%M-%S')}.pdf"
+                cls._get_gcs_manager().upload_file(
+                    BUCKET_NAME,
+                    source_file_path=pdf_path,
+                    destination_blob_name=blob_name,
+                    content_type="application/pdf",
                 )
 
-            blob_name = f"pdf/combined_bills_{datetime.now(cls.timezone).strftime('%Y-%m-%d_%H-%M-%S')}.pdf"
-            buf = BytesIO(pdf_bytes)
-            buf.seek(0)
-
-            cls.gcs_manager.upload_buffer(
-                BUCKET_NAME,
-                buffer=buf,
-                destination_blob_name=blob_name,
-                content_type="application/pdf",
-            )
-
-            download_url = cls.gcs_manager.generate_signed_url(
+            download_url = cls._get_gcs_manager().generate_signed_url(
                 BUCKET_NAME, blob_name, expiration_minutes=60 * 24
             )
 
             logger.info(f"Uploaded combined PDF: {blob_name}")
-            return download_url
+            return {
+                "download_url": download_url,
+                "total_bills": total_bills,
+                "total_pages": writer.page_count,
+                "failed_bills": failed_bills,
+            }
 
         except Exception as e:
             logger.error(f"Failed to generate combined bills PDF: {e}")
@@ -0,0 +1,142 @@
+from io import BytesIO
+from typing import BinaryIO, List
+
+from PIL import Image
+
+from globals.utils.logger import logger
+
+
+MM_TO_PT = 72 / 25.4
+
+
+class StreamingPdfWriter:
+    """
+    Minimal page-level PDF writer for sheets of bill images.
+
+    Every page is written to the output file as soon as it is added, and JPEGs are
+    embedded as-is (DCTDecode), so memory only ever holds the current page's images
+    plus the object offsets needed for the final cross-reference table.
+    """
+
+    PAGE_WIDTH = 595.28  # A4 in points
+    PAGE_HEIGHT = 841.89
+
+    # Object 1 is the catalog and object 2 the page tree, both written on close()
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        columns: int = 2,
+        rows: int = 2,
+        margin_top_mm: float = 5,
+        padding_mm: float = 6,
+        gap_mm: float = 6,
+    ):
+        self._f = fileobj
+        self.columns = columns
+        self.rows = rows
+        self.margin_top = margin_top_mm * MM_TO_PT
+        self.padding = padding_mm * MM_TO_PT
+        self.gap = gap_mm * MM_TO_PT
+
+        self._offsets = {}
+        self._page_ids: List[int] = []
+        self._next_id = 3
+        self._closed = False
+
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_ids)
+
+    def _reserve_id(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _write_object(self, obj_id: int, body: bytes, stream: bytes = None):
+        self._offsets[obj_id] = self._f.tell()
+        self._f.write(f"{obj_id} 0 obj\n".encode())
+        self._f.write(body)
+        if stream is not None:
+            self._f.write(b"\nstream\n")
+            self._f.write(stream)
+            self._f.write(b"\nendstream")
+        self._f.write(b"\nendobj\n")
+
+    def _write_image(self, jpeg_bytes: bytes):
+        with Image.open(BytesIO(jpeg_bytes)) as img:
+            width, height = img.size
+            mode = img.mode
+
+        color_space = {"L": "/DeviceGray", "CMYK": "/DeviceCMYK"}.get(mode, "/DeviceRGB")
+        obj_id = self._reserve_id()
+        body = (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /DCTDecode "
+            f"/Length {len(jpeg_bytes)} >>"
+        ).encode()
+        self._write_object(obj_id, body, jpeg_bytes)
+        return obj_id, width, height
+
+    def add_image_page(self, images: List[bytes]):
+        """Lay out up to columns x rows JPEG images on one A4 page."""
+        if self._closed:
+            raise ValueError("Cannot add pages to a closed PDF")
+
+        cell_w = (self.PAGE_WIDTH - 2 * self.padding - (self.columns - 1) * self.gap) / self.columns
+        cell_h = (self.PAGE_HEIGHT - self.margin_top - 2 * self.padding - (self.rows - 1) * self.gap) / self.rows
+
+        xobjects = []
+        content = []
+        for idx, jpeg_bytes in enumerate(images[: self.columns * self.rows]):
+            obj_id, width, height = self._write_image(jpeg_bytes)
+            name = f"Im{idx}"
+            xobjects.append(f"/{name} {obj_id} 0 R")
+
+            col, row = idx % self.columns, idx // self.columns
+            cell_x = self.padding + col * (cell_w + self.gap)
+            cell_top = self.PAGE_HEIGHT - self.margin_top - self.padding - row * (cell_h + self.gap)
+
+            # Fit to the cell width like the HTML grid did, shrinking further only if too tall
+            scale = min(cell_w / width, cell_h / height)
+            draw_w, draw_h = width * scale, height * scale
+            x = cell_x + (cell_w - draw_w) / 2
+            y = cell_top - cell_h + (cell_h - draw_h) / 2
+            content.append(f"q {draw_w:.2f} 0 0 {draw_h:.2f} {x:.2f} {y:.2f} cm /{name} Do Q")
+
+        content_stream = "\n".join(content).encode()
+        content_id = self._reserve_id()
+        self._write_object(content_id, f"<< /Length {len(content_stream)} >>".encode(), content_stream)
+
+        page_id = self._reserve_id()
+        page_body = (
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R "
+            f"/MediaBox [0 0 {self.PAGE_WIDTH} {self.PAGE_HEIGHT}] "
+            f"/Resources << /XObject << {' '.join(xobjects)} >> >> "
+            f"/Contents {content_id} 0 R >>"
+        ).encode()
+        self._write_object(page_id, page_body)
+        self._page_ids.append(page_id)
+
+    def close(self):
+        """Write the page tree, catalog, cross-reference table and trailer."""
+        if self._closed:
+            return
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(self.PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode())
+
+        xref_offset = self._f.tell()
+        size = self._next_id
+        self._f.write(f"xref\n0 {size}\n".encode())
+        self._f.write(b"0000000000 65535 f \n")
+        for obj_id in range(1, size):
+            self._f.write(f"{self._offsets[obj_id]:010d} 00000 n \n".encode())
+        self._f.write(f"trailer\n<< /Size {size} /Root {self.CATALOG_ID} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+        self._closed = True
+        logger.info(f"Streaming PDF closed with {len(self._page_ids)} pages")
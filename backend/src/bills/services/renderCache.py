@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from typing import Optional
+
+from globals.utils.logger import logger
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered bill JPEGs.
+
+    The key is a hash of the template source, the fonts and other assets next to it, the
+    renderer backend and image options, and the bill payload, so a bill is only rendered
+    again when one of those changed. Images are kept in a local
+    directory with LRU eviction and, optionally, mirrored to GCS under render-cache/
+    so other workers can reuse them (GCS entries expire through the bucket lifecycle rules).
+    """
+
+    GCS_PREFIX = "render-cache/"
+
+    def __init__(self, cache_dir: str, max_bytes: int, bucket_name: Optional[str] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.bucket_name = bucket_name
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._template_hashes = {}
+        self._asset_hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk (oldest first)"""
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(".jpg"):
+                continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, file_name[:-4], stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        logger.info(f"Render cache loaded {len(self._index)} entries ({self._total_bytes} bytes) from {self.cache_dir}")
+
+    def _template_hash(self, template) -> str:
+        filename = template.filename
+        template_hash = self._template_hashes.get(filename)
+        if template_hash is None:
+            with open(filename, "rb") as f:
+                template_hash = hashlib.sha256(f.read()).hexdigest()
+            self._template_hashes[filename] = template_hash
+        return template_hash
+
+    def _assets_hash(self, template) -> str:
+        """Hash of the non-template files (fonts, CSS, images) in the template's directory"""
+        directory = os.path.dirname(template.filename)
+        assets_hash = self._asset_hashes.get(directory)
+        if assets_hash is None:
+            digest = hashlib.sha256()
+            for file_name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, file_name)
+                if file_name.endswith(".html") or not os.path.isfile(path):
+                    continue
+                digest.update(file_name.encode())
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+            assets_hash = digest.hexdigest()
+            self._asset_hashes[directory] = assets_hash
+        return assets_hash
+
+    def make_key(self, template, bill_data: dict, renderer: str = "", options: Optional[dict] = None) -> str:
+        payload = json.dumps(bill_data, sort_keys=True, default=str)
+        digest = hashlib.sha256()
+        digest.update(self._template_hash(template).encode())
+        digest.update(self._assets_hash(template).encode())
+        digest.update(renderer.encode())
+        digest.update(json.dumps(options or {}, sort_keys=True, default=str).encode())
+        digest.update(payload.encode())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jpg")
+
+    def get(self, key: str, gcs_manager=None) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            with self._lock:
+                if key not in self._index:
+                    self._index[key] = len(data)
+                    self._total_bytes += len(data)
+                self._index.move_to_end(key)
+                self.hits += 1
+            return data
+        except FileNotFoundError:
+            pass
+
+        if gcs_manager and self.bucket_name:
+            try:
+                data = gcs_manager.download_as_bytes(self.bucket_name, f"{self.GCS_PREFIX}{key}.jpg")
+            except Exception as e:
+                logger.warning(f"Failed to read render cache entry {key} from GCS: {e}")
+                data = None
+            if data is not None:
+                self._store_local(key, data)
+                with self._lock:
+                    self.hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes, gcs_manager=None):
+        self._store_local(key, data)
+        if gcs_manager and self.bucket_name:
+            try:
+                gcs_manager.upload_buffer(
+                    self.bucket_name,
+                    BytesIO(data),
+                    f"{self.GCS_PREFIX}{key}.jpg",
+                    "image/jpeg",
+                )
+            except Exception as e:
+                logger.warning(f"Failed to mirror render cache entry {key} to GCS: {e}")
+
+    def _store_local(self, key: str, data: bytes):
+        # Write atomically so concurrent workers never read a partial image
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._path(key))
+
+        with self._lock:
+            if key in self._index:
+                self._total_bytes -= self._index[key]
+            self._index[key] = len(data)
+            self._index.move_to_end(key)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+            logger.debug(f"Evicted render cache entry {key}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,265 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional
+
+from globals.utils.logger import logger
+
+
+class RenderStats:
+    """Thread-safe per-render latency recorder, keyed by backend and output kind."""
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._counts = defaultdict(int)
+
+    def record(self, backend: str, kind: str, seconds: float):
+        key = f"{backend}:{kind}"
+        with self._lock:
+            self._samples[key].append(seconds)
+            self._counts[key] += 1
+        logger.debug(f"Rendered {kind} with {backend} in {seconds * 1000:.1f} ms")
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            snapshot = {key: sorted(samples) for key, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        summary = {}
+        for key, samples in snapshot.items():
+            if not samples:
+                continue
+            summary[key] = {
+                "count": counts[key],
+                "avg_ms": round(sum(samples) / len(samples) * 1000, 2),
+                "p50_ms": round(samples[int(0.50 * (len(samples) - 1))] * 1000, 2),
+                "p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 2),
+                "max_ms": round(samples[-1] * 1000, 2),
+            }
+        return summary
+
+
+render_stats = RenderStats()
+
+
+class ChromiumRendererPool:
+    """
+    Pool of long-lived headless Chromium pages used to render bill HTML.
+
+    Each worker thread owns one browser process and one page for its whole lifetime,
+    so process start-up and the OpenSans/CSS loading are paid once per worker instead
+    of once per bill. HTML is handed to the workers through an in-process queue.
+
+    A worker whose page or browser crashes reopens the page or relaunches the browser; if
+    that fails the worker stops, and once none are left the pool is marked broken and its
+    queued renders fail immediately.
+
+    Needs the playwright package and its browser: pip install playwright && playwright install chromium
+    """
+
+    name = "chromium"
+
+    def __init__(self, size: int = 2, render_timeout: int = 60):
+        self.size = size
+        self.render_timeout = render_timeout
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._started = False
+        # Worker bookkeeping has its own lock: workers exit while start() holds _lock
+        self._state_lock = threading.Lock()
+        self._live_workers = 0
+        self._stopping = False
+        # Set once every worker has died; callers fall back to wkhtmltox
+        self.broken = False
+
+    @staticmethod
+    def is_available() -> bool:
+        try:
+            import playwright.sync_api  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+
+            with self._state_lock:
+                self._live_workers = self.size
+                self._stopping = False
+                self.broken = False
+
+            startup_errors = []
+            for i in range(self.size):
+                ready = threading.Event()
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    args=(ready, startup_errors),
+                    name=f"chromium-renderer-{i}",
+                    daemon=True,
+                )
+                worker.start()
+                ready.wait(timeout=self.render_timeout)
+                self._workers.append(worker)
+
+            if startup_errors:
+                self._stop_workers()
+                raise RuntimeError(f"Chromium renderer failed to start: {startup_errors[0]}")
+
+            self._started = True
+            logger.info(f"Chromium renderer pool started with {self.size} warm pages")
+
+    @staticmethod
+    def _launch(pw):
+        browser = pw.chromium.launch(args=["--allow-file-access-from-files"])
+        return browser, browser.new_page(device_scale_factor=2)
+
+    def _recover(self, pw, browser, page):
+        """Fresh page after a failed render, or a relaunched browser if the old one is gone"""
+        try:
+            page.close()
+        except Exception:
+            pass
+        try:
+            return browser, browser.new_page(device_scale_factor=2)
+        except Exception as e:
+            logger.warning(f"Chromium page could not be reopened, relaunching the browser: {e}")
+
+        try:
+            browser.close()
+        except Exception:
+            pass
+        # Raises when the browser cannot be relaunched, which ends this worker
+        return self._launch(pw)
+
+    def _worker_loop(self, ready: threading.Event, startup_errors: list):
+        from playwright.sync_api import sync_playwright
+
+        work_dir = tempfile.mkdtemp(prefix="bill-renderer-")
+        try:
+            with sync_playwright() as pw:
+                try:
+                    browser, page = self._launch(pw)
+                except Exception as e:
+                    startup_errors.append(e)
+                    raise
+                ready.set()
+
+                while True:
+                    job = self._jobs.get()
+                    if job is None:
+                        break
+
+                    future, kind, html, options = job
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    try:
+                        future.set_result(self._render(page, work_dir, kind, html, options))
+                    except Exception as e:
+                        future.set_exception(e)
+                        # A crashed page or browser must not poison the next render
+                        browser, page = self._recover(pw, browser, page)
+
+                browser.close()
+
+        except Exception as e:
+            logger.error(f"Chromium renderer worker stopped: {e}")
+
+        finally:
+            ready.set()
+            shutil.rmtree(work_dir, ignore_errors=True)
+            self._worker_exited()
+
+    def _worker_exited(self):
+        with self._state_lock:
+            self._live_workers -= 1
+            if self._live_workers > 0 or self._stopping:
+                return
+            self.broken = True
+        logger.error("Every Chromium renderer worker has stopped, renders fall back to wkhtmltox")
+        self._fail_pending()
+
+    def _fail_pending(self):
+        """Fail queued renders at once instead of leaving them to time out"""
+        while True:
+            try:
+                job = self._jobs.get_nowait()
+            except queue.Empty:
+                return
+            if job is None:
+                continue
+            future = job[0]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(RuntimeError("Chromium renderer pool is not running"))
+
+    def _render(self, page, work_dir: str, kind: str, html: str, options: dict) -> bytes:
+        # Loading from a file:// URL lets the <base href> resolve the local fonts and CSS
+        html_path = os.path.join(work_dir, "bill.html")
+        with open(html_path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+        if kind == "image":
+            page.set_viewport_size({"width": options.get("width", 1100), "height": 800})
+            page.goto(Path(html_path).as_uri(), wait_until="load")
+            return page.screenshot(type="jpeg", quality=options.get("quality", 75), full_page=True)
+
+        page.emulate_media(media="print")
+        page.goto(Path(html_path).as_uri(), wait_until="load")
+        return page.pdf(
+            format=options.get("page-size", "A4"),
+            margin={
+                "top": options.get("margin-top", "0mm"),
+                "right": options.get("margin-right", "0mm"),
+                "bottom": options.get("margin-bottom", "0mm"),
+                "left": options.get("margin-left", "0mm"),
+            },
+            print_background=True,
+        )
+
+    def _submit(self, kind: str, html: str, options: Optional[dict] = None) -> bytes:
+        if not self._started:
+            self.start()
+        if self.broken:
+            raise RuntimeError("Chromium renderer pool is not running")
+
+        future: Future = Future()
+        start = time.perf_counter()
+        self._jobs.put((future, kind, html, options or {}))
+        if self.broken:
+            # The last worker died while this job was being queued
+            self._fail_pending()
+        result = future.result(timeout=self.render_timeout)
+        render_stats.record(self.name, kind, time.perf_counter() - start)
+        return result
+
+    def render_image(self, html: str, options: Optional[dict] = None) -> bytes:
+        return self._submit("image", html, options)
+
+    def render_pdf(self, html: str, options: Optional[dict] = None) -> bytes:
+        return self._submit("pdf", html, options)
+
+    def _stop_workers(self):
+        with self._state_lock:
+            self._stopping = True
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout=10)
+        self._workers = []
+
+    def close(self):
+        with self._lock:
+            if not self._started:
+                return
+            self._stop_workers()
+            self._started = False
+            logger.info("Chromium renderer pool stopped")
@@ -12,6 +12,8 @@ import asyncio
 from wasenderapi.errors import WasenderAPIError
 from globals.config.config import BUCKET_NAME
 from src.messages.services.whatsappMessagesService import WhatsappMessagesService
+from src.bills.queries.billsQueries import BillsQueries
+from db.postgres.connection import PostgresClient
 import time
 from globals.config.config import BUSINESS_NAME_PLACEHOLDER
 
@@ -23,35 +25,49 @@ fixed_tpl = env.get_template("fixedBill.html")
 
 
 @celery_app.task(name="bills.generate_combined_pdf_for_due_date", bind=True, max_retries=2)
-def generate_pdfs_for_due_date(self, bills_full_data_for_due_date, user_phone_number):
+def generate_pdfs_for_due_date(self, billing_date, user_phone_number, rate_id=None, bill_ids=None):
     """
     Generate a single PDF with multiple bills per page (4 bills per page)
     Much more efficient than individual PDFs
+    Bill payloads are streamed from the database page by page straight into the PDF writer.
     """
     try:
-        total_bills = len(bills_full_data_for_due_date)
-        logger.info(f"Generating combined PDF with {total_bills} bills (4 per page)")
-        
+        bills_queries = BillsQueries()
+        start_time = time.time()
+
+        def stream_bills(session):
+            # Pages are pulled from the database only as the PDF writer needs them
+            for page in bills_queries.iter_bills_full_data_for_due_date_sync(
+                session=session,
+                billing_date=billing_date,
+                bill_ids=bill_ids,
+                rate_id=rate_id
+            ):
+                for bill_data in page:
+                    bill_data["business_name"] = BUSINESS_NAME_PLACEHOLDER
+                    yield bill_data
+
+        logger.info(f"Generating combined PDF for {billing_date} (4 bills per page)")
+
+        with PostgresClient.get_sync_session() as session:
+            result = PDFService.generate_combined_bills_pdf(
+                bills_data=stream_bills(session),
+                usage_template=usage_tpl,
+                fixed_template=fixed_tpl,
+                bills_per_page=4
+            )
+
+        if result is None:
+            raise Exception("Failed to generate PDF")
+
+        total_bills = result["total_bills"]
+        download_url = result["download_url"]
         if total_bills == 0:
             return {"status": "completed", "processed": 0, "download_url": None}
 
-        start_time = time.time()
-        
-        # Add business name to all bills
-        for bill_data in bills_full_data_for_due_date:
-            bill_data["business_name"] = BUSINESS_NAME_PLACEHOLDER
-        
-        # Generate combined PDF
-        download_url = PDFService.generate_combined_bills_pdf(
-            bills_data=bills_full_data_for_due_date,
-            usage_template=usage_tpl,
-            fixed_template=fixed_tpl,
-            bills_per_page=4
-        )
-        
-        if not download_url:
-            raise Exception("Failed to generate PDF")
-        
+        if result["failed_bills"]:
+            logger.warning(f"{len(result['failed_bills'])} bills could not be rendered into the combined PDF")
+
         # Send WhatsApp notification
         whatsapp_messages_service = WhatsappMessagesService()
         try:
@@ -72,7 +88,8 @@ def generate_pdfs_for_due_date(self, bills_full_data_for_due_date, user_phone_nu
             "status": "completed",
             "total_bills": total_bills,
             "bills_per_page": 4,
-            "total_pages": (total_bills + 3) // 4,  # Ceiling division
+            "total_pages": result["total_pages"],
+            "failed_bills": result["failed_bills"],
             "download_url": download_url,
             "processing_time": f"{processing_time:.2f} seconds"
         }
@@ -3,7 +3,11 @@ from globals.utils.logger import logger
 from jinja2 import Environment, FileSystemLoader
 import os
 from src.bills.services.pdfService import PDFService
+from src.bills.queries.billsQueries import BillsQueries
 from db.postgres.connection import PostgresClient
+from celery import chord, group
+from celery.exceptions import Ignore
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from globals.config.config import BUSINESS_NAME_PLACEHOLDER
 
@@ -13,78 +17,217 @@ env = Environment(loader=FileSystemLoader(template_dir))
 usage_tpl = env.get_template("usageBill.html")
 fixed_tpl = env.get_template("fixedBill.html")
 
+# Number of wkhtmltoimage renders run concurrently inside one chunk task
+RENDER_POOL_WORKERS = 4
+
 
 @celery_app.task(name="bills.generate_images_for_due_date", bind=True, max_retries=2)
-def generate_images_for_due_date(self, bills_full_data_for_due_date, chunk_size=25):
-    """Celery task: render bill images for a due_date and upload to GCS."""
+def generate_images_for_due_date(self, billing_date, rate_id=None, bill_ids=None, chunk_size=25, fan_out=False, workers=RENDER_POOL_WORKERS):
+    """
+    Celery task: render bill images for a due_date and upload to GCS.
+    The task only receives a job descriptor; bill payloads are read page by page from the database.
+    With fan_out the due date is split into chunks that are rendered in parallel as a chord,
+    and this task is replaced by the chord so its result is the aggregated summary.
+    """
     try:
-        total_bills = len(bills_full_data_for_due_date)
-        logger.info(f"Processing {total_bills} bills in chunks of {chunk_size}")
-
         start_time = time.time()
-        # Split bills into chunks
-        chunks = [
-            bills_full_data_for_due_date[i:i + chunk_size] 
-            for i in range(0, total_bills, chunk_size)
-        ]
-        
-        chunks = [
-            bills_full_data_for_due_date[i:i + chunk_size] 
-            for i in range(0, total_bills, chunk_size)
-        ]
-        
+        bills_queries = BillsQueries()
+
+        if fan_out:
+            if not bill_ids:
+                with PostgresClient.get_sync_session() as session:
+                    bill_ids = bills_queries.get_bill_ids_for_due_date_sync(
+                        session=session,
+                        billing_date=billing_date
+                    )
+
+            total_bills = len(bill_ids)
+            chunks = [bill_ids[i:i + chunk_size] for i in range(0, total_bills, chunk_size)]
+            if not chunks:
+                return summarize_bill_images([], total_bills=0, start_time=start_time)
+
+            logger.info(f"Fanning out {total_bills} bills for billing date {billing_date} into {len(chunks)} chunks")
+            workflow = chord(
+                group(
+                    render_bill_images_chunk.s(billing_date, chunk, rate_id=rate_id, workers=workers)
+                    for chunk in chunks
+                ),
+                summarize_bill_images.s(total_bills=total_bills, start_time=start_time)
+            )
+            return self.replace(workflow)
+
+        logger.info(f"Processing bills for billing date {billing_date} in chunks of {chunk_size}")
+
+        total_bills = 0
         total_processed = 0
         total_failed = 0
         failed_bills = []
-        
-        # Process chunks sequentially (single worker benefit)
-        for i, chunk in enumerate(chunks, 1):
-            try:
-                logger.info(f"Processing chunk {i}/{len(chunks)} ({len(chunk)} bills)")
-                
-                with PostgresClient.get_sync_session() as session:
-                    chunk_processed = 0
-                    chunk_failed = 0
-                    
-                    for bill in chunk:
+        chunks_processed = 0
+
+        with PostgresClient.get_sync_session() as read_session:
+            pages = bills_queries.iter_bills_full_data_for_due_date_sync(
+                session=read_session,
+                billing_date=billing_date,
+                bill_ids=bill_ids,
+                rate_id=rate_id,
+                page_size=chunk_size
+            )
+
+            # Process chunks sequentially (single worker benefit)
+            for i, chunk in enumerate(pages, 1):
+                chunks_processed = i
+                total_bills += len(chunk)
+                try:
+                    logger.info(f"Processing chunk {i} ({len(chunk)} bills)")
+
+                    with PostgresClient.get_sync_session() as session:
+                        chunk_failed = 0
+                        blob_names = []
+
+                        for bill in chunk:
+                            bill_id = str(bill.get('bill_id', 'unknown'))
+                            try:
+                                bill["business_name"] = BUSINESS_NAME_PLACEHOLDER
+                                blob_name = PDFService.render_bill_image_sync(
+                                    bill_data=bill,
+                                    usage_template=usage_tpl,
+                                    fixed_template=fixed_tpl
+                                )
+                                blob_names.append((bill_id, blob_name))
+
+                            except Exception as bill_error:
+                                chunk_failed += 1
+                                failed_bills.append(bill_id)
+                                logger.error(f"Failed to process bill {bill_id}: {bill_error}")
+
+                        # One idempotent write-back per chunk instead of one transaction per bill
                         try:
-                            bill["business_name"] = BUSINESS_NAME_PLACEHOLDER
-                            PDFService.generate_single_bill_jpg_sync(
-                                bill_data=bill,
-                                usage_template=usage_tpl,
-                                fixed_template=fixed_tpl,
-                                session=session
-                            )
-                            chunk_processed += 1
-                            
-                        except Exception as bill_error:
-                            chunk_failed += 1
-                            bill_id = bill.get('bill_id', 'unknown')
-                            failed_bills.append(str(bill_id))
-                            logger.error(f"Failed to process bill {bill_id}: {bill_error}")
-                    
-                    total_processed += chunk_processed
-                    total_failed += chunk_failed
-                    
-                    logger.info(f"Chunk {i} completed: {chunk_processed} processed, {chunk_failed} failed")
-                    
-            except Exception as chunk_error:
-                logger.error(f"Chunk {i} failed entirely: {chunk_error}")
-                total_failed += len(chunk)
-                failed_bills.extend([str(b.get('bill_id', 'unknown')) for b in chunk])
-        
+                            bills_queries.bulk_update_blob_names_sync(session=session, blob_names=blob_names)
+                            chunk_processed = len(chunk) - chunk_failed
+                        except Exception as flush_error:
+                            logger.error(f"Failed to save image names for chunk {i}: {flush_error}")
+                            chunk_processed = len(chunk) - chunk_failed - len(blob_names)
+                            chunk_failed += len(blob_names)
+                            failed_bills.extend(bill_id for bill_id, _ in blob_names)
+
+                        total_processed += chunk_processed
+                        total_failed += chunk_failed
+
+                        logger.info(f"Chunk {i} completed: {chunk_processed} processed, {chunk_failed} failed")
+
+                except Exception as chunk_error:
+                    logger.error(f"Chunk {i} failed entirely: {chunk_error}")
+                    total_failed += len(chunk)
+                    failed_bills.extend([str(b.get('bill_id', 'unknown')) for b in chunk])
+
         return {
             "status": "completed",
             "total_bills": total_bills,
             "processed": total_processed,
             "failed": total_failed,
             "failed_bills": failed_bills,
-            "chunks_processed": len(chunks),
-            "processing_time": f"{time.time() - start_time} seconds"
+            "chunks_processed": chunks_processed,
+            "processing_time": f"{time.time() - start_time} seconds",
+            # One entry per rendering process, the same shape as the fan-out summary
+            "render_stats": [PDFService.get_render_stats()]
         }
         
+    except Ignore:
+        raise
+
     except Exception as e:
         logger.error(f"Task failed: {e}")
         raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
 
-        
\ No newline at end of file
+
+@celery_app.task(name="bills.render_bill_images_chunk", bind=True)
+def render_bill_images_chunk(self, billing_date, bill_ids, rate_id=None, workers=RENDER_POOL_WORKERS):
+    """
+    Celery task: render one chunk of bills with a bounded pool of concurrent wkhtmltoimage renders.
+    Never raises, so a bad chunk is reported in the summary instead of breaking the chord.
+    """
+    processed = 0
+    failed_bills = []
+    try:
+        bills_queries = BillsQueries()
+        with PostgresClient.get_sync_session() as session:
+            chunk = [
+                bill
+                for page in bills_queries.iter_bills_full_data_for_due_date_sync(
+                    session=session,
+                    billing_date=billing_date,
+                    bill_ids=bill_ids,
+                    rate_id=rate_id,
+                    page_size=len(bill_ids)
+                )
+                for bill in page
+            ]
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                for bill in chunk:
+                    bill["business_name"] = BUSINESS_NAME_PLACEHOLDER
+                    future = executor.submit(
+                        PDFService.render_bill_image_sync,
+                        bill_data=bill,
+                        usage_template=usage_tpl,
+                        fixed_template=fixed_tpl
+                    )
+                    futures[future] = str(bill["bill_id"])
+
+                blob_names = []
+                for future in as_completed(futures):
+                    bill_id = futures[future]
+                    try:
+                        blob_names.append((bill_id, future.result()))
+
+                    except Exception as bill_error:
+                        failed_bills.append(bill_id)
+                        logger.error(f"Failed to process bill {bill_id}: {bill_error}")
+
+            # One idempotent write-back for the whole chunk, safe to re-apply on a retry
+            try:
+                bills_queries.bulk_update_blob_names_sync(session=session, blob_names=blob_names)
+                processed = len(blob_names)
+            except Exception as flush_error:
+                logger.error(f"Failed to save image names for chunk: {flush_error}")
+                failed_bills.extend(bill_id for bill_id, _ in blob_names)
+
+        missing = set(bill_ids) - {str(bill["bill_id"]) for bill in chunk}
+        failed_bills.extend(missing)
+
+    except Exception as chunk_error:
+        logger.error(f"Chunk of {len(bill_ids)} bills failed entirely: {chunk_error}")
+        processed = 0
+        failed_bills = [str(bill_id) for bill_id in bill_ids]
+
+    logger.info(f"Chunk completed: {processed} processed, {len(failed_bills)} failed")
+    return {
+        "processed": processed,
+        "failed": len(failed_bills),
+        "failed_bills": failed_bills,
+        "render_stats": PDFService.get_render_stats()
+    }
+
+
+@celery_app.task(name="bills.summarize_bill_images")
+def summarize_bill_images(chunk_results, total_bills, start_time):
+    """
+    Celery task: chord callback aggregating chunk results into the image generation summary.
+    Render latency percentiles are per worker process and cannot be merged, so render_stats
+    lists each chunk's stats, as the sequential summary lists its single process's.
+    """
+    failed_bills = []
+    for chunk_result in chunk_results:
+        failed_bills.extend(chunk_result.get("failed_bills", []))
+
+    return {
+        "status": "completed",
+        "total_bills": total_bills,
+        "processed": sum(chunk_result.get("processed", 0) for chunk_result in chunk_results),
+        "failed": sum(chunk_result.get("failed", 0) for chunk_result in chunk_results),
+        "failed_bills": failed_bills,
+        "chunks_processed": len(chunk_results),
+        "processing_time": f"{time.time() - start_time} seconds",
+        "render_stats": [chunk_result.get("render_stats", {}) for chunk_result in chunk_results]
+    }
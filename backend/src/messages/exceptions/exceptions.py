@@ -10,3 +10,9 @@ class WhatsAppSessionAlreadyExistsError(Exception):
     def __init__(self):
         self.message = "WhatsApp session already exists."
         super().__init__(self.message)
+
+
+class CampaignNotFoundError(Exception):
+    def __init__(self):
+        self.message = "Message campaign not found."
+        super().__init__(self.message)
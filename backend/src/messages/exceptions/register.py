@@ -8,7 +8,8 @@ from globals.responses.responses import (
 
 from src.messages.exceptions.exceptions import (
     WhatsAppSessionNotFoundError,
-    WhatsAppSessionAlreadyExistsError
+    WhatsAppSessionAlreadyExistsError,
+    CampaignNotFoundError
 )
 
 
@@ -28,4 +29,12 @@ def register_messages_exceptions(app: FastAPI):
     ):
         return bad_request_error_response(
             message=exc.message
-        )
\ No newline at end of file
+        )
+
+    @app.exception_handler(CampaignNotFoundError)
+    async def handle_campaign_not_found_error(
+        request: Request, exc: CampaignNotFoundError
+    ):
+        return not_found_error_response(
+            message=exc.message
+        )
@@ -0,0 +1,400 @@
+from globals.utils.logger import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import update, select, func, insert, and_, or_, exists, String, values, column, case
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from db.postgres.tables.message_campaigns import MessageCampaigns, CampaignRecipients
+from src.messages.exceptions.exceptions import CampaignNotFoundError
+from datetime import datetime, timedelta
+from typing import List
+from uuid import UUID, uuid4
+import json
+
+
+class CampaignsQueries:
+    def __init__(self):
+        logger.info("Campaigns Queries initialized successfully.")
+
+
+    def _campaign_rows(
+        self,
+        template: str,
+        customers: List[dict],
+        template_id: str = None,
+        created_by: str = None,
+        requested_by_phone_number: str = None,
+        scheduled_at: datetime = None,
+    ):
+        """The campaign row and its recipient rows, shared by the async and sync create paths."""
+        campaign_id = uuid4()
+        campaign = {
+            "campaign_id": campaign_id,
+            "template_id": template_id,
+            "template": template,
+            "status": "scheduled",
+            "total_recipients": len(customers),
+            "requested_by_phone_number": requested_by_phone_number,
+            "scheduled_at": scheduled_at,
+            "created_by": created_by,
+        }
+
+        # Payloads go through JSON once so dates/decimals are stored as plain values
+        recipients = [
+            {
+                "recipient_id": uuid4(),
+                "campaign_id": campaign_id,
+                "meter_id": customer.get("meter_id"),
+                "phone_number": customer.get("customer_phone_number"),
+                "payload": json.loads(json.dumps(customer, default=str)),
+                "status": "pending",
+                "attempts": 0,
+            }
+            for customer in customers
+        ]
+        return campaign, recipients
+
+
+    async def create_campaign(
+        self,
+        session: AsyncSession,
+        template: str,
+        customers: List[dict],
+        template_id: str = None,
+        created_by: str = None,
+        requested_by_phone_number: str = None,
+        scheduled_at: datetime = None,
+    ) -> str:
+        """Create a campaign and all of its recipient rows in one transaction, returns the campaign ID."""
+        try:
+            campaign, recipients = self._campaign_rows(
+                template, customers, template_id, created_by, requested_by_phone_number, scheduled_at
+            )
+            await session.execute(insert(MessageCampaigns).values(**campaign))
+            if recipients:
+                await session.execute(insert(CampaignRecipients), recipients)
+
+            await session.commit()
+            logger.info(f"Campaign {campaign['campaign_id']} created with {len(recipients)} recipients.")
+            return str(campaign["campaign_id"])
+
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Error creating message campaign: {e}")
+            raise
+
+
+    def create_campaign_sync(
+        self,
+        session: Session,
+        template: str,
+        customers: List[dict],
+        template_id: str = None,
+        created_by: str = None,
+        requested_by_phone_number: str = None,
+        scheduled_at: datetime = None,
+    ) -> str:
+        """Sync variant of create_campaign for Celery tasks."""
+        try:
+            campaign, recipients = self._campaign_rows(
+                template, customers, template_id, created_by, requested_by_phone_number, scheduled_at
+            )
+            session.execute(insert(MessageCampaigns).values(**campaign))
+            if recipients:
+                session.execute(insert(CampaignRecipients), recipients)
+
+            session.commit()
+            logger.info(f"Campaign {campaign['campaign_id']} created with {len(recipients)} recipients.")
+            return str(campaign["campaign_id"])
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error creating message campaign: {e}")
+            raise
+
+
+    def get_campaign_sync(self, session: Session, campaign_id: str) -> dict:
+        try:
+            campaign = session.execute(
+                select(MessageCampaigns).where(MessageCampaigns.campaign_id == campaign_id)
+            ).scalar_one_or_none()
+            if not campaign:
+                logger.error(f"Campaign with ID {campaign_id} not found.")
+                raise CampaignNotFoundError()
+
+            return {
+                "campaign_id": str(campaign.campaign_id),
+                "template_id": str(campaign.template_id) if campaign.template_id else None,
+                "template": campaign.template,
+                "status": campaign.status,
+                "total_recipients": campaign.total_recipients,
+                "requested_by_phone_number": campaign.requested_by_phone_number,
+            }
+
+        except Exception as e:
+            logger.error(f"Error fetching campaign {campaign_id}: {e}")
+            raise
+
+
+    def start_campaign_sync(self, session: Session, campaign_id: str):
+        try:
+            session.execute(
+                update(MessageCampaigns)
+                .where(
+                    MessageCampaigns.campaign_id == campaign_id,
+                    MessageCampaigns.status == "scheduled",
+                )
+                .values(status="running", started_at=func.now())
+            )
+            session.commit()
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error starting campaign {campaign_id}: {e}")
+            raise
+
+
+    def claim_recipients_sync(
+        self,
+        session: Session,
+        campaign_id: str,
+        batch_size: int = 50,
+        max_attempts: int = 3,
+        stale_after_minutes: int = 15,
+    ) -> List[dict]:
+        """
+        Claim up to batch_size recipients for this worker and mark them as sending.
+
+        Rows are picked with FOR UPDATE SKIP LOCKED, so parallel workers never claim
+        the same recipient. Rows left in sending by a worker that died are claimed
+        again once stale, and given up on after max_attempts.
+        """
+        try:
+            stale_before = func.now() - timedelta(minutes=stale_after_minutes)
+            is_stale = and_(
+                CampaignRecipients.status == "sending",
+                CampaignRecipients.claimed_at < stale_before,
+            )
+
+            session.execute(
+                update(CampaignRecipients)
+                .where(
+                    CampaignRecipients.campaign_id == campaign_id,
+                    is_stale,
+                    CampaignRecipients.attempts >= max_attempts,
+                )
+                .values(status="failed", last_error="Delivery attempts exhausted")
+            )
+
+            claimable = (
+                select(CampaignRecipients.recipient_id)
+                .where(
+                    CampaignRecipients.campaign_id == campaign_id,
+                    or_(CampaignRecipients.status == "pending", is_stale),
+                )
+                .order_by(CampaignRecipients.created_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = session.execute(
+                update(CampaignRecipients)
+                .where(CampaignRecipients.recipient_id.in_(claimable))
+                .values(
+                    status="sending",
+                    claimed_at=func.now(),
+                    attempts=CampaignRecipients.attempts + 1,
+                )
+                .returning(
+                    CampaignRecipients.recipient_id,
+                    CampaignRecipients.phone_number,
+                    CampaignRecipients.payload,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            claimed = [
+                {
+                    "recipient_id": str(row.recipient_id),
+                    "phone_number": row.phone_number,
+                    "payload": row.payload,
+                }
+                for row in result
+            ]
+            session.commit()
+            return claimed
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error claiming recipients for campaign {campaign_id}: {e}")
+            raise
+
+
+    def mark_recipients_sync(self, session: Session, outcomes: List[tuple]):
+        """Record (recipient_id, status, error) outcomes for a claimed batch in one UPDATE."""
+        if not outcomes:
+            return
+        try:
+            recipient_outcomes = (
+                values(
+                    column("recipient_id", PG_UUID(as_uuid=True)),
+                    column("status", String(20)),
+                    column("last_error", String),
+                    name="recipient_outcomes",
+                )
+                .data([(UUID(str(recipient_id)), status, error) for recipient_id, status, error in outcomes])
+            )
+            session.execute(
+                update(CampaignRecipients)
+                .where(
+                    CampaignRecipients.recipient_id == recipient_outcomes.c.recipient_id,
+                    CampaignRecipients.status == "sending",
+                )
+                .values(
+                    status=recipient_outcomes.c.status,
+                    last_error=recipient_outcomes.c.last_error,
+                    sent_at=case(
+                        (recipient_outcomes.c.status == "sent", func.now()),
+                        else_=CampaignRecipients.sent_at,
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error recording outcomes for {len(outcomes)} recipients: {e}")
+            raise
+
+
+    def release_recipients_sync(self, session: Session, recipient_ids: List[str], max_attempts: int = 3):
+        """
+        Hand a batch this worker claimed but could not finish back to the queue, so a retry
+        resumes with it at once instead of waiting for the rows to go stale. Rows that used up
+        their attempts are failed instead.
+        """
+        if not recipient_ids:
+            return
+        try:
+            exhausted = CampaignRecipients.attempts >= max_attempts
+            session.execute(
+                update(CampaignRecipients)
+                .where(
+                    CampaignRecipients.recipient_id.in_([UUID(str(recipient_id)) for recipient_id in recipient_ids]),
+                    CampaignRecipients.status == "sending",
+                )
+                .values(
+                    status=case((exhausted, "failed"), else_="pending"),
+                    last_error=case((exhausted, "Delivery attempts exhausted"), else_=CampaignRecipients.last_error),
+                    claimed_at=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error releasing {len(recipient_ids)} recipients: {e}")
+            raise
+
+
+    def complete_campaign_if_done_sync(self, session: Session, campaign_id: str) -> bool:
+        """
+        Mark the campaign completed once no recipient is pending or sending.
+        Returns True only for the single caller that performed the transition.
+        """
+        try:
+            unfinished = exists().where(
+                CampaignRecipients.campaign_id == campaign_id,
+                CampaignRecipients.status.in_(["pending", "sending"]),
+            )
+            result = session.execute(
+                update(MessageCampaigns)
+                .where(
+                    MessageCampaigns.campaign_id == campaign_id,
+                    MessageCampaigns.status == "running",
+                    ~unfinished,
+                )
+                .values(status="completed", completed_at=func.now())
+                .returning(MessageCampaigns.campaign_id)
+            )
+            completed = result.first() is not None
+            session.commit()
+            return completed
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error completing campaign {campaign_id}: {e}")
+            raise
+
+
+    def count_recipients_by_status_sync(self, session: Session, campaign_id: str) -> dict:
+        try:
+            result = session.execute(
+                select(CampaignRecipients.status, func.count())
+                .where(CampaignRecipients.campaign_id == campaign_id)
+                .group_by(CampaignRecipients.status)
+            )
+            return {status: count for status, count in result}
+
+        except Exception as e:
+            logger.error(f"Error counting recipients for campaign {campaign_id}: {e}")
+            raise
+
+
+    async def get_campaign_progress(self, session: AsyncSession, campaign_id: str) -> dict:
+        try:
+            result = await session.execute(
+                select(
+                    MessageCampaigns,
+                    func.extract(
+                        "epoch",
+                        func.coalesce(MessageCampaigns.completed_at, func.now()) - MessageCampaigns.started_at,
+                    ).label("elapsed_seconds"),
+                ).where(MessageCampaigns.campaign_id == campaign_id)
+            )
+            row = result.first()
+            if not row:
+                logger.error(f"Campaign with ID {campaign_id} not found.")
+                raise CampaignNotFoundError()
+            campaign, elapsed_seconds = row
+
+            counts_result = await session.execute(
+                select(CampaignRecipients.status, func.count())
+                .where(CampaignRecipients.campaign_id == campaign_id)
+                .group_by(CampaignRecipients.status)
+            )
+            counts = {status: count for status, count in counts_result}
+
+            sent = counts.get("sent", 0)
+            failed = counts.get("failed", 0)
+            processed = sent + failed
+            remaining = counts.get("pending", 0) + counts.get("sending", 0)
+
+            elapsed_seconds = float(elapsed_seconds) if elapsed_seconds else 0.0
+            throughput_per_minute = processed / elapsed_seconds * 60 if elapsed_seconds > 0 else 0.0
+            eta_seconds = (
+                remaining / throughput_per_minute * 60
+                if throughput_per_minute > 0 and remaining
+                else None
+            )
+
+            return {
+                "campaign_id": str(campaign.campaign_id),
+                "status": campaign.status,
+                "total_recipients": campaign.total_recipients,
+                "sent": sent,
+                "failed": failed,
+                "pending": counts.get("pending", 0),
+                "in_progress": counts.get("sending", 0),
+                "progress_percent": round(processed / campaign.total_recipients * 100, 2) if campaign.total_recipients else 100.0,
+                "throughput_per_minute": round(throughput_per_minute, 2),
+                "elapsed_seconds": round(elapsed_seconds, 1),
+                "eta_seconds": round(eta_seconds) if eta_seconds is not None else None,
+                "scheduled_at": campaign.scheduled_at.isoformat() if campaign.scheduled_at else None,
+                "started_at": campaign.started_at.isoformat() if campaign.started_at else None,
+                "completed_at": campaign.completed_at.isoformat() if campaign.completed_at else None,
+            }
+
+        except Exception as e:
+            logger.error(f"Error fetching progress for campaign {campaign_id}: {e}")
+            raise
@@ -20,3 +20,12 @@ async def send_messages(
 ):
     return await messages_service.send_messages(request, session)
 
+
+
+@messages_router.get("/campaigns/{campaign_id}/progress")
+async def get_campaign_progress(
+    request: Request,
+    messages_service: MessagesService = Depends(get_messages_service),
+    session: AsyncSession = Depends(get_async_session)
+):
+    return await messages_service.get_campaign_progress(request, session)
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+
+class GetCampaignProgressRequestPath(BaseModel):
+    campaign_id: UUID = Field(..., description="Unique identifier for the message campaign")
+
+    class Config:
+        extra = "forbid"
@@ -0,0 +1,141 @@
+import asyncio
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+from wasenderapi.errors import WasenderAPIError
+
+from globals.utils.logger import logger
+from globals.config.config import (
+    WA_SEND_RATE_PER_SECOND,
+    WA_SEND_BURST,
+    WA_SEND_CONCURRENCY,
+    WA_SEND_MAX_RETRIES,
+    WA_SEND_RETRY_BASE_SECONDS,
+)
+from src.messages.services.whatsappMessagesService import WhatsappMessagesService
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity` tokens."""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nothing is sent for `seconds` (used when the provider answers 429)"""
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+        self._updated = time.monotonic()
+
+
+class BulkWhatsappSender:
+    """
+    Sends many WhatsApp messages through one client, paced by a token bucket that
+    matches the provider's limit, with bounded concurrency so a slow request does
+    not hold up the ones behind it, and retries with exponential backoff.
+    """
+
+    RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        whatsapp_messages_service: WhatsappMessagesService,
+        rate_per_second: float = WA_SEND_RATE_PER_SECOND,
+        burst: int = WA_SEND_BURST,
+        concurrency: int = WA_SEND_CONCURRENCY,
+        max_retries: int = WA_SEND_MAX_RETRIES,
+        retry_base_seconds: float = WA_SEND_RETRY_BASE_SECONDS,
+    ):
+        self.whatsapp_messages_service = whatsapp_messages_service
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, WasenderAPIError):
+            status_code = getattr(error, "status_code", None)
+            return status_code is None or status_code in self.RETRYABLE_STATUS_CODES
+        return isinstance(error, (asyncio.TimeoutError, ConnectionError, OSError))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            return float(retry_after)
+        return self.retry_base_seconds * (2 ** attempt) + random.uniform(0, self.retry_base_seconds)
+
+    async def _send_with_retry(self, client, phone_number: str, message: str, image_url: Optional[str]):
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            try:
+                return await self.whatsapp_messages_service.send_whatsapp_message(
+                    phone_number, message, image_url=image_url, client=client
+                )
+            except Exception as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._retry_delay(e, attempt)
+                if getattr(e, "status_code", None) == 429:
+                    self.bucket.pause(delay)
+                attempt += 1
+                logger.warning(f"Retrying message to {phone_number} in {delay:.1f}s (attempt {attempt}): {e}")
+                await asyncio.sleep(delay)
+
+    async def send_all(
+        self,
+        messages: List[Dict],
+        on_result: Optional[Callable[[int, Dict], None]] = None,
+    ) -> List[Dict]:
+        """
+        Send messages given as dicts with phone_number, message and optional image_url.
+        Returns one {"status": "sent"} or {"status": "failed", "error": ...} per message,
+        in input order. on_result is called as soon as each message settles.
+        """
+        results: List[Optional[Dict]] = [None] * len(messages)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        wa_async_client = await self.whatsapp_messages_service.create_async_client()
+        async with wa_async_client as client:
+
+            async def _worker(index: int, item: Dict):
+                async with semaphore:
+                    try:
+                        await self._send_with_retry(
+                            client, item["phone_number"], item["message"], item.get("image_url")
+                        )
+                        result = {"status": "sent"}
+                    except Exception as e:
+                        logger.error(f"Failed to send message to {item.get('phone_number')}: {e}")
+                        result = {"status": "failed", "error": str(e)}
+                results[index] = result
+                if on_result:
+                    on_result(index, result)
+
+            await asyncio.gather(*(_worker(i, item) for i, item in enumerate(messages)))
+
+        return results
+
+    async def send_one(self, phone_number: str, message: str, image_url: Optional[str] = None):
+        """Send a single message under the same rate limit and retry policy"""
+        wa_async_client = await self.whatsapp_messages_service.create_async_client()
+        async with wa_async_client as client:
+            return await self._send_with_retry(client, phone_number, message, image_url)
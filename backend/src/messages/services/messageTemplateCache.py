@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional, Union
+
+from jinja2 import Environment, Template
+
+from globals.utils.logger import logger
+
+
+class MessageTemplateCache:
+    """
+    Process-wide LRU of compiled message templates.
+
+    Entries are keyed by template_id plus a hash of the template text, so editing a
+    template produces a new entry instead of serving the stale compiled version, and
+    ad-hoc messages (no template_id) are shared by content.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        # Same defaults as jinja2.Template(source), which the tasks used before
+        self.environment = Environment()
+        self._templates: "OrderedDict[tuple, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(source: str, template_id: Optional[str]) -> tuple:
+        return (str(template_id) if template_id else None, hashlib.sha256(source.encode()).hexdigest())
+
+    def get(self, source: str, template_id: Optional[str] = None) -> Template:
+        key = self._key(source, template_id)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return template
+            self.misses += 1
+
+        # Compile outside the lock; a concurrent miss on the same key just compiles twice
+        template = self.environment.from_string(source)
+        with self._lock:
+            self._templates[key] = template
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+        logger.debug(f"Compiled message template {key[0] or 'inline'} ({key[1][:12]})")
+        return template
+
+    def render_batch(
+        self,
+        source: str,
+        contexts: Iterable[dict],
+        template_id: Optional[str] = None,
+    ) -> List[Union[str, Exception]]:
+        """
+        Render one template for many recipients with a single compile.
+        Each item is the rendered message, or the exception raised for that row.
+        """
+        template = self.get(source, template_id)
+
+        rendered = []
+        for context in contexts:
+            try:
+                rendered.append(template.render(context))
+            except Exception as e:
+                rendered.append(e)
+        return rendered
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+message_template_cache = MessageTemplateCache()
@@ -19,16 +19,25 @@ from src.messages.schemas.createSessionSchema import CreateSessionRequestBody
 from src.messages.services.whatsappSessionService import WhatsAppSessionService
 from zoneinfo import ZoneInfo
 from datetime import datetime, timezone
-from src.messages.tasks.sendMessagesTask import send_messages_task
+from src.messages.tasks.sendMessagesTask import send_campaign_task
+from src.messages.queries.campaignsQueries import CampaignsQueries
+from src.messages.schemas.getCampaignProgressSchema import GetCampaignProgressRequestPath
+from src.messages.exceptions.exceptions import CampaignNotFoundError
 from wasenderapi import WasenderAsyncClient, create_async_wasender
 from globals.config.config import WA_SENDER_API_PAT
 from wasenderapi.errors import WasenderAPIError
 from wasenderapi.models import TextOnlyMessage
 
 
+# Number of send_campaign tasks started per campaign. Each worker paces itself with its own
+# token bucket, so raise this only together with the provider limits in the WHATSAPP config.
+CAMPAIGN_WORKERS = 1
+
+
 class MessagesService:
     def __init__(self):
         self.messages_queries = MessagesQueries()
+        self.campaigns_queries = CampaignsQueries()
         self.whatsapp_session_service = WhatsAppSessionService()
         self.timezone = ZoneInfo("Asia/Beirut")
         self.wa_async_client = create_async_wasender(api_key=WA_SENDER_API_PAT)
@@ -67,25 +76,39 @@ class MessagesService:
 
             send_immediately = body.get("send_immediately", False)
             scheduled_at = body.get("scheduled_at", None)
-            if send_immediately:
-                # Send messages immediately
-                task = send_messages_task.delay(customers_to_notify, template, user_phone_number)
-                logger.info("Sending messages immediately.")
-
-            else:
-                # Schedule messages for later
+            scheduled_at_utc = None
+            if not send_immediately:
                 scheduled_at_beirut = datetime.fromisoformat(scheduled_at)
                 scheduled_at_utc = scheduled_at_beirut.astimezone(timezone.utc)
-                task = send_messages_task.apply_async(
-                    args=[customers_to_notify, template, user_phone_number],
-                    eta=scheduled_at_utc
-                ) 
-                logger.info(f"Scheduling messages to be sent at {scheduled_at_utc}.")
+
+            # Recipients are persisted so sending survives worker restarts and can be tracked
+            campaign_id = await self.campaigns_queries.create_campaign(
+                session=session,
+                template=template,
+                customers=customers_to_notify,
+                template_id=body.get("template_id"),
+                created_by=request.state.user.get('user_id'),
+                requested_by_phone_number=user_phone_number,
+                scheduled_at=scheduled_at_utc.replace(tzinfo=None) if scheduled_at_utc else None
+            )
+
+            tasks = []
+            for _ in range(CAMPAIGN_WORKERS):
+                if send_immediately:
+                    tasks.append(send_campaign_task.delay(campaign_id))
+                else:
+                    tasks.append(send_campaign_task.apply_async(args=[campaign_id], eta=scheduled_at_utc))
+
+            if send_immediately:
+                logger.info(f"Sending campaign {campaign_id} immediately.")
+            else:
+                logger.info(f"Scheduling campaign {campaign_id} to be sent at {scheduled_at_utc}.")
 
             return success_response(
                 message="Messages sent successfully.",
                 data={
-                    "task_id": task.id,
+                    "task_id": tasks[0].id,
+                    "campaign_id": campaign_id,
                     "customers": len(customers_to_notify)
                 }
             )
@@ -104,6 +127,33 @@ class MessagesService:
             raise InternalServerError("An error occurred while sending messages.")
 
 
+    async def get_campaign_progress(self, request: Request, session: AsyncSession):
+        valid, validated_request = await validate_request(
+            request=request,
+            path_model=GetCampaignProgressRequestPath
+        )
+        if not valid:
+            logger.error(f"Validation error in get_campaign_progress: {validated_request}")
+            raise ValidationError(validated_request)
+
+        try:
+            progress = await self.campaigns_queries.get_campaign_progress(
+                session=session,
+                campaign_id=validated_request.get('path').get("campaign_id")
+            )
+            return success_response(
+                message="Campaign progress fetched successfully.",
+                data=progress
+            )
+
+        except CampaignNotFoundError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error in get_campaign_progress: {e}")
+            raise InternalServerError("An error occurred while fetching campaign progress.")
+
+
     async def send_message(self, request: Request, session: AsyncSession):
         valid, validated_request = await validate_request(
             request=request,
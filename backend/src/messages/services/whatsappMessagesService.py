@@ -64,22 +64,32 @@ class WhatsappMessagesService:
             raise
 
 
-    async def send_whatsapp_message(self, phone_number: str, message: str, image_url: str = None):
+    @staticmethod
+    def build_message_payload(phone_number: str, message: str, image_url: str = None):
+        if image_url:
+            return ImageUrlMessage(
+                                to=f"+961{phone_number}",
+                                text=message,
+                                imageUrl=image_url
+                        )
+        return TextOnlyMessage(
+                            to=f"+961{phone_number}",
+                            text=message
+                            )
+
+
+    async def send_whatsapp_message(self, phone_number: str, message: str, image_url: str = None, client: WasenderAsyncClient = None):
+        """Send one message, reusing an already opened client when one is passed in"""
         try:
+            text_payload = self.build_message_payload(phone_number, message, image_url)
+
+            if client is not None:
+                response = await client.send(text_payload)
+                logger.info(f"WhatsApp message sent successfully to {phone_number}.")
+                return response
+
             wa_async_client = await self.create_async_client()
             async with wa_async_client as client:
-                if image_url:
-                    text_payload = ImageUrlMessage(
-                                        to=f"+961{phone_number}",
-                                        text=message,
-                                        imageUrl=image_url
-                                )
-                else:
-                    text_payload = TextOnlyMessage(
-                                        to=f"+961{phone_number}",
-                                        text=message
-                                        )
-                
                 logger.info(f"WhatsApp message sent successfully to {phone_number}.")
                 response = await client.send(text_payload)
                 return response
@@ -1,84 +1,213 @@
 from src.celery.celery_app import celery_app
 from globals.utils.logger import logger
-from jinja2 import Template
 import asyncio
 from src.messages.services.whatsappMessagesService import WhatsappMessagesService
+from src.messages.services.bulkWhatsappSender import BulkWhatsappSender
+from src.messages.services.messageTemplateCache import message_template_cache
+from src.messages.queries.campaignsQueries import CampaignsQueries
+from src.messages.exceptions.exceptions import CampaignNotFoundError
+from db.postgres.connection import PostgresClient
 from db.gcs.gcsService import GCSManager
 from globals.config.config import BUCKET_NAME
 
-@celery_app.task(name="templates.send_messages")
-def send_messages_task(customers_to_notify, template, user_phone_number):
-    """Celery task: send messages using the messaging service."""
-    
-    async def _send_all_messages(user_phone_number):
-        try:
-            logger.info(f"Sending messages to {len(customers_to_notify)} customers.")
-            whatsapp_messages_service = WhatsappMessagesService()
-            gcs_manager = GCSManager()  
-            
-            jinja_template = Template(template)
-            results = []
-            
-            for customer in customers_to_notify:
-                try:
-                    personalized_message = jinja_template.render(**customer)
-                    phone_number = customer.get('customer_phone_number')
-                    blob_name = customer.get('blob_name', None)
-                    
-                    await asyncio.sleep(5.5)
-
-                    if blob_name:
-                        signed_url = gcs_manager.generate_signed_url(
-                            bucket_name=BUCKET_NAME,
-                            blob_name=blob_name,
-                            expiration_minutes=200
-                        )
-                        logger.info(f"Sending image message to {phone_number}")
-                        await whatsapp_messages_service.send_whatsapp_message(phone_number, personalized_message, image_url=signed_url)
-                    else:
-                        logger.info(f"Sending text message to {phone_number}")
-                        await whatsapp_messages_service.send_whatsapp_message(phone_number, personalized_message)
-
-                    results.append({
-                        "customer_id": customer.get('meter_id'),
-                        "phone_number": phone_number,
-                        "status": "sent",
-                        "message": personalized_message
-                    })
-
-                except Exception as customer_error:
-                    logger.error(f"Failed to process customer {customer.get('meter_id')}: {customer_error}")
-                    results.append({
-                        "customer_id": customer.get('meter_id'),
-                        "status": "failed",
-                        "error": str(customer_error)
-                    })
-                    continue
-            
-            success_count = len([r for r in results if r["status"] == "sent"])
-            failure_count = len(results) - success_count
-            
-            logger.info(f"Message sending completed. Sent: {success_count}, Failed: {failure_count}")
+
+# Recipients claimed per round trip; small enough that a crash only leaves a few rows in sending
+CAMPAIGN_CLAIM_BATCH_SIZE = 50
+# How soon a worker that ran out of claimable rows checks again while some are still unfinished
+CAMPAIGN_RESUME_COUNTDOWN_SECONDS = 60
+
+
+@celery_app.task(name="templates.send_campaign", bind=True, acks_late=True, max_retries=3)
+def send_campaign_task(self, campaign_id, batch_size=CAMPAIGN_CLAIM_BATCH_SIZE, pending_outcomes=None):
+    """
+    Celery task: drain a message campaign from its recipient rows.
+    Several of these can run on the same campaign in parallel; each claims its own
+    batches with SKIP LOCKED. A run that fails hands back the claimed recipients it never
+    sent to before retrying; outcomes of the ones it did send to but could not record are
+    passed to the retry as pending_outcomes and saved first, so nobody is messaged twice.
+    A run that finds nothing to claim while rows are still pending or sending (held by
+    another worker, or left behind by a killed one until they go stale) reschedules itself,
+    so the campaign is always driven to completion.
+    """
+    # (recipient_id, status, error) already decided but not yet saved
+    unsaved_outcomes = [tuple(outcome) for outcome in pending_outcomes or []]
+
+    async def _drain_campaign():
+        campaigns_queries = CampaignsQueries()
+        whatsapp_messages_service = WhatsappMessagesService()
+        sender = BulkWhatsappSender(whatsapp_messages_service)
+        gcs_manager = GCSManager()
+
+        if unsaved_outcomes:
+            with PostgresClient.get_sync_session() as session:
+                campaigns_queries.mark_recipients_sync(session=session, outcomes=unsaved_outcomes)
+            unsaved_outcomes.clear()
+
+        with PostgresClient.get_sync_session() as session:
+            campaign = campaigns_queries.get_campaign_sync(session=session, campaign_id=campaign_id)
+            campaigns_queries.start_campaign_sync(session=session, campaign_id=campaign_id)
+
+        processed = 0
+
+        while True:
+            with PostgresClient.get_sync_session() as session:
+                claimed = campaigns_queries.claim_recipients_sync(
+                    session=session,
+                    campaign_id=campaign_id,
+                    batch_size=batch_size
+                )
+            if not claimed:
+                break
+
+            outcomes = []
+            message_recipient_ids = []
+            settled = {}
+
+            def _settle(index, send_result):
+                settled[index] = send_result
+
+            def _decided_outcomes():
+                return outcomes + [
+                    (message_recipient_ids[index], send_result["status"], send_result.get("error"))
+                    for index, send_result in settled.items()
+                ]
+
+            try:
+
+                blob_names = list({r["payload"]["blob_name"] for r in claimed if r["payload"].get("blob_name")})
+                signed_urls = await asyncio.to_thread(
+                    gcs_manager.generate_signed_urls,
+                    BUCKET_NAME,
+                    blob_names,
+                    expiration_minutes=200
+                ) if blob_names else {}
+
+                messages = []
+                rendered_messages = message_template_cache.render_batch(
+                    campaign["template"],
+                    (recipient["payload"] for recipient in claimed),
+                    template_id=campaign["template_id"]
+                )
+                for recipient, rendered_message in zip(claimed, rendered_messages):
+                    try:
+                        if isinstance(rendered_message, Exception):
+                            raise rendered_message
+                        blob_name = recipient["payload"].get("blob_name")
+                        image_url = signed_urls.get(blob_name) if blob_name else None
+                        if blob_name and not image_url:
+                            raise Exception(f"Could not sign bill image {blob_name}")
+
+                        messages.append({
+                            "phone_number": recipient["phone_number"],
+                            "message": rendered_message,
+                            "image_url": image_url
+                        })
+                        message_recipient_ids.append(recipient["recipient_id"])
+
+                    except Exception as recipient_error:
+                        logger.error(f"Failed to prepare message for recipient {recipient['recipient_id']}: {recipient_error}")
+                        outcomes.append((recipient["recipient_id"], "failed", str(recipient_error)))
+
+                await sender.send_all(messages, on_result=_settle)
+
+                with PostgresClient.get_sync_session() as session:
+                    campaigns_queries.mark_recipients_sync(session=session, outcomes=_decided_outcomes())
+
+            except Exception:
+                # Recipients with an outcome were already attempted: keep them in sending and
+                # let the retry record the outcome. Only the rest go back to the queue.
+                decided = _decided_outcomes()
+                unsaved_outcomes.extend(decided)
+                decided_ids = {recipient_id for recipient_id, _, _ in decided}
+                with PostgresClient.get_sync_session() as session:
+                    campaigns_queries.release_recipients_sync(
+                        session=session,
+                        recipient_ids=[
+                            recipient["recipient_id"] for recipient in claimed
+                            if recipient["recipient_id"] not in decided_ids
+                        ]
+                    )
+                raise
+
+            processed += len(claimed)
+            logger.info(f"Campaign {campaign_id}: processed {processed} recipients in this worker")
+
+        with PostgresClient.get_sync_session() as session:
+            completed = campaigns_queries.complete_campaign_if_done_sync(session=session, campaign_id=campaign_id)
+            counts = campaigns_queries.count_recipients_by_status_sync(session=session, campaign_id=campaign_id)
+
+        success_count = counts.get("sent", 0)
+        failure_count = counts.get("failed", 0)
+
+        status = "completed" if completed else "drained"
+        if not completed and counts.get("pending", 0) + counts.get("sending", 0) > 0:
+            # Unfinished rows are out with another worker or were left in sending by a killed
+            # run; come back for them instead of leaving the campaign running forever
+            send_campaign_task.apply_async(
+                args=[campaign_id],
+                kwargs={"batch_size": batch_size},
+                countdown=CAMPAIGN_RESUME_COUNTDOWN_SECONDS
+            )
+            status = "rescheduled"
+
+        # Only the worker that closed the campaign reports it, so the sender gets one summary
+        if completed and campaign["requested_by_phone_number"]:
             message = f"Messages task completed. Sent: {success_count}, Failed: {failure_count}"
-            await asyncio.sleep(5.5)
-            await whatsapp_messages_service.send_whatsapp_message(user_phone_number, message)
-
-            return {
-                "status": "completed",
-                "messages_sent": success_count,
-                "failed_messages": failure_count,
-                "results": results
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in send_messages: {e}")
-            return {
-                "status": "failed",
-                "error": str(e),
-                "messages_sent": 0,
-                "failed_messages": len(customers_to_notify) if customers_to_notify else 0
-            }
-    
-    # Run all messages in a single async context
-    return asyncio.run(_send_all_messages(user_phone_number))
+            try:
+                await sender.send_one(campaign["requested_by_phone_number"], message)
+            except Exception as e:
+                logger.error(f"Failed to send campaign summary: {e}")
+
+        return {
+            "status": status,
+            "campaign_id": campaign_id,
+            "processed_by_worker": processed,
+            "messages_sent": success_count,
+            "failed_messages": failure_count
+        }
+
+    try:
+        return asyncio.run(_drain_campaign())
+
+    except CampaignNotFoundError:
+        logger.error(f"Campaign {campaign_id} no longer exists, nothing to send")
+        return {"status": "failed", "campaign_id": campaign_id, "error": "Campaign not found"}
+
+    except Exception as e:
+        logger.error(f"Error in send_campaign for campaign {campaign_id}: {e}")
+        raise self.retry(
+            exc=e,
+            args=[campaign_id],
+            kwargs={"batch_size": batch_size, "pending_outcomes": [list(outcome) for outcome in unsaved_outcomes]},
+            countdown=60 * (2 ** self.request.retries)
+        )
+
+
+@celery_app.task(name="templates.send_messages")
+def send_messages_task(customers_to_notify, template, user_phone_number, template_id=None):
+    """
+    Celery task kept for one release so broadcasts queued before campaigns (scheduled with
+    an eta) still run: turns the old payload into a campaign and hands it to send_campaign.
+    Remove once no templates.send_messages messages can be left in the broker.
+    """
+    try:
+        if not customers_to_notify:
+            logger.warning("No customers to notify.")
+            return {"status": "completed", "messages_sent": 0, "failed_messages": 0}
+
+        with PostgresClient.get_sync_session() as session:
+            campaign_id = CampaignsQueries().create_campaign_sync(
+                session=session,
+                template=template,
+                customers=customers_to_notify,
+                template_id=template_id,
+                requested_by_phone_number=user_phone_number
+            )
+
+        task = send_campaign_task.delay(campaign_id)
+        logger.info(f"Converted queued send_messages task into campaign {campaign_id}.")
+        return {"status": "converted", "campaign_id": campaign_id, "task_id": task.id}
 
+    except Exception as e:
+        logger.error(f"Error converting send_messages task into a campaign: {e}")
+        raise
@@ -1,5 +1,6 @@
 from globals.utils.logger import logger
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 from sqlalchemy import update, select, func, delete, or_, and_
 from sqlalchemy.exc import IntegrityError   
 import calendar
@@ -336,3 +337,65 @@ class RatesQueries:
             logger.error(f"Error fetching rates for date {date_input}: {e}")
             raise
 
+
+    def get_rates_by_id_sync(self, session: Session, rate_id: str):
+        """
+        Synchronous variant of get_rates_by_id for Celery workers.
+        """
+        try:
+            result = session.execute(select(Rates).where(Rates.rate_id == rate_id))
+            rates = result.scalar_one_or_none()
+
+            if not rates:
+                logger.error(f"No rates found with ID {rate_id}")
+                raise RateNotFoundError(f"No rates found")
+
+            logger.info(f"Rates fetched successfully for ID {rate_id}")
+            return self._rates_to_dict(rates)
+
+        except Exception as e:
+            logger.error(f"Error fetching rates sync for ID {rate_id}: {e}")
+            raise
+
+
+    def get_rates_by_date_sync(self, date_input, session: Session):
+        """
+        Synchronous variant of get_rates_by_date for Celery workers.
+        """
+        try:
+            year, month = map(int, date_input.split('-'))
+            start_date = date(year, month, 6)
+            end_date = date(year if month < 12 else year + 1, month + 1 if month < 12 else 1, 6)
+
+            result = session.execute(
+                select(Rates).where(
+                    and_(
+                        Rates.date >= start_date,
+                        Rates.date < end_date
+                    )
+                ).order_by(Rates.date.desc())
+            )
+            rates = result.scalar_one_or_none()
+
+            if not rates:
+                logger.error(f"No rates found for billing period {year}-{month:02d} (between {start_date} and {end_date})")
+                raise RateNotFoundError(f"No rates found for {date_input}")
+
+            logger.info(f"Rates fetched successfully for billing period {year}-{month:02d}")
+            return self._rates_to_dict(rates)
+
+        except Exception as e:
+            logger.error(f"Error fetching rates sync for date {date_input}: {e}")
+            raise
+
+
+    def _rates_to_dict(self, rates: Rates):
+        return {
+            "rate_id": str(rates.rate_id),
+            "mountain_kwh_rate": rates.mountain_kwh_rate,
+            "coastal_kwh_rate": rates.coastal_kwh_rate,
+            "dollar_rate": rates.dollar_rate,
+            "fixed_sub_hours": rates.fixed_sub_hours,
+            "fixed_sub_rate": rates.fixed_sub_rate,
+            "date": rates.date.isoformat(),
+        }
@@ -64,4 +64,22 @@ class FixedMeterCannotHaveUsageReadingsError(Exception):
         self.message = f"Fixed meters cannot have usage readings."
         super().__init__(self.message)
 
-        
\ No newline at end of file
+        
+
+
+class BulkScanNotFoundError(Exception):
+    def __init__(self):
+        self.message = f"Bulk scan batch not found."
+        super().__init__(self.message)
+
+
+class ScanningUnavailableError(Exception):
+    def __init__(self):
+        self.message = f"Scanning is not available on this server."
+        super().__init__(self.message)
+
+
+class InvalidScanTokenError(Exception):
+    def __init__(self):
+        self.message = f"Scan token is invalid or has expired, please scan the reading again."
+        super().__init__(self.message)
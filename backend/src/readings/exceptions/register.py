@@ -4,6 +4,7 @@ from fastapi import FastAPI, Request
 from globals.responses.responses import (
     not_found_error_response,
     bad_request_error_response,
+    service_unavailable_error_response,
 )
 
 from src.readings.exceptions.exceptions import (
@@ -15,7 +16,10 @@ from src.readings.exceptions.exceptions import (
     NoReadingsFoundForActiveMetersError,
     MissingReadingsForActiveMetersError,
     UnverifiedReadingsError,
-    FixedMeterCannotHaveUsageReadingsError
+    FixedMeterCannotHaveUsageReadingsError,
+    BulkScanNotFoundError,
+    ScanningUnavailableError,
+    InvalidScanTokenError
 )
 
 
@@ -79,3 +83,20 @@ def register_readings_exceptions(app: FastAPI):
             message=exc.message,
         )
     
+    @app.exception_handler(BulkScanNotFoundError)
+    async def bulk_scan_not_found_error_handler(request: Request, exc: BulkScanNotFoundError):
+        return not_found_error_response(
+            message=exc.message
+        )
+    
+    @app.exception_handler(ScanningUnavailableError)
+    async def scanning_unavailable_error_handler(request: Request, exc: ScanningUnavailableError):
+        return service_unavailable_error_response(
+            message=exc.message
+        )
+    
+    @app.exception_handler(InvalidScanTokenError)
+    async def invalid_scan_token_error_handler(request: Request, exc: InvalidScanTokenError):
+        return bad_request_error_response(
+            message=exc.message,
+        )
@@ -1,7 +1,12 @@
 from globals.utils.logger import logger
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update, select, func, delete, or_, and_, outerjoin, cast, Integer
+from sqlalchemy import update, select, func, delete, or_, and_, outerjoin, cast, Integer, insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from concurrent.futures import Executor
+from io import BytesIO
+from types import SimpleNamespace
+from typing import List, Optional
 from uuid import UUID
 import asyncio
 from datetime import datetime, timezone, timedelta, date
@@ -106,7 +111,38 @@ class ReadingsQueries:
         }
 
 
-    async def create_reading(self, session: AsyncSession, reading_data: dict, image_bytes=None):
+    @staticmethod
+    def _reading_period(current_date: datetime):
+        """Billing period (6th to the 5th of the next month) that current_date falls in"""
+        day, month, year = current_date.day,current_date.month, current_date.year
+
+        if day <= 5:
+            start_date = date(
+                year=year if month > 1 else year - 1, 
+                month=month - 1 if month > 1 else 12, 
+                day=6
+                )
+            end_date = date(year, month, 5)
+        else:
+            start_date = date(
+                year=year, 
+                month=month, 
+                day=6
+            )
+            end_date = date(
+                year=year if month < 12 else year + 1,
+                month=month + 1 if month < 12 else 1, 
+                day=5
+            )
+        return start_date, end_date
+
+
+    @staticmethod
+    def _reading_blob_name(meter: Meters, reading_date: date) -> str:
+        return f"readings/{meter.customer_full_name}_{meter.customer_phone_number}_{meter.address}_{reading_date}.jpg"
+
+
+    async def create_reading(self, session: AsyncSession, reading_data: dict, image_file=None, staged_blob_name: Optional[str] = None):
         try:
             meter = await self.get_meter_by_id(
                 session, 
@@ -155,26 +191,7 @@ class ReadingsQueries:
                 previous_reading = latest_reading.current_reading
 
             # check if a reading already exists for the same month and year
-            day, month, year = current_date.day,current_date.month, current_date.year
-
-            if day <= 5:
-                start_date = date(
-                    year=year if month > 1 else year - 1, 
-                    month=month - 1 if month > 1 else 12, 
-                    day=6
-                    )
-                end_date = date(year, month, 5)
-            else:
-                start_date = date(
-                    year=year, 
-                    month=month, 
-                    day=6
-                )
-                end_date = date(
-                    year=year if month < 12 else year + 1,
-                    month=month + 1 if month < 12 else 1, 
-                    day=5
-                )
+            start_date, end_date = self._reading_period(current_date)
 
             logger.info(f"Fetching readings between {start_date} and {end_date}")
 
@@ -205,19 +222,29 @@ class ReadingsQueries:
                 {
                     "usage": current_reading - previous_reading,
                     "reading_date": current_date.date(),
-                    "blob_name": f"readings/{meter.customer_full_name}_{meter.customer_phone_number}_{meter.address}_{current_date.date()}.jpg",
+                    "blob_name": self._reading_blob_name(meter, current_date.date()),
                 }
             )
             new_reading = Readings(**reading_data)
             session.add(new_reading)
             await session.commit()
             await session.refresh(new_reading)
-            blob_name  = await asyncio.to_thread(
-                self.gcs_manager.upload_buffer,
-                bucket_name=BUCKET_NAME,
-                buffer=image_bytes,
-                destination_blob_name=reading_data['blob_name'],
-            )
+            if staged_blob_name:
+                # The image was already uploaded when it was scanned, copy it server side
+                blob_name = await asyncio.to_thread(
+                    self.gcs_manager.copy_file,
+                    bucket_name=BUCKET_NAME,
+                    source_blob_name=staged_blob_name,
+                    destination_blob_name=reading_data['blob_name'],
+                )
+            else:
+                blob_name  = await asyncio.to_thread(
+                    self.gcs_manager.upload_buffer,
+                    bucket_name=BUCKET_NAME,
+                    buffer=image_file,
+                    destination_blob_name=reading_data['blob_name'],
+                    content_type="image/jpeg",
+                )
             logger.info(f"Reading {new_reading.reading_id} created successfully for meter {reading_data['meter_id']}.")
             return {
                 "reading_id": str(new_reading.reading_id),
@@ -241,6 +268,179 @@ class ReadingsQueries:
             raise
 
 
+    def stage_pending_readings_sync(
+        self,
+        session: Session,
+        readings: List[dict],
+        created_by: Optional[str] = None,
+        executor: Optional[Executor] = None
+    ) -> List[dict]:
+        """
+        Validate and insert many scanned readings as pending in a fixed number of queries.
+
+        readings: [{"reading_id": UUID, "meter_id": UUID, "current_reading": int, "image": bytes}, ...]
+        Applies the same checks as create_reading (meter exists, active, usage based, one reading
+        per billing period, not below the previous reading) to the whole batch at once and returns
+        one outcome per item, in input order: {"status": "staged", "reading_id", "blob_name", ...}
+        or {"status": "failed", "error"}.
+
+        Images are uploaded (on executor when given) before their rows are committed, and a
+        reading whose upload fails is not inserted. reading_id makes a call safe to repeat:
+        a reading that already exists is reported as staged again instead of being validated
+        as a duplicate of itself.
+        """
+        uploaded = []
+        try:
+            if not readings:
+                return []
+
+            current_date = datetime.now(timezone.utc)
+            reading_date = current_date.date()
+            start_date, end_date = self._reading_period(current_date)
+            meter_ids = list({reading["meter_id"] for reading in readings})
+
+            already_staged = {
+                row.reading_id: row
+                for row in session.execute(
+                    select(
+                        Readings.reading_id,
+                        Readings.blob_name,
+                        Readings.current_reading,
+                        Readings.previous_reading,
+                        Readings.usage
+                    ).where(Readings.reading_id.in_([reading["reading_id"] for reading in readings]))
+                )
+            }
+
+            meters = {
+                meter.meter_id: meter
+                for meter in session.execute(
+                    select(Meters).where(Meters.meter_id.in_(meter_ids))
+                ).scalars()
+            }
+            latest_readings = {
+                row.meter_id: row
+                for row in session.execute(
+                    select(Readings.meter_id, Readings.current_reading, Readings.reading_sequence)
+                    .where(Readings.meter_id.in_(meter_ids))
+                    .distinct(Readings.meter_id)
+                    .order_by(Readings.meter_id, Readings.reading_date.desc())
+                )
+            }
+            readings_in_period = {
+                row.meter_id: row.reading_date
+                for row in session.execute(
+                    select(Readings.meter_id, Readings.reading_date).where(
+                        Readings.meter_id.in_(meter_ids),
+                        Readings.reading_date >= start_date,
+                        Readings.reading_date <= end_date
+                    )
+                )
+            }
+
+            outcomes, rows = [], []
+            for reading in readings:
+                existing = already_staged.get(reading["reading_id"])
+                if existing:
+                    outcomes.append(self._staged_outcome(existing))
+                    continue
+
+                meter = meters.get(reading["meter_id"])
+                current_reading = reading["current_reading"]
+
+                if not meter:
+                    error = MeterNotFoundError()
+                elif meter.package_type == 'fixed':
+                    error = FixedMeterCannotHaveUsageReadingsError()
+                elif meter.status == 'inactive':
+                    error = MeterInactiveError()
+                elif meter.meter_id in readings_in_period:
+                    error = DuplicateReadingDateException(reading_date=readings_in_period[meter.meter_id])
+                else:
+                    latest_reading = latest_readings.get(meter.meter_id)
+                    previous_reading = latest_reading.current_reading if latest_reading else meter.initial_reading
+                    error = None
+                    if current_reading < previous_reading:
+                        error = InvalidReadingValueException(
+                            current_reading=current_reading,
+                            previous_reading=previous_reading
+                        )
+
+                if error:
+                    outcomes.append({"status": "failed", "error": error.message})
+                    continue
+
+                row = {
+                    "reading_id": reading["reading_id"],
+                    "meter_id": meter.meter_id,
+                    "reading_date": reading_date,
+                    "current_reading": current_reading,
+                    "previous_reading": previous_reading,
+                    "usage": current_reading - previous_reading,
+                    "reading_sequence": latest_reading.reading_sequence + 1 if latest_reading else 1,
+                    "status": "pending",
+                    "blob_name": self._reading_blob_name(meter, reading_date),
+                    "created_by": created_by,
+                    "updated_by": created_by,
+                }
+                rows.append((len(outcomes), row, reading["image"]))
+                # Later images of the same meter in this batch fall in the same period
+                readings_in_period[meter.meter_id] = reading_date
+                outcomes.append(self._staged_outcome(SimpleNamespace(**row)))
+
+            def upload(staged):
+                _, row, image_bytes = staged
+                try:
+                    self.gcs_manager.upload_buffer(
+                        bucket_name=BUCKET_NAME,
+                        buffer=BytesIO(image_bytes),
+                        destination_blob_name=row["blob_name"],
+                        content_type="image/jpeg"
+                    )
+                    uploaded.append(row["blob_name"])
+                    return None
+                except Exception as e:
+                    return str(e)
+
+            stored_rows = []
+            for (index, row, _), upload_error in zip(rows, (executor.map if executor else map)(upload, rows)):
+                if upload_error:
+                    logger.error(f"Failed to upload image for reading {row['reading_id']}: {upload_error}")
+                    outcomes[index] = {"status": "failed", "error": f"Could not store the image: {upload_error}"}
+                    continue
+                stored_rows.append(row)
+
+            if stored_rows:
+                session.execute(insert(Readings), stored_rows)
+                session.commit()
+
+            logger.info(f"Staged {len(stored_rows)} of {len(readings)} scanned readings as pending.")
+            return outcomes
+
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error staging pending readings: {e}")
+            # Rows were not committed, do not leave their images behind
+            for blob_name in uploaded:
+                try:
+                    self.gcs_manager.delete_file(BUCKET_NAME, blob_name)
+                except Exception as delete_error:
+                    logger.error(f"Failed to delete orphaned image {blob_name}: {delete_error}")
+            raise
+
+
+    @staticmethod
+    def _staged_outcome(reading) -> dict:
+        return {
+            "status": "staged",
+            "reading_id": str(reading.reading_id),
+            "blob_name": reading.blob_name,
+            "current_reading": reading.current_reading,
+            "previous_reading": reading.previous_reading,
+            "usage": reading.usage,
+        }
+
+
     async def update_reading(self, session: AsyncSession, reading_id: str, update_data: dict):
         try:
             # fetch existing reading
@@ -1,5 +1,5 @@
-from typing import Optional
-from fastapi import APIRouter, Depends, File, Request, UploadFile
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 from db.postgres.dependancies import get_async_session
 
@@ -65,6 +65,53 @@ async def verify_all_readings(
     return await readings_service.verify_all_readings(request, session)
 
 
+@readings_router.get("/scanning/stats")
+async def get_scanning_stats(
+    request: Request,
+    scanning_service: ScanningService = Depends(get_scanning_service),
+):
+    """
+    Get inference queue depth, batch size and latency histograms for scanning.
+    """
+    return await scanning_service.get_scanning_stats(request)
+
+
+@readings_router.get("/scanning/ready")
+async def get_scanning_readiness(
+    request: Request,
+    scanning_service: ScanningService = Depends(get_scanning_service),
+):
+    """
+    Readiness of the scanning models, 503 while they are still loading.
+    """
+    return await scanning_service.get_scanning_readiness(request)
+
+
+@readings_router.post("/scan/bulk")
+async def bulk_scan_readings(
+    request: Request,
+    archive: Optional[UploadFile] = File(None),
+    images: Optional[List[UploadFile]] = File(None),
+    mapping: Optional[str] = Form(None),
+    scanning_service: ScanningService = Depends(get_scanning_service),
+):
+    """
+    Scan an offline batch of meter photos and stage them as pending readings.
+    """
+    return await scanning_service.bulk_scan_readings(request, archive, images, mapping)
+
+
+@readings_router.get("/scan/bulk/{batch_id}")
+async def get_bulk_scan_report(
+    request: Request,
+    scanning_service: ScanningService = Depends(get_scanning_service),
+):
+    """
+    Get the per-image report of a bulk scan.
+    """
+    return await scanning_service.get_bulk_scan_report(request)
+
+
 @readings_router.get("/{reading_id}")
 async def get_reading(
     request: Request,
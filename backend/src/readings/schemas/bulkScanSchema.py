@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+
+class GetBulkScanReportRequestPath(BaseModel):
+    batch_id: UUID = Field(..., description="The ID of the bulk scan batch")
+
+    class Config:
+        extra = "forbid"
@@ -0,0 +1,75 @@
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from fastapi import UploadFile
+
+from globals.config.config import SCAN_DECODE_MIN_SIDE
+
+
+# Start-of-frame markers carry the image size (C4, C8 and CC are other segment types)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# libjpeg can decode straight to 1/8, 1/4 or 1/2 resolution without building the full image
+_REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def read_upload_buffer(upload: UploadFile) -> bytes:
+    """
+    Contents of an upload, read once straight from its file without going through the async
+    UploadFile.read(), so it can run in a worker thread. The file is rewound afterwards so it
+    can still be stored as-is.
+    """
+    upload.file.seek(0)
+    buffer = upload.file.read()
+    upload.file.seek(0)
+    return buffer
+
+
+def jpeg_size(buffer) -> Optional[Tuple[int, int]]:
+    """(width, height) from the JPEG frame header, None for anything that is not a JPEG"""
+    data = memoryview(buffer).cast("B")
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    i, n = 2, len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = (data[i + 5] << 8) | data[i + 6]
+            width = (data[i + 7] << 8) | data[i + 8]
+            return width, height
+        i += 2 + ((data[i + 2] << 8) | data[i + 3])
+    return None
+
+
+def decode_image(buffer, min_side: int = SCAN_DECODE_MIN_SIDE):
+    """
+    Decode image bytes (bytes, bytearray, memoryview or uint8 array) into BGR without copying
+    them first. Large JPEGs are decoded at the largest reduction that keeps their long side
+    at or above min_side, so a 12 MP phone photo never materializes at full size.
+    """
+    np_arr = buffer if isinstance(buffer, np.ndarray) else np.frombuffer(buffer, np.uint8)
+
+    flags = cv2.IMREAD_COLOR
+    size = jpeg_size(np_arr) if min_side else None
+    if size:
+        long_side = max(size)
+        for factor, reduced_flag in _REDUCED_DECODE_FLAGS:
+            if long_side // factor >= min_side:
+                flags = reduced_flag
+                break
+
+    return cv2.imdecode(np_arr, flags)
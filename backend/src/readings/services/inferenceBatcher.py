@@ -0,0 +1,137 @@
+import queue
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+from globals.utils.logger import logger
+
+
+class Histogram:
+    """Fixed-bucket histogram (upper bounds, last bucket is +Inf), safe to update from one thread."""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self) -> dict:
+        labels = [str(bound) for bound in self.buckets] + ["+Inf"]
+        return {
+            "count": self.total,
+            "sum": round(self.sum, 3),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class YoloInferenceBatcher:
+    """
+    Micro-batching front for the YOLO ONNX session.
+
+    Scan threads submit one letterboxed NCHW tensor each and block on a future. A single
+    batching thread waits up to max_wait_ms for more requests to arrive, stacks them into
+    one batch, runs the session once and hands every caller its own slice of the output.
+    Models exported with a fixed batch size of 1 get max_batch_size 1, which still
+    serializes session runs through one thread instead of contending for the session.
+    """
+
+    LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self, session, input_name: str, max_batch_size: int = 8, max_wait_ms: float = 5):
+        self.session = session
+        self.input_name = input_name
+        self.max_wait = max_wait_ms / 1000
+
+        batch_dim = session.get_inputs()[0].shape[0]
+        self.dynamic_batch = not isinstance(batch_dim, int)
+        self.max_batch_size = max_batch_size if self.dynamic_batch else 1
+        if not self.dynamic_batch:
+            logger.warning("YOLO model has a fixed batch dimension, micro-batching is limited to 1 image per run")
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_wait_ms = Histogram(self.LATENCY_BUCKETS_MS)
+        self._inference_ms = Histogram(self.LATENCY_BUCKETS_MS)
+        self._total_ms = Histogram(self.LATENCY_BUCKETS_MS)
+        self._max_queue_depth = 0
+
+        self._thread = threading.Thread(target=self._run, name="yolo-batcher", daemon=True)
+        self._thread.start()
+        logger.info(f"YOLO inference batcher started (max batch {self.max_batch_size}, wait {max_wait_ms} ms)")
+
+    def infer(self, tensor: np.ndarray, timeout: float = 30) -> np.ndarray:
+        """Run one (1, C, H, W) tensor through the batch queue, returns the model's first output for it."""
+        future: Future = Future()
+        self._queue.put((tensor, future, time.perf_counter()))
+        return future.result(timeout=timeout)
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            queue_depth = self._queue.qsize()
+            started = time.perf_counter()
+
+            try:
+                inputs = np.concatenate([tensor for tensor, _, _ in batch], axis=0)
+                output = self.session.run(None, {self.input_name: inputs})[0]
+                finished = time.perf_counter()
+                for i, (_, future, _) in enumerate(batch):
+                    future.set_result(output[i:i + 1])
+
+            except Exception as e:
+                finished = time.perf_counter()
+                logger.error(f"Batched YOLO inference failed for {len(batch)} images: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._max_queue_depth = max(self._max_queue_depth, queue_depth + len(batch))
+                self._inference_ms.observe((finished - started) * 1000)
+                for _, _, enqueued in batch:
+                    self._queue_wait_ms.observe((started - enqueued) * 1000)
+                    self._total_ms.observe((finished - enqueued) * 1000)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            images = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                "dynamic_batch": self.dynamic_batch,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "images": images,
+                "avg_batch_size": round(images / batches, 2) if batches else 0,
+                "batch_size_histogram": {str(size): count for size, count in sorted(self._batch_sizes.items())},
+                "queue_wait_ms": self._queue_wait_ms.snapshot(),
+                "inference_ms": self._inference_ms.snapshot(),
+                "total_latency_ms": self._total_ms.snapshot(),
+            }
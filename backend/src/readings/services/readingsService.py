@@ -6,7 +6,6 @@ from globals.exceptions.global_exceptions import ValidationError, InternalServer
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from globals.utils.fileValidator import FileValidator, FileValidationConfigs
-from io import BytesIO
  
 
 from src.readings.queries.readingsQueries import ReadingsQueries
@@ -57,7 +56,6 @@ class ReadingsService:
 
         try:
             token = request.state.user
-            image_bytes = await reading.read()
             reading_data = validated_request.get('query')
             reading_data.update({
                 "created_by": token.get('user_id'),
@@ -66,7 +64,7 @@ class ReadingsService:
             reading = await self.readings_queries.create_reading(
                 session=session,
                 reading_data=reading_data,
-                image_bytes=BytesIO(image_bytes)
+                image_file=reading.file
             )
             return success_response(
                 message="Reading created successfully.",
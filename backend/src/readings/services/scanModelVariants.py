@@ -0,0 +1,57 @@
+import os
+
+import onnxruntime as ort
+
+from globals.utils.logger import logger
+
+
+# fp32 is the exported model as-is, the others are produced by scripts/prepareScanModels.py
+MODEL_VARIANTS = ("fp32", "optimized", "int8")
+
+
+def variant_model_path(model_path: str, variant: str) -> str:
+    """Path of a prepared variant next to the original model, e.g. best.onnx -> best.int8.onnx"""
+    if variant == "fp32":
+        return model_path
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.{variant}{ext}"
+
+
+def resolve_model_path(model_path: str, variant: str) -> str:
+    """Prepared variant if it exists on disk, otherwise the original model"""
+    if variant not in MODEL_VARIANTS:
+        logger.warning(f"Unknown scanning model variant '{variant}', using fp32")
+        return model_path
+
+    path = variant_model_path(model_path, variant)
+    if not os.path.exists(path):
+        logger.warning(f"Scanning model variant '{variant}' not found at {path}, using {model_path}")
+        return model_path
+    return path
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects CPU affinity and container cpusets)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def build_session_options(intra_op_threads: int = 0) -> ort.SessionOptions:
+    """
+    CPU session options for the scanning models.
+
+    Scans run one model at a time per request, so parallelism goes into intra-op threads
+    sized to the cores available (or the share given by the worker pool) and inter-op
+    stays at one thread. Layout optimizations are hardware specific and are therefore
+    applied at load time even for pre-optimized variants.
+    """
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    session_options.intra_op_num_threads = intra_op_threads or available_cores()
+    session_options.inter_op_num_threads = 1
+    session_options.enable_cpu_mem_arena = True
+    session_options.enable_mem_pattern = True
+    return session_options
@@ -0,0 +1,116 @@
+import asyncio
+import hashlib
+import json
+from typing import Optional
+from uuid import uuid4
+
+from db.redis.circuitBreaker import redis_breaker
+from globals.config.config import SCAN_CACHE_TTL_SECONDS
+from globals.utils.logger import logger
+
+
+def image_digest(buffer) -> str:
+    return hashlib.sha256(buffer).hexdigest()
+
+
+class ScanResultCache:
+    """
+    Redis cache of scans keyed by the SHA-256 of the image bytes.
+
+    scan:result:<digest>  OCR digits of that image, so re-submitted photos skip inference
+    scan:staged:<digest>  blob the image was staged to, so it is uploaded only once
+    scan:token:<token>    a scan handed to the client, accepted later without re-sending the image
+
+    Every key expires after SCAN_CACHE_TTL_SECONDS. The cache is best effort: when Redis is
+    unavailable or its circuit is open, lookups miss and writes are skipped, and scanning
+    works as before.
+    """
+
+    KEY_PREFIX = "scan"
+
+    def __init__(self, ttl_seconds: int = SCAN_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+
+    async def _redis(self):
+        # None while the Redis circuit is open, so an outage costs nothing here
+        return await redis_breaker.get_client()
+
+    async def _get(self, key: str) -> Optional[str]:
+        redis = await self._redis()
+        if redis is None:
+            return None
+        try:
+            value = await asyncio.wait_for(redis.get(key), redis_breaker.operation_timeout)
+            redis_breaker.record_success()
+            return value
+        except Exception as e:
+            logger.error(f"Error reading scan cache key {key}: {e}")
+            redis_breaker.record_failure(e)
+            return None
+
+    async def _set(self, key: str, value: str):
+        redis = await self._redis()
+        if redis is None:
+            return
+        try:
+            await asyncio.wait_for(redis.set(key, value, ex=self.ttl_seconds), redis_breaker.operation_timeout)
+            redis_breaker.record_success()
+        except Exception as e:
+            logger.error(f"Error writing scan cache key {key}: {e}")
+            redis_breaker.record_failure(e)
+
+    async def get_result(self, digest: str) -> Optional[str]:
+        return await self._get(f"{self.KEY_PREFIX}:result:{digest}")
+
+    async def set_result(self, digest: str, digits: str):
+        await self._set(f"{self.KEY_PREFIX}:result:{digest}", digits)
+
+    async def get_staged_blob(self, digest: str) -> Optional[str]:
+        return await self._get(f"{self.KEY_PREFIX}:staged:{digest}")
+
+    async def set_staged_blob(self, digest: str, blob_name: str):
+        await self._set(f"{self.KEY_PREFIX}:staged:{digest}", blob_name)
+
+    async def issue_token(self, digest: str, meter_id: str, user_id: str, blob_name: Optional[str], current_reading: str) -> Optional[str]:
+        redis = await self._redis()
+        if redis is None:
+            return None
+
+        token = uuid4().hex
+        try:
+            await asyncio.wait_for(
+                redis.set(
+                    f"{self.KEY_PREFIX}:token:{token}",
+                    json.dumps({
+                        "digest": digest,
+                        "meter_id": str(meter_id),
+                        "user_id": str(user_id),
+                        "blob_name": blob_name,
+                        "current_reading": current_reading,
+                    }),
+                    ex=self.ttl_seconds
+                ),
+                redis_breaker.operation_timeout
+            )
+            redis_breaker.record_success()
+            return token
+
+        except Exception as e:
+            logger.error(f"Error issuing scan token: {e}")
+            redis_breaker.record_failure(e)
+            return None
+
+    async def get_token(self, token: str) -> Optional[dict]:
+        value = await self._get(f"{self.KEY_PREFIX}:token:{token}")
+        return json.loads(value) if value else None
+
+    async def revoke_token(self, token: str):
+        redis = await self._redis()
+        if redis is None:
+            return
+        try:
+            await asyncio.wait_for(redis.delete(f"{self.KEY_PREFIX}:token:{token}"), redis_breaker.operation_timeout)
+            redis_breaker.record_success()
+        except Exception as e:
+            logger.error(f"Error revoking scan token: {e}")
+            redis_breaker.record_failure(e)
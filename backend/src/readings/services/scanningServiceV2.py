@@ -1,19 +1,44 @@
 import onnxruntime as ort
 from fastapi import Request, UploadFile
 from globals.utils.logger import logger
-from globals.responses.responses import success_response
+from globals.responses.responses import success_response, service_unavailable_error_response
 from globals.exceptions.global_exceptions import ValidationError, InternalServerError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from typing import List, Optional
 from globals.utils.fileValidator import FileValidator, FileValidationConfigs
 import os
 from src.readings.queries.readingsQueries import ReadingsQueries
 import re 
 import asyncio  
+import json
+import threading
+import time
+from contextlib import contextmanager
+import tempfile
+import zipfile
+from uuid import uuid4
 import cv2
+import yaml
 import numpy as np
 from io import BytesIO
 from rapidocr import RapidOCR
+from src.readings.services.inferenceBatcher import YoloInferenceBatcher
+from src.readings.services.scanningWorkerPool import ScanningWorkerPool
+from src.readings.services.scanModelVariants import build_session_options, resolve_model_path
+from src.readings.services.imageIngest import decode_image, read_upload_buffer
+from src.readings.services.scanResultCache import ScanResultCache, image_digest
+from src.readings.tasks.bulkScanTask import bulk_scan_readings_task, bulk_scan_prefix, list_archive_images
+from src.readings.schemas.bulkScanSchema import GetBulkScanReportRequestPath
+from globals.utils.requestValidation import validate_request
+from globals.config.config import (
+    BUCKET_NAME,
+    SCAN_BATCH_MAX_SIZE,
+    SCAN_BATCH_MAX_WAIT_MS,
+    SCAN_WORKER_PROCESSES,
+    SCAN_MODEL_VARIANT,
+    SCAN_BULK_MAX_IMAGES,
+    SCAN_MODEL_LOADING
+)
 
 from uuid import UUID
 
@@ -26,30 +51,153 @@ from src.readings.exceptions.exceptions import (
     ReadingFrequencyException,
     InvalidReadingValueException,
     FixedMeterCannotHaveUsageReadingsError,
-    
+    BulkScanNotFoundError,
+    ScanningUnavailableError,
+    InvalidScanTokenError
 )
 
 
 
 
-class ScanningService:
+@contextmanager
+def stage_timer(timings: Optional[dict], stage: str):
+    """Add the time spent in the block to timings[stage], in seconds; no-op without a timings dict"""
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
 
-    def __init__(self, readings_queries: ReadingsQueries):
+class ScanningService:
+    # Crop height relative to the recognizer input height, and the largest upscale allowed
+    OCR_HEIGHT_MARGIN = 2
+    OCR_MAX_UPSCALE = 10
+
+    def __init__(
+        self,
+        readings_queries: ReadingsQueries,
+        worker_processes: int = SCAN_WORKER_PROCESSES,
+        intra_op_threads: int = 0,
+        model_variant: str = SCAN_MODEL_VARIANT,
+        model_loading: str = SCAN_MODEL_LOADING,
+    ):
         self.readings_queries = readings_queries
+        self.scan_cache = ScanResultCache()
+        self.worker_pool = None
+        self.yolo_batcher = None
+        self.model_loading = model_loading
+        self._intra_op_threads = intra_op_threads
+        self._model_variant = model_variant
+        self._models_lock = threading.Lock()
+        self._models_ready = threading.Event()
+        self._models_loading = False
+        self._models_error = None
+
+        # Scans are routed to dedicated scanning nodes, this replica never loads a model
+        if model_loading == "disabled":
+            logger.info("ScanningService initialized without models, scanning is disabled on this instance.")
+            return
+
+        # Pool mode: models live in the worker processes only
+        if worker_processes > 0:
+            self.worker_pool = ScanningWorkerPool(worker_processes)
+            logger.info(f"ScanningService initialized with {worker_processes} scanning worker processes.")
+            return
+
+        if model_loading == "lazy":
+            logger.info("ScanningService initialized, models will load on the first scan.")
+        elif model_loading == "background":
+            threading.Thread(target=self._ensure_models_quietly, name="scan-model-loader", daemon=True).start()
+            logger.info("ScanningService initialized, models are loading in the background.")
+        else:
+            self.ensure_models()
+            logger.info(f"ScanningService initialized with YOLO and OCR models successfully ({self.model_variant}).")
+
+
+    def ensure_models(self):
+        """Load the models once; concurrent callers wait for the load already in progress"""
+        if self._models_ready.is_set():
+            return
+        if self.model_loading == "disabled":
+            raise ScanningUnavailableError()
+
+        with self._models_lock:
+            if self._models_ready.is_set():
+                return
+            self._models_loading = True
+            try:
+                started = time.perf_counter()
+                self._load_models(self._intra_op_threads, self._model_variant)
+                self._models_error = None
+                self._models_ready.set()
+                logger.info(f"Scanning models loaded in {time.perf_counter() - started:.2f}s ({self.model_variant}).")
+
+            except Exception as e:
+                self._models_error = str(e)
+                logger.error(f"Error loading scanning models: {e}")
+                raise
+
+            finally:
+                self._models_loading = False
+
+
+    def _ensure_models_quietly(self):
+        try:
+            self.ensure_models()
+        except Exception:
+            # Already logged; the next scan retries the load
+            pass
+
+
+    def readiness(self) -> dict:
+        """Model readiness for health checks; ready means this instance can serve scans without loading"""
+        if self.model_loading == "disabled":
+            return {"mode": "disabled", "ready": True, "models_loaded": False}
+        if self.worker_pool:
+            return {"mode": "process_pool", "ready": True, "models_loaded": True}
+        return {
+            "mode": self.model_loading,
+            "ready": self._models_ready.is_set() or self.model_loading == "lazy",
+            "models_loaded": self._models_ready.is_set(),
+            "loading": self._models_loading,
+            "error": self._models_error,
+        }
+
+
+    def _load_models(self, intra_op_threads: int = 0, model_variant: str = "fp32"):
         # Base models directory (absolute path)
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../models"))
 
         # models path
-        yolo_model_path = os.path.join(base_dir, "yolo", "best.onnx")
+        yolo_model_path = resolve_model_path(os.path.join(base_dir, "yolo", "best.onnx"), model_variant)
         ocr_model_config_path = os.path.join(base_dir, "ocr", "config.yml")
+        self.model_variant = model_variant
+
+        self.ocr_rec_height, self.ocr_min_height, ocr_rec_model_path = self._read_ocr_config(ocr_model_config_path)
+        session_options = build_session_options(intra_op_threads)
 
-        
         # ocr_model_dir = os.path.join(base_dir, "ocr", "PP-OCRv5_mobile_rec_infer")
+        ocr_params = {
+            "EngineConfig.onnxruntime.intra_op_num_threads": session_options.intra_op_num_threads,
+            "EngineConfig.onnxruntime.inter_op_num_threads": session_options.inter_op_num_threads,
+            "EngineConfig.onnxruntime.enable_cpu_mem_arena": True,
+        }
+        if ocr_rec_model_path:
+            ocr_params["Rec.model_path"] = resolve_model_path(ocr_rec_model_path, model_variant)
         self.ocr_model = RapidOCR(
-            config_path=ocr_model_config_path
+            config_path=ocr_model_config_path,
+            params=ocr_params
             )
 
-        self.yolo_session = ort.InferenceSession(yolo_model_path, providers=['CPUExecutionProvider'])
+        self.yolo_session = ort.InferenceSession(
+            yolo_model_path,
+            sess_options=session_options,
+            providers=['CPUExecutionProvider']
+        )
         self.input_name = self.yolo_session.get_inputs()[0].name
         _, _, h, w = self.yolo_session.get_inputs()[0].shape
         self.in_h, self.in_w = int(h), int(w)
@@ -57,7 +205,12 @@ class ScanningService:
         self.iou_threshold = 0.45 
 
         self._warm_up_models()
-        logger.info("ScanningService initialized with YOLO and OCR models successfully.")
+        self.yolo_batcher = YoloInferenceBatcher(
+            self.yolo_session,
+            self.input_name,
+            max_batch_size=SCAN_BATCH_MAX_SIZE,
+            max_wait_ms=SCAN_BATCH_MAX_WAIT_MS
+        )
 
 
     def _warm_up_models(self):
@@ -108,25 +261,12 @@ class ScanningService:
         try:    
             if len(boxes) == 0:
                 return []
-            boxes = np.array(boxes, dtype=np.float32)
-            scores = np.array(scores, dtype=np.float32)
-            x1, y1, x2, y2 = boxes.T
-            areas = (x2 - x1 + 1) * (y2 - y1 + 1)
-            order = scores.argsort()[::-1]
-            keep = []
-            while order.size > 0:
-                i = order[0]
-                keep.append(i)
-                xx1 = np.maximum(x1[i], x1[order[1:]])
-                yy1 = np.maximum(y1[i], y1[order[1:]])
-                xx2 = np.minimum(x2[i], x2[order[1:]])
-                yy2 = np.minimum(y2[i], y2[order[1:]])
-                w = np.maximum(0.0, xx2 - xx1 + 1)
-                h = np.maximum(0.0, yy2 - yy1 + 1)
-                inter = w * h
-                ovr = inter / (areas[i] + areas[order[1:]] - inter)
-                inds = np.where(ovr <= iou_thres)[0]
-                order = order[inds + 1]
+            boxes = np.asarray(boxes, dtype=np.float32)
+            scores = np.asarray(scores, dtype=np.float32)
+            # cv2 expects [x, y, w, h]
+            xywh = np.concatenate([boxes[:, :2], boxes[:, 2:4] - boxes[:, :2]], axis=1)
+            keep = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), 0.0, iou_thres)
+            keep = np.asarray(keep, dtype=np.int64).reshape(-1).tolist()
             logger.info(f"NMS applied, {len(keep)} boxes kept after filtering.")
             return keep
         
@@ -153,6 +293,12 @@ class ScanningService:
             raise e
 
 
+    @staticmethod
+    def xywh_to_xyxy(xywh):
+        half_wh = xywh[:, 2:4] / 2
+        return np.concatenate([xywh[:, :2] - half_wh, xywh[:, :2] + half_wh], axis=1).astype(np.float32)
+
+
     def decode(self, output):
         try:
             # Make shape (N, C)
@@ -164,49 +310,26 @@ class ScanningService:
             # Single-class: (N, 5) -> [x,y,w,h,conf]
             # Multi-class:  (N, 5+nc) -> [x,y,w,h,obj, class_probs...]
             num_attrs = output.shape[1]
-            boxes = []
-            scores = []
 
             # If logits look unbounded, apply sigmoid to confidences and class probs
             if num_attrs == 5:
-                xywh = output[:, :4]
                 conf = output[:, 4]
                 if conf.max() > 1.0 or conf.min() < 0.0:
                     conf = self.sigmoid(conf)
-                sel = conf >= self.conf_threshold
-                xywh = xywh[sel]
-                conf = conf[sel]
-                for (x, y, w, h), c in zip(xywh, conf):
-                    x1 = x - w / 2
-                    y1 = y - h / 2
-                    x2 = x + w / 2
-                    y2 = y + h / 2
-                    boxes.append([x1, y1, x2, y2])
-                    scores.append(float(c))
-                logger.info(f"Decoded {len(boxes)} boxes with scores.")
             else:
-                xywh = output[:, :4]
                 obj = output[:, 4]
                 cls = output[:, 5:]
                 # Apply sigmoid if necessary
                 if obj.max() > 1.0 or obj.min() < 0.0:
                     obj = self.sigmoid(obj)
                     cls = self.sigmoid(cls)
-                cls_id = np.argmax(cls, axis=1)
-                cls_score = cls[np.arange(cls.shape[0]), cls_id]
-                conf = obj * cls_score
-                sel = conf >= self.conf_threshold
-                xywh = xywh[sel]
-                conf = conf[sel]
-                for (x, y, w, h), c in zip(xywh, conf):
-                    x1 = x - w / 2
-                    y1 = y - h / 2
-                    x2 = x + w / 2
-                    y2 = y + h / 2
-                    boxes.append([x1, y1, x2, y2])
-                    scores.append(float(c))
+                conf = obj * cls.max(axis=1)
+
+            sel = conf >= self.conf_threshold
+            boxes = self.xywh_to_xyxy(output[sel, :4])
+            scores = conf[sel].astype(np.float32)
             logger.info(f"Decoded {len(boxes)} boxes with scores.")
-            return np.array(boxes, dtype=np.float32), np.array(scores, dtype=np.float32)
+            return boxes, scores
         
         except Exception as e:
             logger.error(f"Error in decoding output: {e}")
@@ -229,24 +352,33 @@ class ScanningService:
             raise e
         
 
-    def yolo_predict(self, image_bgr):
-        img, gain, pad = self.preprocess(image_bgr)
-        ort_inputs = {self.input_name: img.astype(np.float32)}
-        outputs = self.yolo_session.run(None, ort_inputs)
-        out = outputs[0]
-        boxes, scores = self.decode(out)
-        boxes = self.scale_back(boxes, gain, pad)
-
-        # Clip to image size
-        h, w = image_bgr.shape[:2]
-        if len(boxes) > 0:
-            boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w - 1)
-            boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h - 1)
-
-        # NMS
-        keep = self.nms(boxes, scores, iou_thres=self.iou_threshold)
-        boxes = boxes[keep].astype(int).tolist()
-        scores = [float(scores[i]) for i in keep]
+    def yolo_predict(self, image_bgr, top1: bool = False, timings: Optional[dict] = None):
+        """
+        Detect meter displays. With top1 only the highest scoring box is returned, which is
+        all scan needs; NMS never suppresses the best box, so it can be skipped entirely.
+        """
+        with stage_timer(timings, "letterbox"):
+            img, gain, pad = self.preprocess(image_bgr)
+        # Concurrent scans are stacked into one session run by the batcher
+        with stage_timer(timings, "inference"):
+            out = self.yolo_batcher.infer(img.astype(np.float32))
+
+        with stage_timer(timings, "postprocess"):
+            boxes, scores = self.decode(out)
+            if top1 and len(scores) > 0:
+                best = int(np.argmax(scores))
+                boxes, scores = boxes[best:best + 1], scores[best:best + 1]
+            boxes = self.scale_back(boxes, gain, pad)
+
+            # Clip to image size
+            h, w = image_bgr.shape[:2]
+            if len(boxes) > 0:
+                boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w - 1)
+                boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h - 1)
+
+            keep = list(range(len(boxes))) if top1 else self.nms(boxes, scores, iou_thres=self.iou_threshold)
+            boxes = boxes[keep].astype(int).tolist()
+            scores = [float(scores[i]) for i in keep]
         logger.info(f"YOLO predictions: {len(boxes)} boxes detected.")
         return boxes, scores
     
@@ -257,12 +389,8 @@ class ScanningService:
             if len(boxes) == 0:
                 return None
 
-            best_box = None
-            best_score = 0.0
-            for box, score in zip(boxes, scores):
-                if score > best_score:
-                    best_score = score
-                    best_box = box
+            best = int(np.argmax(scores))
+            best_box, best_score = boxes[best], scores[best]
 
             detection = image[best_box[1]:best_box[3], best_box[0]:best_box[2]]
             logger.info(f"Processed YOLO results, best detected box score: {best_score}")
@@ -273,68 +401,102 @@ class ScanningService:
             return None
         
 
-    def preprocess_image(self, img: UploadFile):
+    def preprocess_image(self, img):
         """
-        Preprocess meter display image for better OCR results
+        Preprocess meter display image for better OCR results.
+        The recognizer resizes every crop to its input height, so the crop is only scaled
+        to OCR_HEIGHT_MARGIN x that height (capped at OCR_MAX_UPSCALE) instead of a fixed 10x,
+        and kept single channel; RapidOCR expands grayscale input itself.
         """    
         try:
-            # 1. Resize image to make it bigger for better OCR
-            scale_factor = 10  # Adjust this value as needed (2x, 3x, 4x etc.)
-            height, width = img.shape[:2]
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-            
-            # 2. Convert to grayscale for processing
-            img = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
-            
-            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-            logger.info(f"Preprocessed image successfully, image shape: {img.shape}")
+            if img.ndim == 3:
+                img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+            height = img.shape[0]
+            target_height = max(self.ocr_rec_height * self.OCR_HEIGHT_MARGIN, self.ocr_min_height)
+            scale = min(target_height / max(height, 1), self.OCR_MAX_UPSCALE)
+
+            # Skip near no-op resizes, upscale with cubic and shrink with area averaging
+            if abs(scale - 1.0) > 0.05:
+                interpolation = cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
+                img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=interpolation)
+
+            logger.info(f"Preprocessed image successfully, scale {scale:.2f}, image shape: {img.shape}")
             return img
 
         except Exception as e:
             logger.error(f"Error in preprocessing image: {e}")
             return None
+
+
+    @staticmethod
+    def _read_ocr_config(config_path: str):
+        """Recognizer input height, minimum image height and recognizer model path from the RapidOCR config"""
+        try:
+            with open(config_path, "r") as f:
+                config = yaml.safe_load(f)
+            rec_height = int(config["Rec"]["rec_img_shape"][1])
+            min_height = int(config["Global"].get("min_height", 0))
+            return rec_height, min_height, config["Rec"].get("model_path")
+
+        except Exception as e:
+            logger.warning(f"Could not read OCR config from {config_path}, using defaults: {e}")
+            return 48, 30, None
         
 
-    def scan(self, image_bytes):
+    def extract_digits(self, output) -> str:
+        """Join the RapidOCR output text and keep only the digits"""
+        if hasattr(output, "txts"):
+            raw_text = "".join(output.txts) if isinstance(output.txts, (list, tuple)) else str(output.txts)
+            logger.info(f"OCR output (txts): {output.txts}")
+
+        elif isinstance(output, (list, tuple)):
+            parts = []
+            for item in output:
+                if isinstance(item, dict) and "rec_text" in item:
+                    parts.append(str(item["rec_text"]))
+                elif isinstance(item, (list, tuple)) and len(item) >= 2:
+                    # Common RapidOCR item format: [box, text, score]
+                    parts.append(str(item[1]))
+                else:
+                    parts.append(str(item))
+            raw_text = "".join(parts)
+            
+        else:
+            raw_text = str(output)
+
+        # Option A: keep all digits
+        return re.sub(r"\D+", "", raw_text)
+        # Option B (if you prefer the longest numeric run):
+        # groups = re.findall(r"\d+", raw_text)
+        # return max(groups, key=len) if groups else ""
+
+
+    def scan(self, image_bytes, timings: Optional[dict] = None):
+        """Read the meter digits from an encoded image; timings, if given, receives seconds per stage"""
+        self.ensure_models()
         try:
-            np_arr = np.frombuffer(image_bytes, np.uint8)
-            img_rgb = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+            # Pool workers pass a view over the shared-memory buffer instead of bytes;
+            # large photos are decoded straight at reduced resolution
+            with stage_timer(timings, "decode"):
+                img_rgb = decode_image(image_bytes)
+            if img_rgb is None:
+                logger.error("Image could not be decoded.")
+                return None
 
-            results = self.yolo_predict(img_rgb)
-            cropped_detection = self.process_yolo_results(results,img_rgb)
+            results = self.yolo_predict(img_rgb, top1=True, timings=timings)
+            with stage_timer(timings, "crop"):
+                cropped_detection = self.process_yolo_results(results,img_rgb)
             if cropped_detection is None:
                 logger.error("No valid detection found in the image.")
                 return None
 
-            processed_detection = self.preprocess_image(cropped_detection)
-
-            output = self.ocr_model(processed_detection)
-            if hasattr(output, "txts"):
-                raw_text = "".join(output.txts) if isinstance(output.txts, (list, tuple)) else str(output.txts)
-                logger.info(f"OCR output (txts): {output.txts}")
-
-            elif isinstance(output, (list, tuple)):
-                parts = []
-                for item in output:
-                    if isinstance(item, dict) and "rec_text" in item:
-                        parts.append(str(item["rec_text"]))
-                    elif isinstance(item, (list, tuple)) and len(item) >= 2:
-                        # Common RapidOCR item format: [box, text, score]
-                        parts.append(str(item[1]))
-                    else:
-                        parts.append(str(item))
-                raw_text = "".join(parts)
-                
-            else:
-                raw_text = str(output)
+            with stage_timer(timings, "ocr_preprocess"):
+                processed_detection = self.preprocess_image(cropped_detection)
 
-            # Option A: keep all digits
-            digits = re.sub(r"\D+", "", raw_text)
-            # Option B (if you prefer the longest numeric run):
-            # groups = re.findall(r"\d+", raw_text)
-            # digits = max(groups, key=len) if groups else ""
+            with stage_timer(timings, "ocr"):
+                output = self.ocr_model(processed_detection)
+                digits = self.extract_digits(output)
 
             ocr_result = [{"rec_text": digits}]
             logger.info(f"scanning was successful with reading: {ocr_result}")
@@ -345,14 +507,96 @@ class ScanningService:
             raise e
 
 
+    async def scan_async(self, image_bytes):
+        """Run scan in the worker pool when enabled, otherwise in a thread of this process"""
+        if self.model_loading == "disabled":
+            raise ScanningUnavailableError()
+        if self.worker_pool:
+            return await self.worker_pool.scan(image_bytes)
+        return await asyncio.to_thread(self.scan, image_bytes)
+
+
+    def close(self):
+        if self.worker_pool:
+            self.worker_pool.close()
+
+
+    async def get_scanning_stats(self, request: Request):
+        try:
+            if self.worker_pool:
+                stats = self.worker_pool.stats()
+            elif self.yolo_batcher:
+                stats = self.yolo_batcher.stats()
+            else:
+                stats = self.readiness()
+            return success_response(
+                message="Scanning stats fetched successfully.",
+                data=stats
+            )
+
+        except Exception as e:
+            logger.error(f"Error occurred while fetching scanning stats: {e}")
+            raise InternalServerError(message="An error occurred while fetching scanning stats.")
+
+
+    async def get_scanning_readiness(self, request: Request):
+        readiness = self.readiness()
+        if not readiness["ready"]:
+            return service_unavailable_error_response(
+                message="Scanning models are not loaded yet.",
+                data=readiness
+            )
+        return success_response(
+            message="Scanning is ready.",
+            data=readiness
+        )
+
+
+    async def _stage_scan_image(self, digest: str, image_buffer) -> Optional[str]:
+        """Upload a scanned image once per content hash so accepting it later needs no re-upload"""
+        blob_name = await self.scan_cache.get_staged_blob(digest)
+        if blob_name:
+            return blob_name
+        try:
+            blob_name = await asyncio.to_thread(
+                self.readings_queries.gcs_manager.upload_buffer,
+                bucket_name=BUCKET_NAME,
+                buffer=BytesIO(image_buffer),
+                destination_blob_name=f"scans/staged/{digest}.jpg",
+                content_type="image/jpeg"
+            )
+            await self.scan_cache.set_staged_blob(digest, blob_name)
+            return blob_name
+
+        except Exception as e:
+            # Accepting falls back to re-sending the image
+            logger.error(f"Error staging scanned image {digest}: {e}")
+            return None
+
+
+    async def _scan_digits(self, digest: str, image_buffer) -> Optional[str]:
+        digits = await self.scan_cache.get_result(digest)
+        if digits:
+            logger.info(f"Scan cache hit for image {digest}")
+            return digits
+
+        ocr_result = await self.scan_async(image_buffer)
+        if not ocr_result or not ocr_result[0]['rec_text']:
+            return None
+        digits = ocr_result[0]['rec_text']
+        await self.scan_cache.set_result(digest, digits)
+        return digits
+
+
     async def scan_reading(self, request: Request, session: AsyncSession, reading: Optional[UploadFile] = None):
+        accept_reading = request.query_params.get('accept_reading', False)
+        scan_token = request.query_params.get('scan_token')
         await FileValidator.validate_file(
                 file=reading,
                 **FileValidationConfigs.IMAGES,
-                require_file=True
+                require_file=not (accept_reading and scan_token)
             )
         meter_id = request.path_params.get('meter_id')
-        accept_reading = request.query_params.get('accept_reading', False)
 
         try:
             meter_id = UUID(meter_id)
@@ -364,7 +608,6 @@ class ScanningService:
 
         try:
             token = request.state.user
-            image_bytes = await reading.read()
 
             if accept_reading:
                 current_reading = request.query_params.get('current_reading')
@@ -373,41 +616,74 @@ class ScanningService:
                         "field": "current_reading",
                         "error": "Current reading is required when accepting reading."
                     })
+
+                staged_blob_name = None
+                if scan_token:
+                    scan = await self.scan_cache.get_token(scan_token)
+                    if (
+                        not scan
+                        or scan["meter_id"] != str(meter_id)
+                        or scan["user_id"] != str(token.get('user_id'))
+                    ):
+                        raise InvalidScanTokenError()
+                    staged_blob_name = scan["blob_name"]
+                    if not staged_blob_name and not reading:
+                        raise InvalidScanTokenError()
+                elif reading:
+                    # Re-sent photo of an earlier scan: reuse its staged upload
+                    image_buffer = await asyncio.to_thread(read_upload_buffer, reading)
+                    staged_blob_name = await self.scan_cache.get_staged_blob(
+                        await asyncio.to_thread(image_digest, image_buffer)
+                    )
+
                 reading_data = {
                     'meter_id': meter_id,
                     'current_reading': float(current_reading),
                     'created_by': token.get('user_id'),
                     'updated_by': token.get('user_id'),
                 }
+                # Otherwise the spooled upload is streamed to storage as-is
                 scanned_reading = await self.readings_queries.create_reading(
                     session=session,
                     reading_data=reading_data,
-                    image_bytes=BytesIO(image_bytes)
+                    image_file=reading.file if reading else None,
+                    staged_blob_name=staged_blob_name
                 )
+                if scan_token:
+                    await self.scan_cache.revoke_token(scan_token)
                 return success_response(
                     message="Reading scanned successfully.",
                     data=scanned_reading
                 )
 
             else:
-                ocr_result = await asyncio.to_thread(self.scan, image_bytes)
-                if not ocr_result:
+                image_buffer = await asyncio.to_thread(read_upload_buffer, reading)
+                digest = await asyncio.to_thread(image_digest, image_buffer)
+
+                # Stage the upload while OCR runs
+                digits, staged_blob_name = await asyncio.gather(
+                    self._scan_digits(digest, image_buffer),
+                    self._stage_scan_image(digest, image_buffer)
+                )
+                if not digits:
                     return success_response(
                         message="No valid reading detected in the image.",
                         data=None
                     )
 
-                reading_data = {
-                    'meter_id': meter_id,
-                    'current_reading': float(ocr_result[0]['rec_text']),
-                    'created_by': token.get('user_id'),
-                    'updated_by': token.get('user_id'),
-                }
+                scan_token = await self.scan_cache.issue_token(
+                    digest=digest,
+                    meter_id=meter_id,
+                    user_id=token.get('user_id'),
+                    blob_name=staged_blob_name,
+                    current_reading=digits
+                )
 
                 return success_response(
                     message="Are you sure you want to accept this reading?",
                     data={
-                        "current_reading": float(ocr_result[0]['rec_text']),
+                        "current_reading": float(digits),
+                        "scan_token": scan_token,
                     }
                 )
         
@@ -419,13 +695,189 @@ class ScanningService:
             MeterNotFoundError,
             InvalidReadingValueException,
             FixedMeterCannotHaveUsageReadingsError,
-            MeterInactiveError
+            MeterInactiveError,
+            ScanningUnavailableError,
+            InvalidScanTokenError
             ):
             raise
 
         except Exception as e:
             logger.error(f"Error occurred while scanning reading: {e}")
             raise InternalServerError(message="An error occurred while scanning reading.")
+
+
+    @staticmethod
+    def _count_archive_images(archive_file) -> int:
+        archive_file.seek(0)
+        with zipfile.ZipFile(archive_file) as archive:
+            return len(list_archive_images(archive))
+
+
+    @staticmethod
+    def _build_images_archive(images: List[tuple]):
+        """Pack uploaded (file name, bytes) pairs into a zip; JPEGs are stored, not recompressed"""
+        archive_file = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+        with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_STORED) as archive:
+            for file_name, image_bytes in images:
+                archive.writestr(file_name, image_bytes)
+        return archive_file
+
+
+    async def bulk_scan_readings(
+        self,
+        request: Request,
+        archive: Optional[UploadFile] = None,
+        images: Optional[List[UploadFile]] = None,
+        mapping: Optional[str] = None
+    ):
+        """
+        Queue an offline batch of meter photos for scanning, given either as one zip archive
+        or as multipart images. Each image is matched to a meter through the optional mapping
+        ({"<file name>": "<meter_id>"}) or its file name (<meter_id>.jpg, <meter_id>_<anything>.jpg).
+        """
+        if not archive and not images:
+            raise ValidationError({
+                "field": "archive",
+                "error": "A zip archive or a list of images is required."
+            })
+
+        try:
+            mapping = json.loads(mapping) if mapping else {}
+            if not isinstance(mapping, dict):
+                raise ValueError("mapping must be an object")
+            mapping = {str(file_name): str(meter_id) for file_name, meter_id in mapping.items()}
+        except ValueError:
+            raise ValidationError({
+                "field": "mapping",
+                "error": "Mapping must be a JSON object of file name to meter ID."
+            })
+
+        if archive:
+            await FileValidator.validate_file(
+                file=archive,
+                **FileValidationConfigs.SCAN_ARCHIVES,
+                require_file=True
+            )
+        for image in images or []:
+            await FileValidator.validate_file(
+                file=image,
+                **FileValidationConfigs.IMAGES,
+                require_file=True
+            )
+
+        try:
+            token = request.state.user
+            batch_id = str(uuid4())
+            archive_blob_name = f"{bulk_scan_prefix(batch_id)}/images.zip"
+
+            if archive:
+                archive_file = archive.file
+                try:
+                    total_images = await asyncio.to_thread(self._count_archive_images, archive_file)
+                except zipfile.BadZipFile:
+                    raise ValidationError({
+                        "field": "archive",
+                        "error": "The archive is not a valid zip file."
+                    })
+            else:
+                file_names = [os.path.basename(image.filename) for image in images]
+                if len(set(file_names)) != len(file_names):
+                    raise ValidationError({
+                        "field": "images",
+                        "error": "Image file names must be unique."
+                    })
+                image_buffers = await asyncio.to_thread(lambda: [read_upload_buffer(image) for image in images])
+                image_payloads = list(zip(file_names, image_buffers))
+                archive_file = await asyncio.to_thread(self._build_images_archive, image_payloads)
+                total_images = len(image_payloads)
+
+            if total_images == 0:
+                raise ValidationError({
+                    "field": "archive",
+                    "error": "No images found in the upload."
+                })
+            if total_images > SCAN_BULK_MAX_IMAGES:
+                raise ValidationError({
+                    "field": "archive",
+                    "error": f"A bulk scan is limited to {SCAN_BULK_MAX_IMAGES} images."
+                })
+
+            await asyncio.to_thread(
+                self.readings_queries.gcs_manager.upload_buffer,
+                bucket_name=BUCKET_NAME,
+                buffer=archive_file,
+                destination_blob_name=archive_blob_name,
+                content_type="application/zip"
+            )
+
+            task = bulk_scan_readings_task.delay(
+                batch_id,
+                archive_blob_name,
+                mapping,
+                str(token.get('user_id')),
+                user_phone_number=token.get('phone_number')
+            )
+            logger.info(f"Enqueued bulk scan task {task.id} for batch {batch_id} with {total_images} images")
+
+            return success_response(
+                message=f"Bulk scan started for {total_images} images. You will receive a notification once it's complete.",
+                data={
+                    "batch_id": batch_id,
+                    "task_id": task.id,
+                    "total_images": total_images,
+                }
+            )
+
+        except ValidationError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error occurred while starting bulk scan: {e}")
+            raise InternalServerError(message="An error occurred while starting bulk scan.")
+
+
+    async def get_bulk_scan_report(self, request: Request):
+        valid, validated_request = await validate_request(
+            request=request,
+            path_model=GetBulkScanReportRequestPath
+        )
+        if not valid:
+            logger.error(f"Validation error in get_bulk_scan_report: {validated_request}")
+            raise ValidationError(validated_request)
+
+        try:
+            batch_id = str(validated_request.get('path').get("batch_id"))
+            gcs_manager = self.readings_queries.gcs_manager
+            report = await asyncio.to_thread(
+                gcs_manager.download_as_bytes,
+                BUCKET_NAME,
+                f"{bulk_scan_prefix(batch_id)}/report.json"
+            )
+            if report is not None:
+                return success_response(
+                    message="Bulk scan report fetched successfully.",
+                    data=json.loads(report)
+                )
+
+            in_progress = await asyncio.to_thread(
+                gcs_manager.file_exists,
+                BUCKET_NAME,
+                f"{bulk_scan_prefix(batch_id)}/images.zip"
+            )
+            if not in_progress:
+                raise BulkScanNotFoundError()
+
+            return success_response(
+                message="Bulk scan is still in progress.",
+                data={"batch_id": batch_id, "status": "processing"}
+            )
+
+        except BulkScanNotFoundError:
+            raise
+
+        except Exception as e:
+            logger.error(f"Error occurred while fetching bulk scan report: {e}")
+            raise InternalServerError(message="An error occurred while fetching bulk scan report.")
     
 
 
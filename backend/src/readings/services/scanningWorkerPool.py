@@ -0,0 +1,144 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from globals.utils.logger import logger
+from src.readings.services.scanModelVariants import available_cores
+
+
+# Scanning engine owned by each worker process, created once by the pool initializer
+_worker_engine = None
+
+
+def _init_worker(intra_op_threads: int):
+    global _worker_engine
+    from src.readings.services.scanningServiceV2 import ScanningService
+
+    _worker_engine = ScanningService(
+        readings_queries=None,
+        worker_processes=0,
+        intra_op_threads=intra_op_threads,
+        model_loading="eager",
+    )
+    logger.info(f"Scanning worker {os.getpid()} ready")
+
+
+def _ping():
+    return os.getpid()
+
+
+def _scan_shared(shm_name: str, size: int):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The parent owns and unlinks the block, so stop this process's tracker from touching it
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+    try:
+        image = np.ndarray((size,), dtype=np.uint8, buffer=shm.buf)
+        try:
+            return _worker_engine.scan(image)
+        finally:
+            del image
+    finally:
+        shm.close()
+
+
+class ScanningWorkerPool:
+    """
+    Pool of scanning processes, each holding its own YOLO session and RapidOCR instance.
+
+    Inference and the numpy pre/post-processing run outside the API process, so scans
+    no longer compete with request handling for the GIL. Image bytes are handed over
+    through a shared-memory block instead of being pickled into the task.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        # Split the cores between workers instead of letting every ONNX session grab all of them
+        self.intra_op_threads = max(1, available_cores() // workers)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._restarts = 0
+        self._start()
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.intra_op_threads,),
+        )
+        # Spawn the workers now so models are loaded before the first scan
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+        logger.info(f"Scanning worker pool started with {self.workers} processes")
+
+    def _restart(self, broken_executor):
+        with self._lock:
+            if self._executor is not broken_executor:
+                return
+            logger.error("Scanning worker pool broke, restarting workers")
+            broken_executor.shutdown(wait=False, cancel_futures=True)
+            self._restarts += 1
+            self._start()
+
+    async def scan(self, image_bytes: bytes):
+        size = len(image_bytes)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        executor = self._executor
+        with self._lock:
+            self._in_flight += 1
+        try:
+            shm.buf[:size] = image_bytes
+            result = await asyncio.wrap_future(executor.submit(_scan_shared, shm.name, size))
+            with self._lock:
+                self._completed += 1
+            return result
+
+        except BrokenProcessPool:
+            with self._lock:
+                self._failed += 1
+            self._restart(executor)
+            raise
+
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            shm.close()
+            shm.unlink()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": "process_pool",
+                "workers": self.workers,
+                "intra_op_threads": self.intra_op_threads,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "restarts": self._restarts,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+        logger.info("Scanning worker pool stopped")
@@ -0,0 +1,167 @@
+from src.celery.celery_app import celery_app
+from globals.utils.logger import logger
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from uuid import NAMESPACE_URL, UUID, uuid5
+import asyncio
+import json
+import os
+import tempfile
+import time
+import zipfile
+from db.gcs.gcsService import GCSManager
+from db.postgres.connection import PostgresClient
+from globals.config.config import BUCKET_NAME, SCAN_BULK_CHUNK_SIZE
+from src.readings.queries.readingsQueries import ReadingsQueries
+from src.messages.services.whatsappMessagesService import WhatsappMessagesService
+
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+# Scanning engine of this Celery worker process, loaded on the first bulk scan it runs
+_scanning_service = None
+
+
+def get_worker_scanning_service():
+    global _scanning_service
+    if _scanning_service is None:
+        from src.readings.services.scanningServiceV2 import ScanningService
+
+        # Celery already runs one process per worker, so scan in-process here
+        _scanning_service = ScanningService(readings_queries=None, worker_processes=0, model_loading="eager")
+    return _scanning_service
+
+
+def bulk_scan_prefix(batch_id: str) -> str:
+    return f"scans/bulk/{batch_id}"
+
+
+def list_archive_images(archive: zipfile.ZipFile) -> list:
+    return [
+        info.filename for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+
+def bulk_scan_reading_id(batch_id: str, file_name: str) -> UUID:
+    """Same ID for the same image of the same batch, so a retried task finds what it already staged"""
+    return uuid5(NAMESPACE_URL, f"{bulk_scan_prefix(batch_id)}/{file_name}")
+
+
+def resolve_meter_id(file_name: str, mapping: dict):
+    """Meter ID from the uploaded mapping, else from the file name: <meter_id>.jpg or <meter_id>_<anything>.jpg"""
+    base_name = os.path.basename(file_name)
+    meter_id = mapping.get(base_name) or mapping.get(file_name) or os.path.splitext(base_name)[0].split("_", 1)[0]
+    try:
+        return UUID(str(meter_id))
+    except ValueError:
+        return None
+
+
+@celery_app.task(name="readings.bulk_scan_readings", bind=True, max_retries=2)
+def bulk_scan_readings_task(self, batch_id, archive_blob_name, mapping, created_by, user_phone_number=None):
+    """
+    Celery task: scan an offline batch of meter photos and stage them as pending readings.
+    Images are scanned chunk by chunk on a thread pool, so their YOLO runs are stacked by the
+    inference batcher; each chunk is validated, uploaded and inserted in one pass by ReadingsQueries.
+    Reading IDs are derived from the batch and file name, so a retry reports readings an earlier
+    attempt committed as staged instead of as duplicates.
+    The per-image report is stored next to the archive for the report endpoint.
+    """
+    try:
+        start_time = time.time()
+        gcs_manager = GCSManager()
+        readings_queries = ReadingsQueries(gcs_manager)
+        scanning_service = get_worker_scanning_service()
+        workers = max(scanning_service.yolo_batcher.max_batch_size, 4)
+        report = []
+
+        with tempfile.TemporaryDirectory() as tmp, ThreadPoolExecutor(max_workers=workers) as executor:
+            archive_path = os.path.join(tmp, "images.zip")
+            gcs_manager.download_file(BUCKET_NAME, archive_blob_name, archive_path)
+
+            with zipfile.ZipFile(archive_path) as archive:
+                entries = []
+                for file_name in list_archive_images(archive):
+                    meter_id = resolve_meter_id(file_name, mapping or {})
+                    if meter_id is None:
+                        report.append({"file": file_name, "meter_id": None, "status": "failed", "error": "No meter ID for this image."})
+                        continue
+                    entries.append((file_name, meter_id))
+
+                for chunk_start in range(0, len(entries), SCAN_BULK_CHUNK_SIZE):
+                    chunk = entries[chunk_start:chunk_start + SCAN_BULK_CHUNK_SIZE]
+                    images = [archive.read(file_name) for file_name, _ in chunk]
+
+                    def scan(image_bytes):
+                        try:
+                            return scanning_service.scan(image_bytes), None
+                        except Exception as e:
+                            return None, str(e)
+
+                    scanned = []
+                    for (file_name, meter_id), image_bytes, (ocr_result, error) in zip(chunk, images, executor.map(scan, images)):
+                        item = {"file": file_name, "meter_id": str(meter_id)}
+                        digits = ocr_result[0]["rec_text"] if ocr_result else ""
+                        if error or not digits:
+                            item.update({"status": "failed", "error": error or "No valid reading detected in the image."})
+                            report.append(item)
+                            continue
+                        scanned.append((item, {
+                            "reading_id": bulk_scan_reading_id(batch_id, file_name),
+                            "meter_id": meter_id,
+                            "current_reading": int(digits),
+                            "image": image_bytes
+                        }))
+
+                    with PostgresClient.get_sync_session() as session:
+                        outcomes = readings_queries.stage_pending_readings_sync(
+                            session=session,
+                            readings=[reading for _, reading in scanned],
+                            created_by=created_by,
+                            executor=executor
+                        )
+
+                    for (item, reading), outcome in zip(scanned, outcomes):
+                        item.update({"current_reading": reading["current_reading"], **outcome})
+                        report.append(item)
+                    logger.info(f"Bulk scan {batch_id}: {min(chunk_start + len(chunk), len(entries))}/{len(entries)} images processed")
+
+        staged = len([item for item in report if item["status"] == "staged"])
+        failed = len(report) - staged
+        summary = {
+            "batch_id": batch_id,
+            "status": "completed",
+            "total_images": len(report),
+            "staged": staged,
+            "failed": failed,
+            "duration_seconds": round(time.time() - start_time, 2),
+        }
+
+        gcs_manager.upload_buffer(
+            bucket_name=BUCKET_NAME,
+            buffer=BytesIO(json.dumps({**summary, "results": report}).encode("utf-8")),
+            destination_blob_name=f"{bulk_scan_prefix(batch_id)}/report.json",
+            content_type="application/json"
+        )
+        gcs_manager.delete_file(BUCKET_NAME, archive_blob_name)
+        logger.info(f"Bulk scan {batch_id} completed. Staged: {staged}, Failed: {failed}")
+
+        if user_phone_number:
+            try:
+                asyncio.run(
+                    WhatsappMessagesService().send_whatsapp_message(
+                        phone_number=user_phone_number,
+                        message=f"Bulk scan completed. Staged: {staged} readings, Failed: {failed} images"
+                    )
+                )
+            except Exception as e:
+                logger.error(f"Failed to send bulk scan summary: {e}")
+
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error in bulk_scan_readings_task for batch {batch_id}: {e}")
+        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))